@@ -25,37 +25,45 @@ This module contains HLRedux representations of functions found in the
 U{SCL<neutrons.ornl.gov/asg/projects/SCL>}.
 """
 
-from hlr_add_ncerr import *
-from hlr_div_ncerr import *
-from hlr_d_spacing_to_tof_focused_det import *
-from hlr_energy_to_wavelength import *
-from hlr_energy_transfer import *
-from hlr_frequency_to_energy import *
-from hlr_initial_wavelength_igs_lin_time_zero_to_tof import *
-from hlr_init_scatt_wavevector_to_scalar_Q import *
-from hlr_mult_ncerr import *
-from hlr_rebin_axis_1D import *
-from hlr_rebin_axis_1D_frac import *
-from hlr_rebin_axis_1D_linint import *
-from hlr_rebin_axis_2D import *
-from hlr_reverse_array_cp import *
-from hlr_sub_ncerr import *
-from hlr_sumw_ncerr import *
-from hlr_tof_to_final_velocity_dgs import *
-from hlr_tof_to_initial_wavelength_igs import *
-from hlr_tof_to_initial_wavelength_igs_lin_time_zero import *
-from hlr_tof_to_scalar_Q import *
-from hlr_tof_to_wavelength import *
-from hlr_tof_to_wavelength_lin_time_zero import *
-from hlr_velocity_to_wavelength import *
-from hlr_wavelength_to_d_spacing import *
-from hlr_wavelength_to_energy import *
-from hlr_wavelength_to_scalar_k import *
-from hlr_wavelength_to_scalar_Q import *
-from hlr_wavelength_to_velocity import *
-from hlr_weighted_average import *
+import hlr_utils
+
+# The modules of the package with the public names they provide. A module is
+# only imported when one of its names is first used.
+__lazy_imports = [
+    ("hlr_add_ncerr", ["add_ncerr"]),
+    ("hlr_div_ncerr", ["div_ncerr"]),
+    ("hlr_d_spacing_to_tof_focused_det", ["d_spacing_to_tof_focused_det"]),
+    ("hlr_energy_to_wavelength", ["energy_to_wavelength"]),
+    ("hlr_energy_transfer", ["energy_transfer"]),
+    ("hlr_frequency_to_energy", ["frequency_to_energy"]),
+    ("hlr_initial_wavelength_igs_lin_time_zero_to_tof", ["initial_wavelength_igs_lin_time_zero_to_tof"]),
+    ("hlr_init_scatt_wavevector_to_scalar_Q", ["init_scatt_wavevector_to_scalar_Q"]),
+    ("hlr_mult_ncerr", ["mult_ncerr"]),
+    ("hlr_rebin_axis_1D", ["rebin_axis_1D"]),
+    ("hlr_rebin_axis_1D_frac", ["rebin_axis_1D_frac"]),
+    ("hlr_rebin_axis_1D_linint", ["rebin_axis_1D_linint"]),
+    ("hlr_rebin_axis_2D", ["rebin_axis_2D"]),
+    ("hlr_reverse_array_cp", ["reverse_array_cp"]),
+    ("hlr_sub_ncerr", ["sub_ncerr"]),
+    ("hlr_sumw_ncerr", ["sumw_ncerr"]),
+    ("hlr_tof_to_final_velocity_dgs", ["tof_to_final_velocity_dgs"]),
+    ("hlr_tof_to_initial_wavelength_igs", ["tof_to_initial_wavelength_igs"]),
+    ("hlr_tof_to_initial_wavelength_igs_lin_time_zero", ["tof_to_initial_wavelength_igs_lin_time_zero"]),
+    ("hlr_tof_to_scalar_Q", ["tof_to_scalar_Q"]),
+    ("hlr_tof_to_wavelength", ["tof_to_wavelength"]),
+    ("hlr_tof_to_wavelength_lin_time_zero", ["tof_to_wavelength_lin_time_zero"]),
+    ("hlr_velocity_to_wavelength", ["velocity_to_wavelength"]),
+    ("hlr_wavelength_to_d_spacing", ["wavelength_to_d_spacing"]),
+    ("hlr_wavelength_to_energy", ["wavelength_to_energy"]),
+    ("hlr_wavelength_to_scalar_k", ["wavelength_to_scalar_k"]),
+    ("hlr_wavelength_to_scalar_Q", ["wavelength_to_scalar_Q"]),
+    ("hlr_wavelength_to_velocity", ["wavelength_to_velocity"]),
+    ("hlr_weighted_average", ["weighted_average"]),
+    ]
 
 from HLR_version import version as __version__
 
 #version
 __id__ = "$Id$"
+
+hlr_utils.make_lazy_module(__name__, __lazy_imports)
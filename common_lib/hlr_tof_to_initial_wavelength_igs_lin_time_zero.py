@@ -308,7 +308,12 @@ def tof_to_initial_wavelength_igs_lin_time_zero(obj, **kwargs):
             value[1].__delslice__(0, index)
             map_so.y.__delslice__(0, index)
             map_so.var_y.__delslice__(0, index)
-            if lojac:
+            if lojac and index > 0:
+                # The axis may be shared with other spectra, so it is copied
+                # before being cut
+                hlr_utils.detach_axis(map_so, axis)
+                val = hlr_utils.get_value(obj, i, o_descr, "x", axis)
+                err2 = hlr_utils.get_err2(obj, i, o_descr, "x", axis)
                 val.__delslice__(0, index)
                 err2.__delslice__(0, index)
         else:
@@ -237,6 +237,12 @@ def tof_to_wavelength_lin_time_zero(obj, **kwargs):
         
         if cut_val is not None:
             index = utils.bisect_helper(value[0], cut_val)
+            if lojac:
+                # The axis may be shared with other spectra, so it is copied
+                # before being cut
+                hlr_utils.detach_axis(map_so, axis)
+                val = hlr_utils.get_value(obj, i, o_descr, "x", axis)
+                err2 = hlr_utils.get_err2(obj, i, o_descr, "x", axis)
             if cut_less:
                 # Need to cut at this index, so increment by one
                 index += 1
@@ -25,66 +25,87 @@ This module contains functions that represent higher-level aggregations of
 data reduction functionality.
 """
 
-from hlr_add_files import *
-from hlr_add_files_bg import *
-from hlr_add_files_dm import *
-from hlr_apply_sas_correct import *
-from hlr_bss_E_vs_Q_helpers import calc_BSS_coeffs, calc_BSS_EQ_verticies, calc_BSS_solid_angle
-from hlr_calc_deltat_over_t import *
-from hlr_calc_delta_theta_over_theta import *
-from hlr_calc_solid_angle import *
-from hlr_calc_substrate_trans import *
-from hlr_calculate_ref_background import *
-from hlr_calibrate_dgs_data import *
-from hlr_create_axis_from_data import *
-from hlr_create_det_eff import *
-from hlr_create_E_vs_Q_dgs import create_E_vs_Q_dgs
-from hlr_create_E_vs_Q_igs import create_E_vs_Q_igs
-from hlr_create_param_vs_Y import *
-from hlr_create_Qvec_vs_E_dgs import create_Qvec_vs_E_dgs
-from hlr_convert_single_to_list import *
-from hlr_create_X_vs_pixpos import *
-from hlr_cut_spectra import *
-from hlr_data_filter import data_filter
-from hlr_determine_time_indep_bkg import *
-from hlr_determine_ref_background import *
-from hlr_dimensionless_mon import *
-from hlr_E_vs_Q_helpers import *
-from hlr_eff_corr_helpers import *
-from hlr_energy_transfer import *
-from hlr_feff_correct_mon import *
-from hlr_filter_normalization import *
-from hlr_filter_ref_data import *
-from hlr_find_nz_extent import *
-from hlr_fix_bin_contents import *
-from hlr_igs_energy_transfer import *
-from hlr_integrate_axis import *
-from hlr_integrate_axis_py import *
-from hlr_integrate_spectra import *
-from hlr_integrate_spectra_py import *
-from hlr_lin_interpolate_spectra import *
-from hlr_process_dgs_data import process_dgs_data
-from hlr_process_igs_data import process_igs_data
-from hlr_process_ref_data import process_ref_data
-from hlr_process_reflp_data import process_reflp_data
-from hlr_process_sas_data import process_sas_data
-from hlr_rebin_axis_1D_frac import *
-from hlr_rebin_efficiency import *
-from hlr_rebin_monitor import *
-from hlr_ref_beamdiv_correct import *
-from hlr_scaled_summed_data import *
-from hlr_shift_spectrum import *
-from hlr_subtract_axis_dep_bkg import *
-from hlr_subtract_bkg_from_data import *
-from hlr_subtract_time_indep_bkg import *
-from hlr_sum_all_spectra import *
-from hlr_sum_by_rebin_frac import *
-from hlr_sum_spectra_weighted_ave import *
-from hlr_tof_to_ref_scalar_Q import *
-from hlr_zero_bins import *
-from hlr_zero_spectra import *
+import hlr_utils
+
+# The modules of the package with the public names they provide. A module is
+# only imported when one of its names is first used.
+__lazy_imports = [
+    ("hlr_accumulate_files", ["accumulate_files"]),
+    ("hlr_accumulation_state", ["AccumulationState"]),
+    ("hlr_add_files", ["add_files"]),
+    ("hlr_add_files_bg", ["add_files_bg"]),
+    ("hlr_add_files_dm", ["add_files_dm"]),
+    ("hlr_apply_sas_correct", ["apply_sas_correct"]),
+    ("hlr_apply_sas_factors", ["apply_sas_factors"]),
+    ("hlr_bss_E_vs_Q_helpers", ["calc_BSS_EQ_verticies", "calc_BSS_coeffs",
+                                "calc_BSS_solid_angle"]),
+    ("hlr_calc_deltat_over_t", ["calc_deltat_over_t"]),
+    ("hlr_calc_delta_theta_over_theta", ["calc_delta_theta_over_theta"]),
+    ("hlr_calc_solid_angle", ["calc_solid_angle"]),
+    ("hlr_calc_substrate_trans", ["calc_substrate_trans"]),
+    ("hlr_calculate_ref_background", ["calculate_ref_background"]),
+    ("hlr_calibrate_dgs_data", ["calibrate_dgs_data"]),
+    ("hlr_create_axis_from_data", ["create_axis_from_data",
+                                   "find_axis_range"]),
+    ("hlr_create_det_eff", ["EFF_CACHE_SIZE", "clear_det_eff_cache",
+                            "correct_det_eff", "create_det_eff",
+                            "get_det_eff"]),
+    ("hlr_create_E_vs_Q_dgs", ["create_E_vs_Q_dgs"]),
+    ("hlr_create_E_vs_Q_igs", ["create_E_vs_Q_igs"]),
+    ("hlr_create_param_vs_Y", ["create_param_vs_Y"]),
+    ("hlr_create_Qvec_vs_E_dgs", ["create_Qvec_vs_E_dgs"]),
+    ("hlr_convert_single_to_list", ["convert_single_to_list"]),
+    ("hlr_create_X_vs_pixpos", ["create_X_vs_pixpos"]),
+    ("hlr_cut_spectra", ["cut_spectra"]),
+    ("hlr_data_filter", ["data_filter"]),
+    ("hlr_determine_time_indep_bkg", ["determine_time_indep_bkg"]),
+    ("hlr_determine_ref_background", ["determine_ref_background"]),
+    ("hlr_dimensionless_mon", ["dimensionless_mon"]),
+    ("hlr_E_vs_Q_helpers", ["calc_EQ_Jacobian", "calc_EQ_Jacobian_dgs"]),
+    ("hlr_eff_corr_helpers", ["subexp_eff"]),
+    ("hlr_energy_transfer", ["energy_transfer"]),
+    ("hlr_feff_correct_mon", ["feff_correct_mon"]),
+    ("hlr_filter_normalization", ["THRESHOLD_BAND", "filter_normalization"]),
+    ("hlr_filter_ref_data", ["filter_ref_data"]),
+    ("hlr_find_nz_extent", ["find_nz_extent", "find_nz_indices"]),
+    ("hlr_fix_bin_contents", ["fix_bin_contents"]),
+    ("hlr_igs_energy_transfer", ["igs_energy_transfer"]),
+    ("hlr_integrate_axis", ["integrate_axis"]),
+    ("hlr_integrate_axis_py", ["integrate_axis_py"]),
+    ("hlr_integrate_spectra", ["integrate_spectra"]),
+    ("hlr_integrate_spectra_py", ["integrate_spectra_py"]),
+    ("hlr_integrate_spectra_windows", ["integrate_spectra_windows"]),
+    ("hlr_integration_table", ["IntegrationTable"]),
+    ("hlr_lin_interpolate_spectra", ["lin_interpolate_spectra"]),
+    ("hlr_nexus_reader", ["NeXusReader"]),
+    ("hlr_geom_table", ["GeomTable", "create_geom_table", "get_geom_table"]),
+    ("hlr_normalize_to_monitor", ["normalize_to_monitor"]),
+    ("hlr_process_dgs_data", ["process_dgs_data"]),
+    ("hlr_process_igs_data", ["process_igs_data"]),
+    ("hlr_process_ref_data", ["process_ref_data"]),
+    ("hlr_process_reflp_data", ["process_reflp_data"]),
+    ("hlr_process_sas_data", ["process_sas_data"]),
+    ("hlr_rebin_axis_1D_frac", ["rebin_axis_1D_frac"]),
+    ("hlr_rebin_efficiency", ["rebin_efficiency"]),
+    ("hlr_rebin_monitor", ["rebin_monitor"]),
+    ("hlr_ref_beamdiv_correct", ["ref_beamdiv_correct"]),
+    ("hlr_scaled_summed_data", ["scaled_summed_data"]),
+    ("hlr_shift_spectrum", ["shift_spectrum"]),
+    ("hlr_spectrum_pipeline", ["SpectrumPipeline"]),
+    ("hlr_subtract_axis_dep_bkg", ["subtract_axis_dep_bkg"]),
+    ("hlr_subtract_bkg_from_data", ["subtract_bkg_from_data"]),
+    ("hlr_subtract_time_indep_bkg", ["subtract_time_indep_bkg"]),
+    ("hlr_sum_all_spectra", ["sum_all_spectra"]),
+    ("hlr_sum_by_rebin_frac", ["sum_by_rebin_frac"]),
+    ("hlr_sum_spectra_weighted_ave", ["sum_spectra_weighted_ave"]),
+    ("hlr_tof_to_ref_scalar_Q", ["tof_to_ref_scalar_Q"]),
+    ("hlr_zero_bins", ["zero_bins"]),
+    ("hlr_zero_spectra", ["zero_spectra"]),
+    ]
 
 from HLR_version import version as __version__
 
 #version
 __id__ = "$Id$"
+
+hlr_utils.make_lazy_module(__name__, __lazy_imports)
@@ -0,0 +1,382 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+def accumulate_files(filelist, **kwargs):
+    """
+    This function takes a list of data reduction produced files (3-column
+    ASCII or DAVE 2D ASCII for instance) and returns a C{SOM} that is the sum
+    of the data from all the files. Unlike L{add_files}, the running sum is
+    added into the spectra of each new file, so only the running sum and the
+    file being added are held in memory at any time. The files are added in
+    the order given and the ids, axes and attributes come from the last
+    file, so the result is the same as the one from L{add_files}. When an accumulation state is given, only the files
+    that are not part of the state are read and their sum is added to the one
+    in the state. B{It is assumed that the files contain similar data as
+    only crude cross-checks will be made. You have been warned.}
+
+    @param filelist: A list containing the names of the files to sum
+    @type filelist: C{list}
+
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword Data_Paths: This contains the data paths and signals for the
+                         requested detector banks
+    @type Data_Paths: C{tuple} of C{tuple}s
+
+    @keyword dst_type: The type of C{DST} to be created during file read-in.
+                       The default value is found by peeking into the first
+                       file.
+    @type dst_type: C{string}
+
+    @keyword read_ahead: The number of files to parse ahead in worker
+                         processes while the sum is being made. The default
+                         value is I{0} (read the files one after the other).
+    @type read_ahead: C{int}
+
+    @keyword state: The summed data of the files already added. The state is
+                    updated with the new files and written back.
+    @type state: L{AccumulationState}
+
+    @keyword Verbose: This is a flag to turn on print statments. The default is
+                      I{False}.
+    @type Verbose: C{boolean}
+
+    @keyword Timer: This is an SNS Timer object used for showing the
+                    performance timing in the function.
+    @type Timer: C{sns_timing.Timer}
+
+
+    @return: The summed C{SOM.SOM}
+    @rtype: C{SOM.SOM}
+
+
+    @raise SystemExit: If any file cannot be read
+    @raise IndexError: If the files do not contain the same number of spectra
+
+    @raise RuntimeError: If the state was made with different settings or
+                         there are no files to add to an empty state
+    """
+    import hlr_utils
+
+    # Parse keywords
+    try:
+        data_paths = kwargs["Data_Paths"]
+    except KeyError:
+        data_paths = None
+
+    try:
+        dst_type = kwargs["dst_type"]
+    except KeyError:
+        dst_type = hlr_utils.file_peeker(filelist[0])
+
+    try:
+        read_ahead = kwargs["read_ahead"]
+    except KeyError:
+        read_ahead = 0
+
+    try:
+        state = kwargs["state"]
+    except KeyError:
+        state = None
+
+    try:
+        verbose = kwargs["Verbose"]
+    except KeyError:
+        verbose = False
+
+    try:
+        timer = kwargs["Timer"]
+    except KeyError:
+        timer = None
+
+    if state is not None:
+        state.check_settings({"Data_Paths": data_paths,
+                              "dst_type": dst_type})
+
+        filelist = state.get_new_runs(filelist)
+        if not filelist and not state.runs:
+            raise RuntimeError("No files to add to %s" % state.filename)
+        if verbose:
+            print "Adding %d new file(s) to the %d file(s) in %s" \
+                  % (len(filelist), len(state.runs), state.filename)
+
+    if read_ahead > 0 and len(filelist) > 1:
+        d_som1 = __sum_parallel(filelist, dst_type, data_paths, read_ahead,
+                                verbose, timer)
+    else:
+        d_som1 = __sum_serial(filelist, dst_type, data_paths, verbose, timer)
+
+    if state is not None:
+        if d_som1 is not None:
+            state.add(d_som1, filelist, dst_type=dst_type)
+            state.write()
+        d_som1 = state.som
+
+    return d_som1
+
+def __sum_serial(filelist, dst_type, data_paths, verbose, timer):
+    """
+    This function reads the files one after the other and adds each one to
+    the running sum. The spectra of the file being added take the sum, so
+    the ids, axes and attributes come from the later files as in
+    C{common_lib.add_ncerr}.
+    """
+    import array_manip
+
+    d_som1 = None
+
+    for filename in filelist:
+        d_som_t = __read_file(filename, dst_type, data_paths)
+
+        if verbose:
+            print "File:", filename
+
+        if timer is not None:
+            timer.getTime(msg="After reading data")
+
+        if d_som1 is not None:
+            __check_file(d_som_t, len(d_som_t), d_som1, filename,
+                         filelist[0])
+
+            for i in xrange(len(d_som1)):
+                so_sum = d_som1[i]
+                so_t = d_som_t[i]
+                value = array_manip.add_ncerr(so_t.y, so_t.var_y,
+                                              so_sum.y, so_sum.var_y)
+                so_t.y = value[0]
+                so_t.var_y = value[1]
+
+            if timer is not None:
+                timer.getTime(msg="After adding spectra")
+
+        # The later file holds the running sum from now on
+        d_som1 = d_som_t
+        del d_som_t
+
+    if verbose and d_som1 is not None:
+        __print_info(d_som1, dst_type)
+
+    return d_som1
+
+def __sum_parallel(filelist, dst_type, data_paths, read_ahead, verbose,
+                   timer):
+    """
+    This function parses up to read_ahead files ahead in worker processes.
+    The workers only hand back the values and uncertainties of the spectra,
+    which are added in file order into a running buffer. The last file is
+    read here while the workers parse the others and takes the sum, so the
+    ids, axes and attributes come from it as in C{common_lib.add_ncerr}.
+    """
+    import collections
+    import multiprocessing
+    import sys
+
+    import array_manip
+    import SOM
+
+    jobs = [(filename, dst_type, data_paths) for filename in filelist[:-1]]
+
+    pool = multiprocessing.Pool(min(read_ahead, len(jobs)))
+    try:
+        # Only read_ahead files are parsed ahead so the memory stays bounded
+        pending = collections.deque()
+        for job in jobs[:read_ahead]:
+            pending.append(pool.apply_async(__read_spectra, (job,)))
+        next_job = len(pending)
+
+        d_som1 = __read_file(filelist[-1], dst_type, data_paths)
+
+        running = None
+        for filename in filelist[:-1]:
+            spectra = pending.popleft().get()
+            if next_job < len(jobs):
+                pending.append(pool.apply_async(__read_spectra,
+                                                (jobs[next_job],)))
+                next_job += 1
+
+            if spectra is None:
+                # The worker has already reported the failure
+                sys.exit(-1)
+
+            if verbose:
+                print "File:", filename
+
+            if timer is not None:
+                timer.getTime(msg="After reading data")
+
+            (y_units, axis_units, values) = spectra
+            d_som_t = SOM.SOM()
+            d_som_t.setYUnits(y_units)
+            d_som_t.setAllAxisUnits(axis_units)
+            __check_file(d_som_t, len(values), d_som1, filename,
+                         filelist[-1])
+            del d_som_t
+
+            if running is None:
+                running = [(__to_nessi_list(y), __to_nessi_list(var_y))
+                           for (y, var_y) in values]
+            else:
+                for i in xrange(len(running)):
+                    (y, var_y) = values[i]
+                    running[i] = array_manip.add_ncerr(__to_nessi_list(y),
+                                                       __to_nessi_list(var_y),
+                                                       running[i][0],
+                                                       running[i][1])
+
+            if timer is not None:
+                timer.getTime(msg="After adding spectra")
+
+            del spectra
+            del values
+    except:
+        pool.terminate()
+        raise
+
+    pool.close()
+    pool.join()
+
+    if verbose:
+        print "File:", filelist[-1]
+
+    for i in xrange(len(d_som1)):
+        so_t = d_som1[i]
+        value = array_manip.add_ncerr(so_t.y, so_t.var_y,
+                                      running[i][0], running[i][1])
+        so_t.y = value[0]
+        so_t.var_y = value[1]
+
+    if timer is not None:
+        timer.getTime(msg="After adding spectra")
+
+    if verbose:
+        __print_info(d_som1, dst_type)
+
+    return d_som1
+
+def __check_file(d_som_t, length, d_som1, filename, filename1):
+    """
+    This function checks that a file with the units of d_som_t and length
+    spectra can be added to the running sum.
+    """
+    import hlr_utils
+
+    hlr_utils.math_compatible(d_som_t, "SOM", d_som1, "SOM")
+    if length != len(d_som1):
+        raise IndexError("%s does not contain the same number of " \
+                         % filename + "spectra as %s" % filename1)
+
+def __print_info(d_som1, dst_type):
+    """
+    This function prints the size of the summed data.
+    """
+    print "# Signal SO:", len(d_som1)
+    if dst_type != "text/num-info":
+        print "# Data Size:", len(d_som1[0])
+        print "# X-Axis:", len(d_som1[0].axis[0].val)
+        try:
+            axis_len = len(d_som1[0].axis[1].val)
+            print "# Y-Axis:", axis_len
+        except IndexError:
+            pass
+
+def __read_file(filename, dst_type, data_paths):
+    """
+    This function reads a single file into a C{SOM}.
+    """
+    import sys
+
+    import DST
+
+    try:
+        resource = open(filename, "r")
+        data_dst = DST.getInstance(dst_type, resource)
+    except (SystemError, IOError):
+        print "ERROR: Failed to data read file %s" % filename
+        sys.exit(-1)
+
+    som = data_dst.getSOM(data_paths)
+    data_dst.release_resource()
+    resource.close()
+
+    return som
+
+def __read_spectra(job):
+    """
+    This function is run in a worker process. It reads a single file and
+    hands back the units and the values and uncertainties of its spectra as
+    C{array.array}s, which are cheap to send back to the summing process.
+    Single values (I{text/num-info}) are handed back as they are. I{None} is
+    handed back if the file cannot be read.
+    """
+    import array
+
+    (filename, dst_type, data_paths) = job
+
+    try:
+        som = __read_file(filename, dst_type, data_paths)
+    except SystemExit:
+        # A worker must not exit, it would never hand back the file
+        return None
+
+    values = []
+    for so in som:
+        if hasattr(so.y, "__len__"):
+            y = array.array('d', so.y)
+            if so.var_y is None:
+                var_y = None
+            else:
+                var_y = array.array('d', so.var_y)
+        else:
+            y = so.y
+            var_y = so.var_y
+        values.append((y, var_y))
+
+    return (som.getYUnits(), som.getAllAxisUnits(), values)
+
+def __to_nessi_list(values):
+    """
+    This function copies the values handed back by a worker process into a
+    C{NessiList}. Single values are handed back as they are.
+    """
+    import array
+
+    import nessi_list
+
+    if not isinstance(values, array.array):
+        return values
+
+    nlist = nessi_list.NessiList()
+    nlist.extend(values)
+
+    return nlist
+
+if __name__ == "__main__":
+
+    my_files = []
+    my_files.append("REF_L_1845_1.txt")
+    my_files.append("REF_L_1848_1.txt")
+
+    d_som = accumulate_files(my_files, read_ahead=1, Verbose=True)
+
+    print "Length Data:", len(d_som)
@@ -0,0 +1,264 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+import os
+
+import hlr_utils
+
+class AccumulationState(object):
+    """
+    This class keeps the summed raw counts of a set of runs in a state file,
+    so that a reduction can be extended with new runs without reading the
+    runs that have already been added. The state file is a binary dump (see
+    L{hlr_utils.write_binary_dump}) of the summed C{SOM} before any
+    normalization. The C{SOM} attributes, which include the summed proton
+    charge (see L{common_lib.add_ncerr}), are kept with the sum. The names
+    of the runs and the read settings (data paths, ROI, mask) are kept in the
+    header. A state is only extended with runs read with the same settings
+    and binning. The instrument geometry is not kept in the state, so it
+    comes from the runs read in with the state.
+    """
+
+    def __init__(self, filename, dataset_type="data"):
+        """
+        Object constructor
+
+        @param filename: The name of the state file. The file is read if it
+                         exists.
+        @type filename: C{string}
+
+        @param dataset_type: (OPTIONAL) The practical name of the dataset
+                                        being summed. The default value is
+                                        I{data}.
+        @type dataset_type: C{string}
+
+
+        @raise RuntimeError: The state file holds a different dataset
+        """
+        self.filename = filename
+        self.dataset_type = dataset_type
+        self.dst_type = None
+        self.runs = []
+        self.settings = None
+        self.som = None
+
+        if os.path.isfile(filename):
+            self.read()
+
+    def __repr__(self):
+        """
+        This method returns a representation of the state.
+
+        @return: The representation of the state
+        @rtype: C{string}
+        """
+        return "AccumulationState(%s, %s, runs=%d)" % (self.filename,
+                                                       self.dataset_type,
+                                                       len(self.runs))
+
+    def has_run(self, filename):
+        """
+        This method checks if a run has already been added to the state.
+
+        @param filename: The name of the run file
+        @type filename: C{string}
+
+
+        @return: I{True} if the run is part of the sum
+        @rtype: C{boolean}
+        """
+        return os.path.abspath(filename) in self.runs
+
+    def get_new_runs(self, filelist):
+        """
+        This method returns the runs of a list that have not been added to
+        the state yet.
+
+        @param filelist: The names of the run files
+        @type filelist: C{list} of C{string}s
+
+
+        @return: The names of the runs that are not part of the sum
+        @rtype: C{list} of C{string}s
+        """
+        return [filename for filename in filelist \
+                if not self.has_run(filename)]
+
+    def check_settings(self, settings):
+        """
+        This method checks the settings the new runs are read with against
+        the ones of the runs in the state. A state without settings takes
+        the given ones.
+
+        @param settings: The read settings keyed by name
+        @type settings: C{dict}
+
+
+        @raise RuntimeError: The settings differ from the ones of the state
+        """
+        if self.settings is None:
+            self.settings = settings
+            return
+
+        keys = [key for key in settings \
+                if self.settings.get(key) != settings[key]]
+        keys.extend([key for key in self.settings if key not in settings])
+        if keys:
+            keys.sort()
+            raise RuntimeError("%s was made with different settings for: %s" \
+                               % (self.filename, ", ".join(keys)))
+
+    def add(self, som, filelist, **kwargs):
+        """
+        This method adds the summed C{SOM} of some new runs to the state. The
+        spectra are added with L{common_lib.add_ncerr}, so the new runs
+        provide the attributes of the result.
+
+        @param som: The summed raw counts of the new runs
+        @type som: C{SOM.SOM}
+
+        @param filelist: The names of the new run files
+        @type filelist: C{list} of C{string}s
+
+        @param kwargs: A list of keyword arguments that the function accepts:
+
+        @keyword add_nxpars: This is a flag that will turn on adding the
+                             C{SOM.NxParameters} of the attribute lists. The
+                             default is I{False}.
+        @type add_nxpars: C{boolean}
+
+        @keyword dst_type: The type of C{DST} the runs were read with.
+        @type dst_type: C{string}
+
+
+        @raise RuntimeError: A run has already been added to the state
+
+        @raise RuntimeError: The spectra or the binning of the new runs differ
+                             from the ones of the state
+        """
+        try:
+            add_nxpars = kwargs["add_nxpars"]
+        except KeyError:
+            add_nxpars = False
+
+        try:
+            self.dst_type = kwargs["dst_type"]
+        except KeyError:
+            pass
+
+        for filename in filelist:
+            if self.has_run(filename):
+                raise RuntimeError("%s has already been added to %s" \
+                                   % (filename, self.filename))
+
+        if self.som is None:
+            self.som = som
+        else:
+            self.__check_spectra(som)
+
+            import common_lib
+            self.som = common_lib.add_ncerr(som, self.som,
+                                            add_nxpars=add_nxpars)
+
+        self.runs.extend([os.path.abspath(filename) for filename in filelist])
+
+    def read(self):
+        """
+        This method reads the state file.
+
+
+        @raise RuntimeError: The state file holds a different dataset
+        """
+        (self.dst_type, self.som, header) = \
+                        hlr_utils.read_binary_dump(self.filename)
+
+        if header["dataset_type"] != self.dataset_type:
+            raise RuntimeError("%s holds %s and not %s" \
+                               % (self.filename, header["dataset_type"],
+                                  self.dataset_type))
+
+        self.runs = header["runs"]
+        self.settings = header["settings"]
+
+    def write(self):
+        """
+        This method writes the state file. The file is written to a temporary
+        name first, so an interrupted write does not lose the previous state.
+        """
+        tmp_filename = self.filename + ".tmp"
+        hlr_utils.write_binary_dump(tmp_filename, self.dst_type, self.som,
+                                    dataset_type=self.dataset_type,
+                                    runs=self.runs,
+                                    settings=self.settings)
+        os.rename(tmp_filename, self.filename)
+
+    def __check_spectra(self, som):
+        """
+        This method checks that the spectra of a C{SOM} have the ids and
+        axes of the spectra in the state. Each distinct pair of axes is only
+        compared once.
+        """
+        if len(som) != len(self.som):
+            raise RuntimeError("The new runs do not contain the same number "\
+                               +"of spectra as %s" % self.filename)
+
+        checked = {}
+        for (so_new, so_sum) in zip(som, self.som):
+            if so_new.id != so_sum.id:
+                raise RuntimeError("The new runs do not contain the same "\
+                                   +"spectra as %s" % self.filename)
+
+            for (axis_new, axis_sum) in zip(so_new.axis, so_sum.axis):
+                key = (id(axis_new.val), id(axis_sum.val))
+                if key in checked:
+                    continue
+                if list(axis_new.val) != list(axis_sum.val):
+                    raise RuntimeError("The new runs do not have the same "\
+                                       +"binning as %s" % self.filename)
+                checked[key] = True
+
+if __name__ == "__main__":
+    import tempfile
+
+    import hlr_test
+
+    (fd, statename) = tempfile.mkstemp(suffix=".bin")
+    os.close(fd)
+    os.remove(statename)
+
+    state = AccumulationState(statename)
+    state.add(hlr_test.generate_som(), ["run1.nxs"])
+    state.add(hlr_test.generate_som(), ["run2.nxs"])
+    state.write()
+
+    print "********** State"
+    print "* ", state
+    print "* ", state.som[0]
+
+    state = AccumulationState(statename)
+    print "* Read:", state
+    print "* New runs:", state.get_new_runs(["run2.nxs", "run3.nxs"])
+    print "* ", state.som[0]
+
+    os.remove(statename)
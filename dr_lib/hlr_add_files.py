@@ -22,6 +22,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage(timer_key="Timer", label_key="dataset_type")
 def add_files(filelist, **kwargs):
     """
     This function takes a list of U{NeXus<www.nexusformat.org>} files and
@@ -29,6 +32,9 @@ def add_files(filelist, **kwargs):
     (if requested) that is the sum of all the data from the specified files.
     B{It is assumed that the files contain similar data as only crude
     cross-checks will be made. You have been warned.}
+    When an accumulation state is given, only the files that are not part of
+    the state are read and their sum is added to the one in the state, so a
+    reduction can be extended with new runs.
 
     @param filelist: A list containing the names of the files to sum
     @type filelist: C{list}
@@ -45,13 +51,15 @@ def add_files(filelist, **kwargs):
     
     @keyword Signal_ROI: This is the name of a file that contains a list of
                          pixel IDs that will be read from the data file and
-                         stored as a signal C{SOM}
-    @type Signal_ROI: C{string}
+                         stored as a signal C{SOM}. A C{PixelSet}
+                         can only be used with NeXus files.
+    @type Signal_ROI: C{string} or L{hlr_utils.PixelSet}
 
     @keyword Signal_MASK: This is the name of a file that contains a list of
                          pixel IDs that will be read from the data file and
-                         stored as a signal C{SOM}
-    @type Signal_MASK: C{string}    
+                         stored as a signal C{SOM}. A C{PixelSet}
+                         can only be used with NeXus files.
+    @type Signal_MASK: C{string} or L{hlr_utils.PixelSet}    
     
     @keyword dataset_type: The practical name of the dataset being processed.
                            The default value is I{data}.
@@ -61,6 +69,10 @@ def add_files(filelist, **kwargs):
                        The default value is I{application/x-NeXus}.
     @type dst_type: C{string}
     
+    @keyword state: The summed raw counts of the runs already reduced. The
+                    state is updated with the new files and written back.
+    @type state: L{AccumulationState}
+
     @keyword Verbose: This is a flag to turn on print statments. The default is
                       I{False}.
     @type Verbose: C{boolean}
@@ -76,10 +88,14 @@ def add_files(filelist, **kwargs):
     
     @raise SystemExit: If any file cannot be read
     @raise RuntimeError: If both a ROI and MASK file are specified
+
+    @raise RuntimeError: If the state was made with different settings or
+                         there are no files to add to an empty state
     """
     import sys
 
     import common_lib
+    import dr_lib
     import DST
     import hlr_utils
     
@@ -118,6 +134,11 @@ def add_files(filelist, **kwargs):
             # Assume it is a NeXus file, since it is not a DR produced file
             dst_type = "application/x-NeXus"
 
+    try:
+        state = kwargs["state"]
+    except KeyError:
+        state = None
+
     try:
         verbose = kwargs["Verbose"]
     except KeyError:
@@ -132,6 +153,20 @@ def add_files(filelist, **kwargs):
         raise RuntimeError("Cannot specify both ROI and MASK file! Please "\
                            +"choose!")
 
+    if state is not None:
+        state.check_settings({"SO_Axis": so_axis,
+                              "Data_Paths": data_paths,
+                              "Signal_ROI": __pixel_setting(signal_roi),
+                              "Signal_MASK": __pixel_setting(signal_mask),
+                              "dst_type": dst_type})
+
+        filelist = state.get_new_runs(filelist)
+        if not filelist and not state.runs:
+            raise RuntimeError("No files to add to %s" % state.filename)
+        if verbose:
+            print "Adding %d new file(s) to the %d file(s) in %s" \
+                  % (len(filelist), len(state.runs), state.filename)
+
     counter = 0
 
     for filename in filelist:
@@ -140,7 +175,7 @@ def add_files(filelist, **kwargs):
             
         try:
             if dst_type == "application/x-NeXus":
-                data_dst = DST.getInstance(dst_type, filename)
+                data_dst = dr_lib.NeXusReader(filename)
             else:
                 resource = open(filename, "r")
                 data_dst = DST.getInstance(dst_type, resource) 
@@ -231,8 +266,60 @@ def add_files(filelist, **kwargs):
             # Previously written files already have this structure imposed
             pass
 
+    if state is not None:
+        if counter > 0:
+            state.add(d_som1, filelist,
+                      add_nxpars=(dst_type == "application/x-NeXus"),
+                      dst_type=dst_type)
+        elif dst_type == "application/x-NeXus":
+            # The instrument geometry is not part of the state, so it is
+            # taken from the last run. Only the first detector pixel is read
+            # for it.
+            try:
+                pixel_roi = hlr_utils.PixelSet()
+                pixel_roi.add(state.som[0].id)
+                pixel_mask = None
+            except (TypeError, ValueError, IndexError):
+                # Monitor spectra are not detector pixels and are read whole
+                pixel_roi = signal_roi
+                pixel_mask = signal_mask
+
+            data_dst = dr_lib.NeXusReader(state.runs[-1])
+            d_som_t = data_dst.getSOM(data_paths, so_axis,
+                                      roi_file=pixel_roi,
+                                      mask_file=pixel_mask)
+            state.som.attr_list.instrument = d_som_t.attr_list.instrument
+            data_dst.release_resource()
+            del data_dst, d_som_t
+
+        d_som1 = state.som
+
+        if dst_type == "application/x-NeXus":
+            d_som1.attr_list["-".join([dataset_type, "filename"])] = \
+                                                                 state.runs
+
+        if counter > 0:
+            state.write()
+
     return d_som1
 
+def __pixel_setting(pixels):
+    """
+    This function turns a ROI or mask into a setting for an accumulation
+    state. A C{PixelSet} is described by its pixel ranges and a file by its
+    full path.
+    """
+    import os
+
+    import hlr_utils
+
+    if pixels is None:
+        return None
+    elif isinstance(pixels, hlr_utils.PixelSet):
+        return pixels.get_ranges()
+    else:
+        return os.path.abspath(pixels)
+
 if __name__ == "__main__":
 
     my_files = []
@@ -22,6 +22,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage(timer_key="Timer", label_key="dataset_type")
 def add_files_bg(filelist, **kwargs):
     """
     This function takes a list of U{NeXus<www.nexusformat.org>} files and
@@ -79,6 +82,7 @@ def add_files_bg(filelist, **kwargs):
     import sys
 
     import common_lib
+    import dr_lib
     import DST
     import hlr_utils
     
@@ -134,7 +138,7 @@ def add_files_bg(filelist, **kwargs):
             
         try:
             if dst_type == "application/x-NeXus":
-                data_dst = DST.getInstance(dst_type, filename)
+                data_dst = dr_lib.NeXusReader(filename)
             else:
                 resource = open(filename, "r")
                 data_dst = DST.getInstance(dst_type, resource) 
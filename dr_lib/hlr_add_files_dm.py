@@ -22,6 +22,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage(timer_key="Timer", label_key="dataset_type")
 def add_files_dm(filelist, **kwargs):
     """
     This function takes a list of U{NeXus<www.nexusformat.org>} files and
@@ -50,12 +53,12 @@ def add_files_dm(filelist, **kwargs):
     @keyword Signal_ROI: This is the name of a file that contains a list of
                          pixel IDs that will be read from the data file and
                          stored as a signal C{SOM}
-    @type Signal_ROI: C{string}
+    @type Signal_ROI: C{string} or L{hlr_utils.PixelSet}
 
     @keyword Signal_MASK: This is the name of a file that contains a list of
                          pixel IDs that will be read from the data file and
                          stored as a signal C{SOM}
-    @type Signal_MASK: C{string}
+    @type Signal_MASK: C{string} or L{hlr_utils.PixelSet}
 
     @keyword dataset_type: The practical name of the dataset being processed.
                            The default value is I{data}.
@@ -87,7 +90,7 @@ def add_files_dm(filelist, **kwargs):
     import sys
 
     import common_lib
-    import DST
+    import dr_lib
     
     # Parse keywords
     try:
@@ -136,7 +139,6 @@ def add_files_dm(filelist, **kwargs):
         raise RuntimeError("Cannot specify both ROI and MASK file! Please "\
                            +"choose!")
 
-    dst_type = "application/x-NeXus"
     counter = 0
 
     for filename in filelist:
@@ -151,7 +153,7 @@ def add_files_dm(filelist, **kwargs):
             cwp = None
 
         try:
-            data_dst = DST.getInstance(dst_type, filename)
+            data_dst = dr_lib.NeXusReader(filename)
         except SystemError:
             print "ERROR: Failed to data read file %s" % filename
             sys.exit(-1)
@@ -28,6 +28,9 @@ def apply_sas_correct(obj):
       - Multiply counts by the following formula:
             (sin(polar) * cos(polar)) / (1 + tan^2(polar))
 
+    The factors for a C{SOM} are taken from the geometry table attached by
+    L{create_geom_table} or calculated once for each pixel if there is none.
+
     @param obj: The data to apply the corrections to
     @type obj: C{SOM.SOM} or C{SOM.SO}
 
@@ -52,7 +55,12 @@ def apply_sas_correct(obj):
         pass
 
     if o_descr == "SOM":
-        inst = obj.attr_list.instrument
+        # The correction factors come from the geometry table
+        import dr_lib
+        geom_table = dr_lib.get_geom_table(obj)
+        if geom_table is None:
+            geom_table = dr_lib.GeomTable()
+        return geom_table.apply(obj, "sas_correct")
     else:
         inst = None
     
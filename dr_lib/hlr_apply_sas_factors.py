@@ -0,0 +1,225 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+def apply_sas_factors(obj, **kwargs):
+    """
+    This function applies the SAS correction chain to wavelength spectra in
+    one pass. The corrections are turned into factor vectors and each
+    spectrum is multiplied by its combined factor:
+      - the detector efficiency (see L{correct_det_eff}) and the transmission
+        monitor rebinned onto the spectrum axis (see L{normalize_to_monitor})
+        give the factor 1 / (efficiency * transmission), which is made once
+        for each distinct axis in the data
+      - the geometrical correction (see L{apply_sas_correct}) gives a factor
+        for each pixel, taken from the geometry table of the data
+
+    The result is the same as applying the corrections one after the other,
+    but no intermediate C{SOM}s are created. The geometrical correction can
+    be applied in wavelength since the factors do not depend on the axis.
+
+    @param obj: Object containing the wavelength spectra to correct
+    @type obj: C{SOM.SOM}
+
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword det_eff: A flag for dividing by the detector efficiency. The
+                      default is I{False}.
+    @type det_eff: C{boolean}
+
+    @keyword inst_name: The short name of an instrument for the detector
+                        efficiency.
+    @type inst_name: C{string}
+
+    @keyword eff_scale_const: Use this provided efficiency scaling constant.
+    @type eff_scale_const: L{hlr_utils.DrParameter}
+
+    @keyword eff_atten_const: Use this provided efficiency attenuation
+                              constant.
+    @type eff_atten_const: L{hlr_utils.DrParameter}
+
+    @keyword trans_mon: Object containing the transmission monitor spectrum
+                        to divide by. The default is I{None} (no division).
+    @type trans_mon: C{SOM.SOM}
+
+    @keyword rtype: A short string that defines the rebinning function for
+                    the transmission monitor. See L{rebin_monitor} for the
+                    possibilities. The default is I{None} which uses
+                    L{common_lib.rebin_axis_1D()}.
+    @type rtype: C{string}
+
+    @keyword sas_correct: A flag for applying the geometrical correction. The
+                          default is I{False}.
+    @type sas_correct: C{boolean}
+
+
+    @return: Object containing the corrected spectra
+    @rtype: C{SOM.SOM}
+
+
+    @raise TypeError: obj or trans_mon is not a C{SOM}
+    @raise RuntimeError: The C{SOM} x-axis units are not I{Angstroms}
+    """
+    # import the helper functions
+    import hlr_utils
+
+    # set up for working through data
+    o_descr = hlr_utils.get_descr(obj)
+
+    if o_descr != "SOM":
+        raise TypeError("Only SOM objects permitted for the SAS corrections")
+
+    # Check for keywords
+    det_eff = kwargs.get("det_eff", False)
+    trans_mon = kwargs.get("trans_mon")
+    rtype = kwargs.get("rtype")
+    sas_correct = kwargs.get("sas_correct", False)
+
+    eff_kwargs = {}
+    for key in ("inst_name", "eff_scale_const", "eff_atten_const"):
+        eff_kwargs[key] = kwargs.get(key)
+
+    if not det_eff and trans_mon is None and not sas_correct:
+        return obj
+
+    if not obj.hasAxisUnits("Angstroms"):
+        raise RuntimeError("Incoming object must has a wavelength axis "\
+                           +"with units of Angstroms!")
+
+    import dr_lib
+
+    if trans_mon is not None:
+        m_descr = hlr_utils.get_descr(trans_mon)
+        if m_descr != "SOM":
+            raise TypeError("Only SOM-SOM normalization is supported")
+
+        hlr_utils.math_compatible(obj, o_descr, trans_mon, m_descr)
+
+        # Set the name of the rebinning function
+        rebin_function_name = "rebin_axis_1D"
+        if rtype is not None:
+            rebin_function_name += "_" + str(rtype)
+
+        import common_lib
+        rebin_function = getattr(common_lib, rebin_function_name)
+
+        mon_so = hlr_utils.get_value(trans_mon, 0, m_descr, "all")
+
+    # The geometrical correction factors in the order of the spectra
+    if sas_correct:
+        geom_table = dr_lib.get_geom_table(obj)
+        if geom_table is None:
+            geom_table = dr_lib.GeomTable()
+        scales = geom_table.get_column("sas_correct", obj)
+    else:
+        scales = None
+
+    (result, res_descr) = hlr_utils.empty_result(obj)
+    result = hlr_utils.copy_som_attr(result, res_descr, obj, o_descr,
+                                     trans_mon, "SOM")
+
+    import array_manip
+
+    # The axis factor vectors keyed by the identity of the axis
+    axis_factors = {}
+
+    for i in xrange(len(obj)):
+        so = obj[i]
+        x_axis = so.axis[0].val
+
+        try:
+            factor = axis_factors[id(x_axis)]
+        except KeyError:
+            if trans_mon is not None:
+                mon_value = rebin_function(mon_so, x_axis)
+            else:
+                mon_value = None
+            factor = __make_axis_factor(x_axis, det_eff, eff_kwargs,
+                                        mon_value)
+            axis_factors[id(x_axis)] = factor
+
+        if factor is None:
+            value = (so.y, so.var_y)
+        else:
+            value = array_manip.mult_ncerr(so.y, so.var_y,
+                                           factor[0], factor[1])
+
+        if scales is not None:
+            value = array_manip.mult_ncerr(value[0], value[1], scales[i], 0.0)
+
+        hlr_utils.result_insert(result, res_descr, value, so, "y")
+
+    return result
+
+def __make_axis_factor(x_axis, det_eff, eff_kwargs, mon_value):
+    """
+    This function creates the factor 1 / (efficiency * transmission) and its
+    error^2 for a wavelength axis. I{None} is returned if there is neither
+    an efficiency nor a transmission.
+    """
+    import array_manip
+
+    denominator = None
+
+    if det_eff:
+        import dr_lib
+        denominator = dr_lib.get_det_eff(x_axis, **eff_kwargs)
+
+    if mon_value is not None:
+        if denominator is None:
+            denominator = (mon_value.y, mon_value.var_y)
+        else:
+            denominator = array_manip.mult_ncerr(denominator[0],
+                                                 denominator[1],
+                                                 mon_value.y, mon_value.var_y)
+
+    if denominator is None:
+        return None
+
+    return array_manip.div_ncerr(1.0, 0.0, denominator[0], denominator[1])
+
+if __name__ == "__main__":
+    import hlr_test
+    import SOM
+
+    som1 = SOM.SOM()
+    som1.setAllAxisUnits(["Angstroms"])
+    so1 = SOM.SO(construct=True)
+    so1.id = 1
+    so1.axis[0].val.extend(range(0, 7, 2))
+    so1.y.extend(0.994, 0.943, 0.932)
+    so1.var_y.extend(0.010, 0.012, 0.013)
+    som1.append(so1)
+
+    som2 = hlr_test.generate_som()
+    som2.setAllAxisUnits(["Angstroms"])
+
+    print "********** SOM1"
+    print "* ", som1[0]
+
+    print "********** SOM2"
+    print "* ", som2[0]
+
+    print "********** apply_sas_factors"
+    print "* som :", apply_sas_factors(som2, det_eff=True, trans_mon=som1,
+                                       rtype="frac")
@@ -228,7 +228,7 @@ def calc_BSS_EQ_verticies(*args):
     return ((Q_1[0], E_t_1[0]), (Q_2[0], E_t_2[0]),
             (Q_3[0], E_t_3[0]), (Q_4[0], E_t_4[0]))
 
-def calc_BSS_solid_angle(map_so, inst):
+def calc_BSS_solid_angle(map_so, inst, **kwargs):
     """
     This function calculates the solid angle for a given BSS detector pixel
 
@@ -238,10 +238,24 @@ def calc_BSS_solid_angle(map_so, inst):
     @param inst: The object containing the instrument geometry
     @type inst: C{SOM.Instrument} or C{SOM.CompositeInstrument}
 
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword geom_table: A geometry table to take the solid angle from. The
+                         solid angle is calculated if the pixel is not in the
+                         table.
+    @type geom_table: L{dr_lib.GeomTable}
+
 
     @return: The solid angle for the given pixel
     @rtype: C{float}
     """
+    geom_table = kwargs.get("geom_table")
+    if geom_table is not None:
+        try:
+            return geom_table.get_value("bss_solid_angle", map_so.id)
+        except KeyError:
+            pass
+
     # Get polar angle from instrument information
     angle_tuple = hlr_utils.get_parameter("polar", map_so, inst)
     angle = angle_tuple[0]
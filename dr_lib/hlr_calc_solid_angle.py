@@ -71,7 +71,7 @@ def calc_solid_angle(inst, pix, **kwargs):
         x2 = hlr_utils.get_parameter("x-offset", npix, inst)
 
     # Pixel offsets are in meters
-    xdiff = math.fabs(x2 - x1)
+    xdiff = math.fabs(x2[0] - x1[0])
 
     # Get y pixel size
     y1 = hlr_utils.get_parameter("y-offset", pix, inst)
@@ -85,7 +85,7 @@ def calc_solid_angle(inst, pix, **kwargs):
         y2 = hlr_utils.get_parameter("y-offset", npix, inst)
 
     # Pixel offsets are in meters
-    ydiff = math.fabs(y2 - y1)
+    ydiff = math.fabs(y2[0] - y1[0])
 
     # Make pixel area
     pix_area = xdiff * ydiff
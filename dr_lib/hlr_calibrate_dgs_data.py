@@ -22,6 +22,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage(label_key="dataset_type")
 def calibrate_dgs_data(datalist, conf, dkcur, **kwargs):
     """
     This function combines Steps 3 through 6 in Section 2.1.1 of the data
@@ -124,14 +127,13 @@ def calibrate_dgs_data(datalist, conf, dkcur, **kwargs):
         t.setOldTime(oldtime)
         t.getTime(msg="After reading %s file" % dataset_type)
 
-    # Cut the spectra if necessary
-    dp_somA = dr_lib.cut_spectra(dp_som0, conf.tof_cut_min, conf.tof_cut_max)
-
-    del dp_som0
-
-    dp_somB = dr_lib.fix_bin_contents(dp_somA)
+    # Cut the spectra if necessary and divide by the bin widths
+    dp_pipe = dr_lib.SpectrumPipeline(dp_som0)
+    dp_pipe.cut_spectra(conf.tof_cut_min, conf.tof_cut_max)
+    dp_pipe.fix_bin_contents()
+    dp_somB = dp_pipe.run()
 
-    del dp_somA
+    del dp_som0, dp_pipe
 
     if dp_somB.attr_list.instrument.get_name() != "CNCS":
 
@@ -330,8 +332,10 @@ def calibrate_dgs_data(datalist, conf, dkcur, **kwargs):
         if t is not None:
             t.getTime(False)
 
+        # The SOM form is only needed for writing out the background
         TIB = dr_lib.determine_time_indep_bkg(dp_som2, conf.tib_range,
-                                              is_range=True)
+                                              is_range=True,
+                                              as_list=not conf.dump_tib)
 
         if t is not None:
             t.getTime(msg="After determining TIB constant from %s" \
@@ -342,6 +346,7 @@ def calibrate_dgs_data(datalist, conf, dkcur, **kwargs):
                                                         conf.tib_range[1])
         
             hlr_utils.write_file(conf.output, "text/num-info", TIB,
+                                 dump_format=conf.dump_format,
                                  output_ext="tib",
                                  extra_tag=dataset_type,
                                  verbose=conf.verbose,
@@ -374,6 +379,7 @@ def calibrate_dgs_data(datalist, conf, dkcur, **kwargs):
     if conf.dump_ctof_comb:
         dp_som3_1 = dr_lib.sum_all_spectra(dp_som3)
         hlr_utils.write_file(conf.output, "text/Spec", dp_som3_1,
+                             dump_format=conf.dump_format,
                              output_ext="ctof",
                              extra_tag=dataset_type,
                              data_ext=conf.ext_replacement,    
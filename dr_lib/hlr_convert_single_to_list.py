@@ -98,7 +98,7 @@ def convert_single_to_list(funcname, number, som, **kwargs):
     import common_lib
 
     # Get the common_lib function object
-    func = common_lib.__getattribute__(funcname)
+    func = getattr(common_lib, funcname)
 
     # Setup inclusive dictionary containing the requested keywords for all
     # common_lib axis conversion functions
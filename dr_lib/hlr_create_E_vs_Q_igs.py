@@ -27,6 +27,7 @@ import axis_manip
 import hlr_utils
 import SOM
 
+@hlr_utils.profile_stage()
 def create_E_vs_Q_igs(som, *args, **kwargs):
     """
     This function starts with the initial IGS wavelength axis and turns this
@@ -89,6 +90,11 @@ def create_E_vs_Q_igs(som, *args, **kwargs):
     @keyword configure: This is the object containing the driver configuration.
     @type configure: C{Configure}
 
+    @keyword timer: Timing object so the function can perform timing
+                    estimates. If it is a L{hlr_utils.Profiler}, the time
+                    spent on every rebinned pixel is added to a histogram.
+    @type timer: L{hlr_utils.Profiler} or C{sns_timing.DiffTime}
+
 
     @return: Object containing a 2D C{SO} with E and Q axes
     @rtype: C{SOM.SOM}
@@ -215,11 +221,20 @@ def create_E_vs_Q_igs(som, *args, **kwargs):
     import dr_lib
     import utils
 
+    geom_table = dr_lib.get_geom_table(som)
+
+    profiler = hlr_utils.get_profiler(kwargs.get("timer"))
+    if profiler is not None:
+        import time
+
     arr_len = 0
     #: Vector of zeros for function calculations
     zero_vec = None
     
     for j in xrange(hlr_utils.get_length(som)):
+        if profiler is not None:
+            pix_start = time.time()
+
         # Get counts
         counts = hlr_utils.get_value(som, j, "SOM", "y")
         counts_err2 = hlr_utils.get_err2(som, j, "SOM", "y")
@@ -419,7 +434,8 @@ def create_E_vs_Q_igs(som, *args, **kwargs):
 
         if configure.dump_pix_contrib or configure.scale_sqe:
             if inst_name == "BSS":
-                dOmega = dr_lib.calc_BSS_solid_angle(map_so, inst)
+                dOmega = dr_lib.calc_BSS_solid_angle(map_so, inst,
+                                                     geom_table=geom_table)
                 (bin_count_new,
                  bin_count_err2) = array_manip.mult_ncerr(bin_count_new,
                                                           bin_count_err2,
@@ -432,6 +448,9 @@ def create_E_vs_Q_igs(som, *args, **kwargs):
                                                          bin_count_err2)
         else:
             del bin_count_new
+
+        if profiler is not None:
+            profiler.add_sample("pixel time (s)", time.time() - pix_start)
                 
     # Check for so_id keyword argument
     try:
@@ -458,6 +477,7 @@ def create_E_vs_Q_igs(som, *args, **kwargs):
 
         # Write out pixel contribution into file
         hlr_utils.write_file(configure.output, "text/Dave2d", som1,
+                             dump_format=configure.dump_format,
                              output_ext="pcs",
                              verbose=configure.verbose,
                              data_ext=configure.ext_replacement,         
@@ -22,6 +22,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage()
 def create_Qvec_vs_E_dgs(som, E_i, conf, **kwargs):
     """
     This function starts with the energy transfer axis from DGS reduction and
@@ -255,6 +258,7 @@ def create_Qvec_vs_E_dgs(som, E_i, conf, **kwargs):
     print >> hfile, jobstr
     print >> hfile, linestr
     hfile.close()
+    hlr_utils.record_output(hfile.name)
 
     import utils
     use_zero_supp = not conf.no_zero_supp
@@ -299,8 +303,10 @@ def create_Qvec_vs_E_dgs(som, E_i, conf, **kwargs):
                 print >> ofile1, " ".join(result1)
 
         ofile.close()
+        hlr_utils.record_output(ofile.name)
         if make_fixed:
             ofile1.close()
+            hlr_utils.record_output(ofile1.name)
 
     if t is not None:
         t.getTime(msg="After creating messages ")
@@ -22,13 +22,14 @@
 
 # $Id$
 
-def create_axis_from_data(obj, **kwargs):
+def find_axis_range(obj, **kwargs):
     """
     This function inspects the independent axis of the data searching for the
-    minimum and maximum axis values. It also determines the bin width from
-    the first bin in the axis and searches for the smallest value. From these
-    values, an Axis object is created. This function assusmes that the axis is
-    sorted in ascending order.
+    minimum and maximum axis values, skipping infinite values at either end.
+    It also determines the bin width from the first bin in the axis and
+    searches for the smallest value. Each distinct axis array is only
+    inspected once, so spectra sharing their axis cost nothing extra. This
+    function assumes that the axis is sorted in ascending order.
 
     @param obj: The object containing the data with the indpendent axis to be
     searched.
@@ -44,8 +45,9 @@ def create_axis_from_data(obj, **kwargs):
     @type width: C{float}
 
 
-    @return: The axis based on the found values from the data
-    @rtype: L{hlr_utils.Axis}
+    @return: The axis minimum, maximum and bin width. These can be given
+             directly to L{hlr_utils.make_axis}.
+    @rtype: C{tuple} of three C{float}s
 
 
     @raise TypeError: The incoming object is not a C{SOM} or a C{SO}
@@ -76,37 +78,69 @@ def create_axis_from_data(obj, **kwargs):
     # Set extreme values for axis minimum and maximum
     axis_min = 999999999999999999999999999999999999
     axis_max = -99999999999999999999999999999999999
-    
+
+    neg_inf = float('-inf')
+    pos_inf = float('inf')
+
+    # Identities of the axis arrays already inspected
+    seen = {}
+
     # iterate through the values
     for i in xrange(hlr_utils.get_length(obj)):
         axis = hlr_utils.get_value(obj, i, o_descr, "x", axis_pos)
 
+        if id(axis) in seen:
+            continue
+        # Keep the axis alive so its identity cannot be reused
+        seen[id(axis)] = axis
+
         min_index = 0
+        while axis[min_index] == neg_inf:
+            min_index += 1
+
         max_index = -1
+        while axis[max_index] == pos_inf:
+            max_index -= 1
 
-        index_ok = False
-        while not index_ok:
-            value = axis[min_index]
-            if value == float('-inf'):
-                min_index += 1
-            else:
-                index_ok = True
-                
         axis_min = min(axis_min, axis[min_index])
-
-        index_ok = False
-        while not index_ok:
-            value = axis[max_index]
-            if value == float('inf'):
-                max_index -= 1
-            else:
-                index_ok = True
-
         axis_max = max(axis_max, axis[max_index])
 
         if not width_given:
             test_width = axis[min_index+1] - axis[min_index]
             axis_width = min(axis_width, test_width)
 
-    return hlr_utils.Axis(axis_min, axis_max, axis_width)
+    return (axis_min, axis_max, axis_width)
 
+def create_axis_from_data(obj, **kwargs):
+    """
+    This function inspects the independent axis of the data searching for the
+    minimum and maximum axis values. It also determines the bin width from
+    the first bin in the axis and searches for the smallest value. From these
+    values, an Axis object is created. This function assusmes that the axis is
+    sorted in ascending order. The search is done by L{find_axis_range}.
+
+    @param obj: The object containing the data with the indpendent axis to be
+    searched.
+    @type obj: C{SOM.SOM} or C{SOM.SO}
+
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword axis_pos: This is position of the axis in the axis array. If no
+                       argument is given, the default value is 0
+    @type axis_pos: C{int}
+
+    @keyword width: A override parameter for specifying the axis bin width.
+    @type width: C{float}
+
+
+    @return: The axis based on the found values from the data
+    @rtype: L{hlr_utils.Axis}
+
+
+    @raise TypeError: The incoming object is not a C{SOM} or a C{SO}
+    """
+    import hlr_utils
+
+    (axis_min, axis_max, axis_width) = find_axis_range(obj, **kwargs)
+
+    return hlr_utils.Axis(axis_min, axis_max, axis_width)
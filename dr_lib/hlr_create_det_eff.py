@@ -24,12 +24,146 @@
 
 import hlr_utils
 
+# Maximum number of efficiency curves kept in the cache
+EFF_CACHE_SIZE = 32
+
+# Efficiency curves keyed by the axis and instrument constants. The key list
+# holds the keys in order of use with the most recent at the end.
+__eff_cache = {}
+__eff_keys = []
+
+def __param_key(param):
+    """
+    This function creates a cache key component from a parameter.
+
+    @param param: The parameter to make a key component from
+    @type param: L{hlr_utils.DrParameter} or C{None}
+
+
+    @return: The key component
+    @rtype: C{tuple} or C{None}
+    """
+    if param is None:
+        return None
+    else:
+        return (param.getValue(), param.getError())
+
+def __calc_det_eff(axis, inst_name, eff_scale_const, eff_atten_const):
+    """
+    This function calculates the detector efficiency for a single wavelength
+    axis.
+
+    @param axis: The wavelength axis to calculate the efficiency on
+    @type axis: C{nessi_list.NessiList}
+
+    @param inst_name: The short name of an instrument.
+    @type inst_name: C{string}
+
+    @param eff_scale_const: The efficiency scaling constant.
+    @type eff_scale_const: L{hlr_utils.DrParameter}
+
+    @param eff_atten_const: The efficiency attenuation constant.
+    @type eff_atten_const: L{hlr_utils.DrParameter}
+
+
+    @return: The efficiency and its error^2
+    @rtype: C{tuple} of two C{nessi_list.NessiList}s
+
+
+    @raise RuntimeError: The instrument is not supported
+    """
+    if inst_name is None:
+        import phys_corr
+        import utils
+        axis_bc = utils.calc_bin_centers(axis)
+        return phys_corr.exp_detector_eff(axis_bc[0], 1.0, 0.0, 1.0)
+    elif inst_name == "SANS":
+        import dr_lib
+        return dr_lib.subexp_eff(eff_atten_const, axis, eff_scale_const)
+    else:
+        raise RuntimeError("Do not know how to handle %s instrument" \
+                           % inst_name)
+
+def get_det_eff(axis, **kwargs):
+    """
+    This function returns the detector efficiency for a wavelength axis. The
+    efficiency curves are cached by the axis values and the instrument
+    constants, so spectra with the same axis, within one call or across
+    reduction runs, only calculate the curve once. The least recently used
+    curve is discarded when the cache holds more than L{EFF_CACHE_SIZE}
+    curves. The returned arrays are shared with the cache and must not be
+    modified in place.
+
+    @param axis: The wavelength axis to calculate the efficiency on
+    @type axis: C{nessi_list.NessiList}
+    
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword inst_name: The short name of an instrument.
+    @type inst_name: C{string}
+    
+    @keyword eff_scale_const: Use this provided efficiency scaling constant.
+    @type eff_scale_const: L{hlr_utils.DrParameter}
+
+    @keyword eff_atten_const: Use this provided efficiency attenuation
+                              constant.
+    @type eff_atten_const: L{hlr_utils.DrParameter}
+
+    @keyword axis_key: The cache key for the axis values. This is created
+                       from the axis if not provided.
+    @type axis_key: C{tuple}
+
+
+    @return: The efficiency and its error^2
+    @rtype: C{tuple} of two C{nessi_list.NessiList}s
+
+
+    @raise RuntimeError: The instrument is not supported
+    """
+    # Check keywords
+    inst_name = kwargs.get("inst_name")
+    eff_scale_const = kwargs.get("eff_scale_const")
+    eff_atten_const = kwargs.get("eff_atten_const")
+    axis_key = kwargs.get("axis_key")
+
+    if axis_key is None:
+        axis_key = tuple(axis)
+
+    key = (axis_key, inst_name, __param_key(eff_scale_const),
+           __param_key(eff_atten_const))
+
+    try:
+        value = __eff_cache[key]
+    except KeyError:
+        value = __calc_det_eff(axis, inst_name, eff_scale_const,
+                               eff_atten_const)
+        __eff_cache[key] = value
+        if len(__eff_keys) >= EFF_CACHE_SIZE:
+            del __eff_cache[__eff_keys.pop(0)]
+    else:
+        __eff_keys.remove(key)
+
+    __eff_keys.append(key)
+
+    return value
+
+def clear_det_eff_cache():
+    """
+    This function removes all of the efficiency curves from the cache used by
+    L{get_det_eff}.
+    """
+    __eff_cache.clear()
+    del __eff_keys[:]
+
 def create_det_eff(obj, **kwargs):
     """
     This function creates detector efficiency spectra based on the wavelength
     spectra from the given object. The efficiency spectra are created based on
     the following formalism: Ci*exp(-di*lambda) where i represents the
-    constants for a given detector pixel.
+    constants for a given detector pixel. The efficiency curves come from
+    L{get_det_eff}, so spectra with the same axis share the efficiency
+    arrays. To correct data for the detector efficiency without creating the
+    efficiency spectra, use L{correct_det_eff}.
 
     @param obj: Object containing spectra that will create the detector
                 efficiency spectra.
@@ -55,11 +189,6 @@ def create_det_eff(obj, **kwargs):
     @raise TypeError: Incoming object is not a C{SOM} or a C{SO}
     @raise RuntimeError: The C{SOM} x-axis units are not I{Angstroms}
     """
-    # Check keywords
-    inst_name = kwargs.get("inst_name")
-    eff_scale_const = kwargs.get("eff_scale_const")
-    eff_atten_const = kwargs.get("eff_atten_const")
-
     # set up for working through data
     (result, res_descr) = hlr_utils.empty_result(obj)
     o_descr = hlr_utils.get_descr(obj)
@@ -76,10 +205,8 @@ def create_det_eff(obj, **kwargs):
 
     result = hlr_utils.copy_som_attr(result, res_descr, obj, o_descr)
 
-    # iterate through the values
-    import dr_lib
-    import phys_corr
-    import utils
+    # Cache keys for the axis values keyed by the identity of the axis
+    axis_keys = {}
 
     # Get object length
     len_obj = hlr_utils.get_length(obj)
@@ -87,22 +214,84 @@ def create_det_eff(obj, **kwargs):
         map_so = hlr_utils.get_map_so(obj, None, i)
         axis = hlr_utils.get_value(obj, i, o_descr, "x", 0)
 
-        if inst_name is None:
-            axis_bc = utils.calc_bin_centers(axis)
-            (eff, eff_err2) = phys_corr.exp_detector_eff(axis_bc[0], 1.0,
-                                                         0.0, 1.0)
-        else:
-            if inst_name == "SANS":
-                (eff, eff_err2) = dr_lib.subexp_eff(eff_atten_const, axis,
-                                                    eff_scale_const)
-            else:
-                raise RuntimeError("Do not know how to handle %s instrument" \
-                                   % inst_name)
+        try:
+            axis_key = axis_keys[id(axis)]
+        except KeyError:
+            axis_key = tuple(axis)
+            axis_keys[id(axis)] = axis_key
+
+        (eff, eff_err2) = get_det_eff(axis, axis_key=axis_key, **kwargs)
         
         hlr_utils.result_insert(result, res_descr, (eff, eff_err2), map_so)
     
     return result
 
+def correct_det_eff(obj, **kwargs):
+    """
+    This function divides the spectra of the given object by the detector
+    efficiency. It gives the same result as dividing the object by the
+    spectra from L{create_det_eff} with L{common_lib.div_ncerr}, but the
+    efficiency spectra are never created. The efficiency curves come from
+    L{get_det_eff}. The spectra of the incoming object are replaced by the
+    corrected spectra.
+
+    @param obj: Object containing wavelength spectra to correct
+    @type obj: C{SOM.SOM} or C{SOM.SO}
+    
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword inst_name: The short name of an instrument.
+    @type inst_name: C{string}
+    
+    @keyword eff_scale_const: Use this provided efficiency scaling constant.
+    @type eff_scale_const: L{hlr_utils.DrParameter}
+
+    @keyword eff_atten_const: Use this provided efficiency attenuation
+                              constant.
+    @type eff_atten_const: L{hlr_utils.DrParameter}    
+
+
+    @return: The incoming object with the corrected spectra
+    @rtype: C{SOM.SOM} or C{SOM.SO}
+
+
+    @raise TypeError: Incoming object is not a C{SOM} or a C{SO}
+    @raise RuntimeError: The C{SOM} x-axis units are not I{Angstroms}
+    """
+    o_descr = hlr_utils.get_descr(obj)
+
+    if o_descr == "SOM":
+        if not obj.hasAxisUnits("Angstroms"):
+            raise RuntimeError("Incoming object must has a wavelength axis "\
+                               +"with units of Angstroms!")
+        so_list = obj
+    elif o_descr == "SO":
+        so_list = [obj]
+    else:
+        raise TypeError("Only SOM or SO objects permitted to correct for "\
+                        +"detector efficiency!")
+
+    import array_manip
+
+    # Cache keys for the axis values keyed by the identity of the axis
+    axis_keys = {}
+
+    for so in so_list:
+        axis = so.axis[0].val
+
+        try:
+            axis_key = axis_keys[id(axis)]
+        except KeyError:
+            axis_key = tuple(axis)
+            axis_keys[id(axis)] = axis_key
+
+        (eff, eff_err2) = get_det_eff(axis, axis_key=axis_key, **kwargs)
+
+        (so.y, so.var_y) = array_manip.div_ncerr(so.y, so.var_y,
+                                                 eff, eff_err2)
+
+    return obj
+
 if __name__ == "__main__":
     import hlr_test
 
@@ -115,5 +304,7 @@ if __name__ == "__main__":
     print "********** create_det_eff"
     print "* som: ", create_det_eff(som1)
     print "* som: ", create_det_eff(som1, inst_name="SANS",
-                                    eff_const=hlr_utils.DrParameter(0.2477,
-                                                                    0.0))
+                         eff_atten_const=hlr_utils.DrParameter(0.2477, 0.0))
+
+    print "********** correct_det_eff"
+    print "* som: ", correct_det_eff(som1)
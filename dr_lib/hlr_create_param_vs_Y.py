@@ -137,7 +137,6 @@ def create_param_vs_Y(som, param, param_func, param_axis, **kwargs):
 
     # Setup some variables 
     dim = 2
-    N_tot = 1
 
     # Create 2D spectrum object
     so_dim = SOM.SO(dim)
@@ -170,29 +169,35 @@ def create_param_vs_Y(som, param, param_func, param_axis, **kwargs):
         for i in xrange(len_param_axis):
             prarr.append(nessi_list.NessiList())
         # Get the parameters for all the spectra
-        ppfunc = hlr_utils.__getattribute__("param_array")
+        ppfunc = hlr_utils.param_array
         prarr_lookup = ppfunc(som1, prpar)
 
     # Get the parameter lookup array
-    pfunc = hlr_utils.__getattribute__(param_func)
+    pfunc = getattr(hlr_utils, param_func)
     lookup_array = pfunc(som1, param)
 
-    # Create y and var_y lists from total 2D size
-    N_tot = len_param_axis * len_arb_axis
-    so_dim.y = nessi_list.NessiList(N_tot)
-    so_dim.var_y = nessi_list.NessiList(N_tot)
+    # Find the parameter bin for all spectra up front
+    len_som = hlr_utils.get_length(som1)
+    bin_indicies = [utils.bisect_helper(param_axis, lookup_array[i])
+                    for i in xrange(len_som)]
+
+    # Accumulate the spectra into one stripe per parameter bin. This only
+    # touches the stripe a spectrum lands in instead of the whole 2D array.
+    bin_y = [nessi_list.NessiList(len_arb_axis)
+             for i in xrange(len_param_axis)]
+    bin_var_y = [nessi_list.NessiList(len_arb_axis)
+                 for i in xrange(len_param_axis)]
     if rebin_axis is not None:
-        frac_area = nessi_list.NessiList(N_tot)
-        frac_area_err2 = nessi_list.NessiList(N_tot)
+        bin_area = [nessi_list.NessiList(len_arb_axis)
+                    for i in xrange(len_param_axis)]
+        bin_area_err2 = [nessi_list.NessiList(len_arb_axis)
+                         for i in xrange(len_param_axis)]
 
-    # Loop through data and create 2D spectrum
-    len_som = hlr_utils.get_length(som1)
     for i in xrange(len_som):
         val = hlr_utils.get_value(som1, i, "SOM", "y")
         err2 = hlr_utils.get_err2(som1, i, "SOM", "y")
 
-        bin_index = utils.bisect_helper(param_axis, lookup_array[i])
-        start = bin_index * len_arb_axis
+        bin_index = bin_indicies[i]
 
         if pixnorm:
             pixarr[bin_index] += 1
@@ -200,25 +205,16 @@ def create_param_vs_Y(som, param, param_func, param_axis, **kwargs):
         if prnorm:
             prarr[bin_index].append(prarr_lookup[i])
 
-        (so_dim.y, so_dim.var_y) = array_manip.add_ncerr(so_dim.y,
-                                                         so_dim.var_y,
-                                                         val,
-                                                         err2,
-                                                         a_start=start)
+        (bin_y[bin_index],
+         bin_var_y[bin_index]) = array_manip.add_ncerr(bin_y[bin_index],
+                                                       bin_var_y[bin_index],
+                                                       val, err2)
         if rebin_axis is not None:
             val1 = hlr_utils.get_value(som2, i, "SOM", "y")
             err1_2 = hlr_utils.get_err2(som2, i, "SOM", "y")
-            (frac_area, frac_area_err2) = array_manip.add_ncerr(frac_area,
-                                                                frac_area_err2,
-                                                                val1,
-                                                                err1_2,
-                                                                a_start=start)
-
-    if rebin_axis is not None:
-        (so_dim.y, so_dim.var_y) = array_manip.div_ncerr(so_dim.y,
-                                                         so_dim.var_y,
-                                                         frac_area,
-                                                         frac_area_err2)
+            (bin_area[bin_index],
+             bin_area_err2[bin_index]) = array_manip.add_ncerr(\
+                bin_area[bin_index], bin_area_err2[bin_index], val1, err1_2)
 
     # If parameter range normalization enabled, find the range for the
     # parameter
@@ -236,69 +232,53 @@ def create_param_vs_Y(som, param, param_func, param_axis, **kwargs):
                 min_val = 0.0
             prrange[i] = math.fabs(max_val - min_val)
 
-    # If pixel normalization tracking enabled, divided slices by pixel counts
-    if pixnorm or prnorm:
-        tmp_y = nessi_list.NessiList(N_tot)
-        tmp_var_y = nessi_list.NessiList(N_tot)
+    if binnorm:
+        if rebin_axis is not None:
+            bin_const = utils.calc_bin_widths(rebin_axis)
+        else:
+            bin_const = utils.calc_bin_widths(som1[0].axis[1].val)
 
-        for i in range(len_param_axis):
-            start = i * len_arb_axis
-            end = (i + 1) * len_arb_axis
+    # Apply the normalizations to each stripe and assemble the 2D spectrum
+    so_dim.y = nessi_list.NessiList()
+    so_dim.var_y = nessi_list.NessiList()
 
-            slice_y = so_dim.y[start:end]
-            slice_var_y = so_dim.var_y[start:end]
+    for i in xrange(len_param_axis):
+        slice_y = bin_y[i]
+        slice_var_y = bin_var_y[i]
 
+        if rebin_axis is not None:
+            (slice_y, slice_var_y) = array_manip.div_ncerr(slice_y,
+                                                           slice_var_y,
+                                                           bin_area[i],
+                                                           bin_area_err2[i])
+
+        # If pixel normalization tracking enabled, divide by pixel counts
+        if pixnorm or prnorm:
             divconst = 1.0
-            
+
             if pixnorm:
                 divconst *= pixarr[i]
             # Scale division constant if parameter range normalization enabled
             if prnorm:
                 divconst *= prrange[i]
 
-            (dslice_y, dslice_var_y) = array_manip.div_ncerr(slice_y,
-                                                             slice_var_y,
-                                                             divconst,
-                                                             0.0)
+            (slice_y, slice_var_y) = array_manip.div_ncerr(slice_y,
+                                                           slice_var_y,
+                                                           divconst,
+                                                           0.0)
 
-            (tmp_y, tmp_var_y) = array_manip.add_ncerr(tmp_y,
-                                                       tmp_var_y,
-                                                       dslice_y,
-                                                       dslice_var_y,
-                                                       a_start=start)
+        if binnorm:
+            (slice_y, slice_var_y) = array_manip.mult_ncerr(slice_y,
+                                                            slice_var_y,
+                                                            bin_const[0],
+                                                            bin_const[1])
 
-        so_dim.y = tmp_y
-        so_dim.var_y = tmp_var_y
+        so_dim.y.extend(slice_y)
+        so_dim.var_y.extend(slice_var_y)
 
-    if binnorm:
-        tmp_y = nessi_list.NessiList(N_tot)
-        tmp_var_y = nessi_list.NessiList(N_tot)
-        
-        if rebin_axis is not None:
-            bin_const = utils.calc_bin_widths(rebin_axis)
-        else:
-            bin_const = utils.calc_bin_widths(som1[0].axis[1].val)
-
-        for i in range(len_param_axis):
-            start = i * len_arb_axis
-            end = (i + 1) * len_arb_axis
-            
-            slice_y = so_dim.y[start:end]
-            slice_var_y = so_dim.var_y[start:end]
-            
-            (dslice_y, dslice_var_y) = array_manip.mult_ncerr(slice_y,
-                                                              slice_var_y,
-                                                              bin_const[0],
-                                                              bin_const[1])
-            
-            (tmp_y, tmp_var_y) = array_manip.add_ncerr(tmp_y,
-                                                       tmp_var_y,
-                                                       dslice_y,
-                                                       dslice_var_y,
-                                                       a_start=start)
-
-        so_dim.y = tmp_y
-        so_dim.var_y = tmp_var_y
+    del bin_y, bin_var_y
+    if rebin_axis is not None:
+        del bin_area, bin_area_err2
 
     # Create final 2D spectrum object container
     comb_som = SOM.SOM()
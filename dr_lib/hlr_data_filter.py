@@ -197,13 +197,11 @@ def data_filter(obj, **kwargs):
             x_val = hlr_utils.get_value(obj, i, o_descr, "x", axis_pos)
             x_err2 = hlr_utils.get_err2(obj, i, o_descr, "x", axis_pos)
 
-            x_val_new = copy.deepcopy(x_val)
-            x_err2_new = copy.deepcopy(x_err2)
-
+            # The axis is only copied if it actually needs trimming
             (y_val_new, y_err2_new,
              x_val_new, x_err2_new,
              eso_new) = __clean_axis(data_dims, axis_pos, axis_index,
-                                     x_val_new, x_err2_new,
+                                     x_val, x_err2,
                                      y_val_new, y_err2_new,
                                      ext_so=eso_new, axis_len=axis_lengths)
 
@@ -228,11 +226,9 @@ def data_filter(obj, **kwargs):
                 ox_err2 = hlr_utils.get_err2(obj, i, o_descr, "x", other_axis)
 
                 if axis_pos == 0:
-                    xvals = [x_val_new, x_err2_new,
-                             copy.deepcopy(ox_val), copy.deepcopy(ox_err2)]
+                    xvals = [x_val_new, x_err2_new, ox_val, ox_err2]
                 else:
-                    xvals = [copy.deepcopy(ox_val), copy.deepcopy(ox_err2),
-                             x_val_new, x_err2_new]
+                    xvals = [ox_val, ox_err2, x_val_new, x_err2_new]
 
                 if not with_x_var:
                     del xvals[1::2]
@@ -251,7 +247,8 @@ def __clean_axis(dims, apos, aidx, *args, **kwargs):
     """
     This function trims the x-axis of choice if is contains a bad value:
     I{inf} or I{-inf}. The corresponding part of the value array is trimmed as
-    well. If extra information is present, it must be trimmed as well.
+    well. If extra information is present, it must be trimmed as well. The
+    incoming x-axis arrays are not changed, a trimmed copy is returned.
 
     @param dims: The dimension of the incoming data
     @type dims: C{int}
@@ -311,6 +308,10 @@ def __clean_axis(dims, apos, aidx, *args, **kwargs):
     bad_values = ("inf", "-inf")
 
     if str(x_val[aidx]) in bad_values:
+        # The axis arrays may be shared with other spectra, so trim copies
+        import copy
+        x_val = copy.deepcopy(x_val)
+        x_err2 = copy.deepcopy(x_err2)
         del x_val[aidx]
         del x_err2[aidx]
         if dims == 1:
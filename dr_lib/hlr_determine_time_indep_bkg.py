@@ -41,10 +41,16 @@ def determine_time_indep_bkg(obj, tof_vals, **kwargs):
                        background. The default is I{False}.
     @type is_range: C{bool}
 
+    @keyword as_list: A flag that tells the function to return the
+                      time-independent background as a C{list} of C{tuple}s
+                      (one per spectrum) that can be handed directly to
+                      C{common_lib.sub_ncerr}. The default is I{False}.
+    @type as_list: C{bool}
+
        
     @return: Object containing the time-independent background and the
              associated error
-    @rtype: C{list} of C{tuple}s
+    @rtype: C{SOM.SOM} or C{list} of C{tuple}s
     
 
     @raise TypeError: The incoming object is not a C{SOM} or C{SO}.
@@ -59,6 +65,7 @@ def determine_time_indep_bkg(obj, tof_vals, **kwargs):
 
     # Get keyword arguments
     is_range = kwargs.get("is_range", False)
+    as_list = kwargs.get("as_list", False)
 
     o_descr = hlr_utils.get_descr(obj)
 
@@ -69,38 +76,56 @@ def determine_time_indep_bkg(obj, tof_vals, **kwargs):
         pass
     
     # set up for working through data
-    (result, res_descr) = hlr_utils.empty_result(obj)
-    result = hlr_utils.copy_som_attr(result, res_descr, obj, o_descr)
+    if as_list:
+        (result, res_descr) = ([], "list")
+    else:
+        (result, res_descr) = hlr_utils.empty_result(obj)
+        result = hlr_utils.copy_som_attr(result, res_descr, obj, o_descr)
     
     if not is_range:
         num_tof_vals = float(len(tof_vals))
+        tof_vals = [float(tof) for tof in tof_vals]
         import bisect
     else:
         num_tof_vals = tof_vals[1] - tof_vals[0]
-        import dr_lib
+        import array_manip
+        import utils
+
+    # The TOF channel indices only depend on the axis, so they are found once
+    # for each distinct axis
+    channels = {}
 
     # iterate through the values
     len_obj = hlr_utils.get_length(obj)
     for i in xrange(len_obj):
-        obj1 = hlr_utils.get_value(obj, i, o_descr, "all")
+        map_so = hlr_utils.get_map_so(obj, None, i)
+        y_val = hlr_utils.get_value(obj, i, o_descr, "y")
+        y_err2 = hlr_utils.get_err2(obj, i, o_descr, "y")
+        axis = hlr_utils.get_value(obj, i, o_descr, "x", 0)
 
         if not is_range:
-            average = 0.0
-            ave_err2 = 0.0
-            for tof in tof_vals:
-                index = bisect.bisect(obj1.axis[0].val, float(tof)) - 1
-                average += obj1.y[index]
-                ave_err2 += obj1.var_y[index]
+            try:
+                indices = channels[id(axis)]
+            except KeyError:
+                indices = [bisect.bisect(axis, tof) - 1 for tof in tof_vals]
+                channels[id(axis)] = indices
+
+            average = sum([y_val[index] for index in indices], 0.0)
+            ave_err2 = sum([y_err2[index] for index in indices], 0.0)
         else:
-            (average, ave_err2) = dr_lib.integrate_axis(obj1, width=True,
-                                                        start=tof_vals[0],
-                                                        end=tof_vals[1])
+            int_val = utils.integrate_1D_hist(y_val, y_err2, axis,
+                                              width=True,
+                                              min_int=tof_vals[0],
+                                              max_int=tof_vals[1])
+            (average, ave_err2) = array_manip.add_ncerr(int_val[0],
+                                                        int_val[1],
+                                                        0.0, 0.0)
             
         average /= num_tof_vals
         ave_err2 /= num_tof_vals
 
-        hlr_utils.result_insert(result, res_descr, (average, ave_err2), obj1,
-                                "yonly")
+        hlr_utils.result_insert(result, res_descr, (average, ave_err2),
+                                map_so, "yonly")
 
     return result
 
@@ -118,4 +143,5 @@ if __name__ == "__main__":
     print "********** determine_time_indep_bkg"
     print "* ", determine_time_indep_bkg(som1, tof_channels)
     print "* ", determine_time_indep_bkg(som1, tof_channels, is_range=True)
+    print "* ", determine_time_indep_bkg(som1, tof_channels, as_list=True)
     
@@ -144,6 +144,8 @@ def energy_transfer(obj, itype, axis_const, **kwargs):
     import dr_lib
     import utils
 
+    geom_table = dr_lib.get_geom_table(obj)
+
     for i in xrange(hlr_utils.get_length(obj)):
         if itype == "IGS":
             l_i = hlr_utils.get_value(obj, i, o_descr, "x", axis)
@@ -198,7 +200,8 @@ def energy_transfer(obj, itype, axis_const, **kwargs):
 
         if sa_norm:
             if inst.get_name() == "BSS":
-                dOmega = dr_lib.calc_BSS_solid_angle(map_so, inst)
+                dOmega = dr_lib.calc_BSS_solid_angle(map_so, inst,
+                                                     geom_table=geom_table)
                 scale_y = array_manip.div_ncerr(scale_y[0], scale_y[1],
                                                 dOmega, 0.0)
             else:
@@ -22,11 +22,18 @@
 
 # $Id$
 
-def filter_normalization(obj, lothreshold, hithreshold, config=None):
+#: The relative distance from a threshold below which a value is checked with
+#: the tolerant comparison
+THRESHOLD_BAND = 1.0e-9
+
+def filter_normalization(obj, lothreshold, hithreshold, config=None,
+                         **kwargs):
     """
     This function takes an object with normalization integration information
-    and a threshold and creates a mask file containing the pixel IDs that do
-    not make it above the threshold.
+    and a threshold and creates a mask containing the pixel IDs that do not
+    make it above the threshold. The mask is returned as a
+    L{hlr_utils.PixelSet}, which can be given directly as the mask of the
+    next reduction, and is also written to a mask file.
 
     @param obj: The object containing the normalization information
     @type obj: C{SOM.SOM}
@@ -40,6 +47,16 @@ def filter_normalization(obj, lothreshold, hithreshold, config=None):
     @param config: The object holding the DR configuration
     @type config: L{hlr_utils.Configure}
 
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword write_mask: A flag for writing the mask file. The default is
+                         I{True}.
+    @type write_mask: C{boolean}
+
+
+    @return: The masked pixels
+    @rtype: L{hlr_utils.PixelSet}
+    
 
     @raise TypeError: The incoming object is not a C{SOM}.
     """
@@ -49,30 +66,63 @@ def filter_normalization(obj, lothreshold, hithreshold, config=None):
     if o_descr != "SOM":
         raise TypeError("Only SOMs are allowed in this function!")
 
-    if config is None:
-        # Make mask file name from object information
-        instname = obj.attr_list.inst.get_name()
-        runnum = obj.attr_list["run_number"]
-        outfile = "%s_%s_mask.dat" % (instname, str(runnum))
-    else:
-        # Make mask file name from configuration information
-        outfile = hlr_utils.ext_replace(config.output, config.ext_replacement,
-                                        "dat")
-        outfile = hlr_utils.add_tag(outfile, "mask")
+    try:
+        write_mask = kwargs["write_mask"]
+    except KeyError:
+        write_mask = True
 
-    ofile = open(outfile, "w")
+    import math
 
-    import SOM
     import utils
-    
-    len_obj = hlr_utils.get_length(obj)
-    for i in xrange(len_obj):
+
+    # Values inside the thresholds by more than this band are accepted
+    # without calling the tolerant comparison. An infinite threshold has no
+    # band, since inf - inf would give nan and never accept anything.
+    if math.isinf(lothreshold):
+        lo_accept = lothreshold
+    else:
+        lo_accept = lothreshold + THRESHOLD_BAND * max(1.0, abs(lothreshold))
+    if math.isinf(hithreshold):
+        hi_accept = hithreshold
+    else:
+        hi_accept = hithreshold - THRESHOLD_BAND * max(1.0, abs(hithreshold))
+
+    mask = hlr_utils.PixelSet()
+    for i in xrange(hlr_utils.get_length(obj)):
         norm = hlr_utils.get_value(obj, i, o_descr)
+        if lo_accept < norm < hi_accept:
+            continue
         if utils.compare(norm, lothreshold) <= 0 or \
                utils.compare(norm, hithreshold) >= 0:
-            map_so = hlr_utils.get_map_so(obj, None, i)
-            pix_id = SOM.NeXusId.fromString(str(map_so.id)).toJoinedStr()
+            mask.add(obj[i].id)
+
+    if write_mask:
+        if config is None:
+            # Make mask file name from object information
+            instname = obj.attr_list.instrument.get_name()
+            runnum = obj.attr_list["run_number"]
+            outfile = "%s_%s_mask.dat" % (instname, str(runnum))
+        else:
+            # Make mask file name from configuration information
+            outfile = hlr_utils.ext_replace(config.output,
+                                            config.ext_replacement, "dat")
+            outfile = hlr_utils.add_tag(outfile, "mask")
+
+        mask.write(outfile)
+
+    return mask
+
+if __name__ == "__main__":
+    import hlr_test
 
-            print >> ofile, pix_id
+    som1 = hlr_test.generate_synthetic_som(axis_len=2, num_pixels=10)
+    for i in xrange(len(som1)):
+        som1[i].y = float(i)
+        som1[i].var_y = float(i)
 
-    ofile.close()
+    print "********** filter_normalization"
+    mask1 = filter_normalization(som1, 2.0, 7.0, write_mask=False)
+    print "* ", mask1
+    print "* ", list(mask1)
+    mask2 = filter_normalization(som1, 2.0, float("inf"), write_mask=False)
+    print "* ", list(mask2)
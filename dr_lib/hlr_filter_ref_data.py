@@ -151,8 +151,14 @@ def filter_ref_data(som, **kwargs):
         y_val_new = copy.deepcopy(y_val)
         y_err2_new = copy.deepcopy(y_err2)
 
-        x_val_new = copy.deepcopy(x_val)
-        x_err2_new = copy.deepcopy(x_err2)
+        # Axes are shared between spectra, so only copy them if they are
+        # going to be trimmed
+        if not zero_mode and len(index_map[map_so.id]) > 0:
+            x_val_new = copy.deepcopy(x_val)
+            x_err2_new = copy.deepcopy(x_err2)
+        else:
+            x_val_new = x_val
+            x_err2_new = x_err2
         
         if dtot is not None:
             dso = hlr_utils.get_value(dtot, j, "SOM", "all")
@@ -22,6 +22,67 @@
 
 # $Id$
 
+def find_nz_indices(obj):
+    """
+    This function takes spectra and determines the indices of the first and
+    last non-zero values of each spectrum. The spectra are scanned from the
+    lower bound up and then from the upper bound down to the first non-zero
+    value, so a spectrum containing only zeros is scanned once.
+
+    @param obj: Object used for determining the non-zero data indices
+    @type obj: C{SOM.SOM} or C{SOM.SO}
+
+
+    @return: The indices of the first non-zero values and the indices of the
+             last non-zero values. Spectra containing only zeros have indices
+             of I{-1}.
+    @rtype: C{tuple} of two C{list}s of C{int}s
+
+
+    @raise TypeError: The incoming object is not a C{SOM} or C{SO}.
+    """
+    # import the helper functions
+    import hlr_utils
+
+    o_descr = hlr_utils.get_descr(obj)
+
+    if o_descr != "SOM" and o_descr != "SO":
+        raise TypeError("Incoming object must be a SOM or a SO")
+    # Have a SOM or SO
+    else:
+        pass
+
+    import utils
+
+    first_indices = []
+    last_indices = []
+
+    # iterate through the values
+    for i in xrange(hlr_utils.get_length(obj)):
+        y_val = hlr_utils.get_value(obj, i, o_descr, "y")
+        len_y = len(y_val)
+
+        # Exact zeros are skipped without calling the tolerant comparison
+        first = -1
+        for j in xrange(len_y):
+            value = y_val[j]
+            if value != 0.0 and utils.compare(value, 0.0):
+                first = j
+                break
+
+        last = -1
+        if first != -1:
+            for j in xrange(len_y - 1, first - 1, -1):
+                value = y_val[j]
+                if value != 0.0 and utils.compare(value, 0.0):
+                    last = j
+                    break
+
+        first_indices.append(first)
+        last_indices.append(last)
+
+    return (first_indices, last_indices)
+
 def find_nz_extent(obj, **kwargs):
     """
     This function takes spectra and determines the extent (range) of the
@@ -29,7 +90,8 @@ def find_nz_extent(obj, **kwargs):
     lower bound and moving up until non-zero data is encountered. Then, the
     upper end of the extent is determined by starting from the upper bound and
     moving down until non-zero data is encountered. This technique works best
-    with summed spectra as individual spectrum are usually sparse. 
+    with summed spectra as individual spectrum are usually sparse. A spectrum
+    containing only zeros gets the extent of the spectrum before it.
 
     @param obj: Object used for determining the non-zero data extent
     @type obj: C{SOM.SOM} or C{SOM.SO}
@@ -40,9 +102,15 @@ def find_nz_extent(obj, **kwargs):
                        argument is given, the default value is I{0}.
     @type axis_pos: C{int}
 
+    @keyword split: A flag that returns the lower and upper ends of the
+                    extents as separate lists. These can be given directly to
+                    L{shift_spectrum}. The default is I{False}.
+    @type split: C{boolean}
+
 
     @return: Object containing the extent of the non-zero data
-    @rtype: C{list} of C{tuple}s
+    @rtype: C{list} of C{tuple}s, a C{list} for a single spectrum or a
+            C{tuple} of two C{list}s
 
 
     @raise TypeError: The incoming object is not a C{SOM} or C{SO}.
@@ -50,56 +118,44 @@ def find_nz_extent(obj, **kwargs):
     # import the helper functions
     import hlr_utils
 
-    o_descr = hlr_utils.get_descr(obj)
-
-    if o_descr != "SOM" and o_descr != "SO":
-        raise TypeError("Incoming object must be a SOM or a SO")
-    # Have a SOM or SO
-    else:
-        pass
-
-    # set up for working through data
-    # This time highest object in the hierarchy is NOT what we need
-    result = []
-    if(hlr_utils.get_length(obj) > 1):
-        res_descr = "list"
-    else:
-        res_descr = "number"
-
-    # Check for axis_pos keyword argument
+    # Check for keyword arguments
     try:
         axis_pos = kwargs["axis_pos"]
     except KeyError:
         axis_pos = 0
 
-    import utils
-
-    min_ext = 0.0
-    max_ext = 0.0
-
-    # iterate through the values
-    for i in xrange(hlr_utils.get_length(obj)):
-        y_val = hlr_utils.get_value(obj, i, o_descr, "y")
-        x_axis = hlr_utils.get_value(obj, i, o_descr, "x", axis_pos)
+    try:
+        split = kwargs["split"]
+    except KeyError:
+        split = False
 
-        for i in xrange(len(y_val)):
-            if utils.compare(y_val[i], 0.0):
-                min_ext = x_axis[i]
-                break
+    (first_indices, last_indices) = find_nz_indices(obj)
 
-        rev_list = range(len(y_val))
-        rev_list.reverse()
+    o_descr = hlr_utils.get_descr(obj)
 
-        for j in rev_list:
-            if utils.compare(y_val[j], 0.0):
-                max_ext = x_axis[j+1]
-                break
+    min_ext = 0.0
+    max_ext = 0.0
 
-        hlr_utils.result_insert(result, res_descr, (min_ext, max_ext), None,
-                                "all")
+    min_exts = []
+    max_exts = []
 
-    import copy
-    return copy.deepcopy(result)
+    # iterate through the values
+    for i in xrange(len(first_indices)):
+        if first_indices[i] != -1:
+            x_axis = hlr_utils.get_value(obj, i, o_descr, "x", axis_pos)
+            min_ext = x_axis[first_indices[i]]
+            max_ext = x_axis[last_indices[i] + 1]
+
+        min_exts.append(min_ext)
+        max_exts.append(max_ext)
+
+    if split:
+        return (min_exts, max_exts)
+    # A single spectrum gives a flat list of the extent
+    elif len(min_exts) == 1:
+        return [min_exts[0], max_exts[0]]
+    else:
+        return zip(min_exts, max_exts)
 
 if __name__ == "__main__":
     import hlr_test
@@ -123,5 +179,9 @@ if __name__ == "__main__":
     print "* ", som1[0]
     print "* ", som1[1]
 
+    print "********** find_nz_indices"
+    print "* ", find_nz_indices(som1)
+
     print "********** find_nz_extent"
     print "* ", find_nz_extent(som1)
+    print "* ", find_nz_extent(som1, split=True)
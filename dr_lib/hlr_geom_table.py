@@ -0,0 +1,417 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+import math
+
+import hlr_utils
+
+class GeomTable(object):
+    """
+    This class holds per-pixel geometry factors calculated from the
+    instrument geometry. The factors are calculated once for every pixel of
+    a C{SOM} and looked up afterwards, so the instrument geometry is not
+    interrogated for every spectrum of every reduction step. The table can
+    be written next to the instrument geometry file and read back by later
+    reductions, see L{create_geom_table}. The following columns are
+    understood:
+      - I{polar}: The polar angle of the pixel
+      - I{solid_angle}: The solid angle of the pixel from the pixel area, the
+        cosine of the polar angle and the secondary flight path (see
+        L{calc_solid_angle})
+      - I{bss_solid_angle}: The BSS solid angle (see L{calc_BSS_solid_angle})
+      - I{sas_correct}: The SAS geometrical correction factor (see
+        L{apply_sas_correct})
+    """
+
+    COLUMNS = ("polar", "solid_angle", "bss_solid_angle", "sas_correct")
+
+    def __init__(self, filename=None):
+        """
+        Object constructor
+
+        @param filename: (OPTIONAL) The name of a geometry table file to read
+        @type filename: C{string}
+        """
+        self.source = None
+        self.__columns = {}
+        for name in self.COLUMNS:
+            self.__columns[name] = {}
+
+        if filename is not None:
+            self.read(filename)
+
+    def __repr__(self):
+        """
+        This method returns a representation of the table.
+
+        @return: The representation of the table
+        @rtype: C{string}
+        """
+        counts = ["%s=%d" % (name, len(self.__columns[name])) \
+                  for name in self.COLUMNS if self.__columns[name]]
+        return "GeomTable(%s)" % ", ".join(counts)
+
+    def get_value(self, name, pix_id):
+        """
+        This method returns a geometry factor for a given pixel.
+
+        @param name: The name of the column
+        @type name: C{string}
+
+        @param pix_id: The pixel ID
+        @type pix_id: C{tuple}
+
+
+        @return: The geometry factor
+        @rtype: C{float}
+
+
+        @raise KeyError: The pixel is not in the table column
+        """
+        return self.__columns[name][pix_id]
+
+    def get_column(self, name, obj):
+        """
+        This method returns the geometry factors for all of the spectra of
+        the given object. Factors missing from the table are calculated
+        first.
+
+        @param name: The name of the column
+        @type name: C{string}
+
+        @param obj: Object containing the spectra
+        @type obj: C{SOM.SOM}
+
+
+        @return: The geometry factors in the order of the spectra
+        @rtype: C{nessi_list.NessiList}
+        """
+        self.calculate(obj, [name])
+
+        column = self.__columns[name]
+
+        import nessi_list
+        values = nessi_list.NessiList()
+        for so in obj:
+            values.append(column[so.id])
+
+        return values
+
+    def calculate(self, obj, names):
+        """
+        This method calculates the geometry factors for all of the spectra
+        of the given object that are not already in the table.
+
+        @param obj: Object containing the spectra and the instrument geometry
+        @type obj: C{SOM.SOM}
+
+        @param names: The names of the columns to calculate
+        @type names: C{list} of C{string}s
+
+
+        @return: The number of factors calculated
+        @rtype: C{int}
+
+
+        @raise RuntimeError: A column name is not understood
+        """
+        inst = obj.attr_list.instrument
+
+        count = 0
+        for name in names:
+            if name not in self.__columns:
+                raise RuntimeError("Do not know how to calculate %s" % name)
+
+            column = self.__columns[name]
+            pixels = [so for so in obj if so.id not in column]
+            if not pixels:
+                continue
+
+            # The polar angle is needed by the other columns
+            if name != "polar":
+                self.calculate(obj, ["polar"])
+
+            if name == "polar":
+                for so in pixels:
+                    column[so.id] = hlr_utils.get_parameter("polar", so,
+                                                            inst)[0]
+            elif name == "solid_angle":
+                self.__calc_solid_angle(pixels, inst)
+            elif name == "bss_solid_angle":
+                import dr_lib
+                for so in pixels:
+                    column[so.id] = dr_lib.calc_BSS_solid_angle(so, inst)
+            elif name == "sas_correct":
+                polar = self.__columns["polar"]
+                for so in pixels:
+                    tan_pol = math.tan(polar[so.id])
+                    column[so.id] = (math.sin(polar[so.id]) * \
+                                     math.cos(polar[so.id])) / \
+                                     (1.0 + (tan_pol * tan_pol))
+
+            count += len(pixels)
+
+        return count
+
+    def apply(self, obj, name, inverse=False):
+        """
+        This method multiplies each spectrum of the given object by its
+        geometry factor.
+
+        @param obj: Object containing the spectra to scale
+        @type obj: C{SOM.SOM}
+
+        @param name: The name of the column
+        @type name: C{string}
+
+        @param inverse: (OPTIONAL) Flag for dividing by the geometry factors
+                                   instead
+        @type inverse: C{boolean}
+
+
+        @return: Object containing the scaled spectra
+        @rtype: C{SOM.SOM}
+        """
+        factors = self.get_column(name, obj)
+
+        (result, res_descr) = hlr_utils.empty_result(obj)
+        result = hlr_utils.copy_som_attr(result, res_descr, obj, "SOM")
+
+        import array_manip
+
+        for i in xrange(len(obj)):
+            so = obj[i]
+            if inverse:
+                value = array_manip.div_ncerr(so.y, so.var_y, factors[i], 0.0)
+            else:
+                value = array_manip.mult_ncerr(so.y, so.var_y, factors[i],
+                                               0.0)
+            hlr_utils.result_insert(result, res_descr, value, so, "y")
+
+        return result
+
+    def read(self, filename):
+        """
+        This method adds the geometry factors of a geometry table file to the
+        table.
+
+        @param filename: The name of the geometry table file
+        @type filename: C{string}
+
+
+        @raise RuntimeError: The file is not a geometry table file
+        """
+        tfile = open(filename, "r")
+
+        names = None
+        for line in tfile:
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == "#":
+                if len(parts) > 1 and parts[1] == "source":
+                    self.source = (" ".join(parts[2:-2]), int(parts[-2]),
+                                   float(parts[-1]))
+                elif len(parts) > 1 and parts[1] == "columns":
+                    names = parts[2:]
+                continue
+
+            if names is None:
+                tfile.close()
+                raise RuntimeError("%s is not a geometry table file" \
+                                   % filename)
+
+            (bank, x, y) = parts[0].split('_')
+            pix_id = (bank, (int(x), int(y)))
+            for (name, value) in zip(names, parts[1:]):
+                if value != "nan":
+                    self.__columns[name][pix_id] = float(value)
+
+        tfile.close()
+
+    def write(self, filename):
+        """
+        This method writes the table to a geometry table file.
+
+        @param filename: The name of the geometry table file
+        @type filename: C{string}
+        """
+        names = [name for name in self.COLUMNS if self.__columns[name]]
+        pix_ids = {}
+        for name in names:
+            pix_ids.update(self.__columns[name])
+        pix_ids = pix_ids.keys()
+        pix_ids.sort()
+
+        ofile = open(filename, "w")
+        print >> ofile, "# HLR geometry table"
+        if self.source is not None:
+            print >> ofile, "# source %s %d %r" % self.source
+        print >> ofile, "# columns %s" % " ".join(names)
+        for pix_id in pix_ids:
+            values = [repr(self.__columns[name].get(pix_id, float("nan"))) \
+                      for name in names]
+            print >> ofile, "%s_%d_%d %s" % (pix_id[0], pix_id[1][0],
+                                             pix_id[1][1], " ".join(values))
+        ofile.close()
+
+    def __calc_solid_angle(self, pixels, inst):
+        """
+        This method calculates the solid angles of the given pixels. The
+        pixel sizes are taken from the offsets of the neighboring pixels in
+        the x and y directions. The offsets of pixels in the list are only
+        fetched once and only missing neighbors are fetched from the
+        instrument geometry.
+        """
+        x_off = {}
+        y_off = {}
+        for so in pixels:
+            x_off[so.id] = hlr_utils.get_parameter("x-offset", so, inst)[0]
+            y_off[so.id] = hlr_utils.get_parameter("y-offset", so, inst)[0]
+
+        polar = self.__columns["polar"]
+        column = self.__columns["solid_angle"]
+        for so in pixels:
+            pl = hlr_utils.get_parameter("secondary", so, inst)[0]
+
+            xdiff = math.fabs(self.__neighbor_offset(x_off, "x-offset", so.id,
+                                                     inst) - x_off[so.id])
+            ydiff = math.fabs(self.__neighbor_offset(y_off, "y-offset", so.id,
+                                                     inst) - y_off[so.id])
+
+            column[so.id] = (xdiff * ydiff * math.cos(polar[so.id])) / \
+                            (pl * pl)
+
+    def __neighbor_offset(self, offsets, param, pix_id, inst):
+        """
+        This method returns the offset of the next pixel in the x or y
+        direction or of the previous pixel if there is no next pixel.
+        """
+        (bank, (x, y)) = pix_id
+        if param == "x-offset":
+            ids = ((bank, (x + 1, y)), (bank, (x - 1, y)))
+        else:
+            ids = ((bank, (x, y + 1)), (bank, (x, y - 1)))
+
+        try:
+            return offsets[ids[0]]
+        except KeyError:
+            pass
+
+        import SOM
+        npix = SOM.SO()
+
+        try:
+            npix.id = ids[0]
+            return hlr_utils.get_parameter(param, npix, inst)[0]
+        except IndexError:
+            npix.id = ids[1]
+            return hlr_utils.get_parameter(param, npix, inst)[0]
+
+def get_geom_table(obj):
+    """
+    This function returns the geometry table attached to an object by
+    L{create_geom_table}.
+
+    @param obj: The object to get the geometry table from
+    @type obj: C{SOM.SOM} or C{SOM.SO}
+
+
+    @return: The geometry table or I{None} if there is none
+    @rtype: L{GeomTable}
+    """
+    try:
+        return obj.attr_list["geom_table"]
+    except (AttributeError, KeyError):
+        return None
+
+def create_geom_table(obj, names, **kwargs):
+    """
+    This function creates the geometry table for the spectra of the given
+    object and attaches it to the object. The table travels with the
+    attributes of the object, so the reduction steps that follow use the
+    table factors. If an instrument geometry file is given, the table is
+    kept next to it (the geometry file name with I{.tab} added). A table
+    from a previous reduction is reused if the geometry file has not changed
+    since it was written and missing factors are added to it.
+
+    @param obj: Object containing the spectra and the instrument geometry
+    @type obj: C{SOM.SOM}
+
+    @param names: The names of the table columns to calculate. See
+                  L{GeomTable} for the possibilities.
+    @type names: C{list} of C{string}s
+
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword inst_geom: The name of the instrument geometry file used for the
+                        object.
+    @type inst_geom: C{string}
+
+
+    @return: The geometry table
+    @rtype: L{GeomTable}
+    """
+    import os
+
+    inst_geom = kwargs.get("inst_geom")
+
+    table = None
+    if inst_geom is not None:
+        stat = os.stat(inst_geom)
+        source = (os.path.abspath(inst_geom), stat.st_size, stat.st_mtime)
+        table_file = inst_geom + ".tab"
+        try:
+            table = GeomTable(table_file)
+        except (IOError, RuntimeError, ValueError):
+            table = None
+        else:
+            if table.source != source:
+                table = None
+
+    if table is None:
+        table = get_geom_table(obj)
+
+    if table is None:
+        table = GeomTable()
+
+    count = table.calculate(obj, names)
+
+    if inst_geom is not None and count:
+        table.source = source
+        try:
+            table.write(table_file)
+        except IOError:
+            # The table can always be calculated again
+            pass
+
+    obj.attr_list["geom_table"] = table
+
+    return table
+
+if __name__ == "__main__":
+    table = GeomTable()
+
+    print "********** GeomTable"
+    print "* table:", table
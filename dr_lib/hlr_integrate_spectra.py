@@ -135,6 +135,8 @@ def integrate_spectra(obj, **kwargs):
     # iterate through the values
     import dr_lib
 
+    geom_table = dr_lib.get_geom_table(obj)
+
     len_obj = hlr_utils.get_length(obj)
     for i in xrange(len_obj):
         obj1 = hlr_utils.get_value(obj, i, o_descr, "all")
@@ -150,7 +152,8 @@ def integrate_spectra(obj, **kwargs):
         if norm:
             if inst.get_name() == "BSS":
                 map_so = hlr_utils.get_map_so(obj, None, i)
-                dOmega = dr_lib.calc_BSS_solid_angle(map_so, inst)
+                dOmega = dr_lib.calc_BSS_solid_angle(map_so, inst,
+                                                     geom_table=geom_table)
         
                 value1 = (value[0] / dOmega, value[1] / (dOmega * dOmega))
             else:
@@ -25,7 +25,8 @@
 def integrate_spectra_py(obj, **kwargs):
     """
     This function takes a set of spectra and calculates the integration for the
-    primary axis. If the integration range for a spectrum cannot be found, an
+    primary axis. The integrations are taken from the cumulative sums held by
+    an L{IntegrationTable}. If the integration range for a spectrum cannot be found, an
     error report will be generated with the following information:
 
     Range not found: pixel ID, start bin, end bin, length of data array
@@ -72,6 +73,11 @@ def integrate_spectra_py(obj, **kwargs):
                     width in the L{integrate_axis} function while doing the
                     integrations. The default value of the flag is I{False}. 
     @type width: C{boolean}
+
+    @keyword block_size: The number of spectra whose cumulative sums are held
+                         in an L{IntegrationTable} at one time. The default
+                         value is I{1000}.
+    @type block_size: C{int}
     
     
     @return: Object containing the integration and the uncertainty squared
@@ -155,46 +161,52 @@ def integrate_spectra_py(obj, **kwargs):
         else:
             i_end = aobj.axis[axis_pos].val[-1]
     
-    # iterate through the values
-    import bisect
-
-    import dr_lib
-
-    for i in xrange(hlr_utils.get_length(obj)):
-        obj1 = hlr_utils.get_value(obj, i, o_descr, "all")
-
-        # Find the bin in the y values corresponding to the start bound
-        if not bin_index:
-            b_start = bisect.bisect(obj1.axis[axis_pos].val, i_start) - 1
-        else:
-            b_start = i_start
+    # Check for block_size keyword argument
+    try:
+        block_size = kwargs["block_size"]
+    except KeyError:
+        block_size = 1000
 
-        # Find the bin in the y values corresponding to the end bound
-        if not bin_index:
-            b_end = bisect.bisect(obj1.axis[axis_pos].val, i_end) - 1
-        else:
-            b_end = i_end
+    import array_manip
+    import nessi_list
 
-        try:
-            value = dr_lib.integrate_axis_py(obj1, start=b_start, end=b_end,
-                                             width=width)
-        except IndexError:
-            print "Range not found:", obj1.id, b_start, b_end, len(obj1)
-            value = (float('nan'), float('nan'))
+    import dr_lib
 
-        if norm:
-            if inst.get_name() == "BSS":
-                map_so = hlr_utils.get_map_so(obj, None, i)
-                dOmega = dr_lib.calc_BSS_solid_angle(map_so, inst)
-        
-                value1 = (value[0] / dOmega, value[1] / (dOmega * dOmega))
+    len_obj = hlr_utils.get_length(obj)
+
+    # Integrate the spectra a block at a time via the cumulative sums
+    values = nessi_list.NessiList()
+    err2s = nessi_list.NessiList()
+    for first in xrange(0, len_obj, block_size):
+        table = dr_lib.IntegrationTable(obj, axis_pos=axis_pos, width=width,
+                                        first=first, last=first + block_size)
+        (blk_values, blk_err2s) = table.integrate(i_start, i_end, bin_index)
+        values.extend(blk_values)
+        err2s.extend(blk_err2s)
+        del table
+
+    if norm:
+        if inst.get_name() == "BSS":
+            geom_table = dr_lib.get_geom_table(obj)
+            if geom_table is not None:
+                dOmega = geom_table.get_column("bss_solid_angle", obj)
             else:
-                raise RuntimeError("Do not know how to get solid angle from "\
-                                   +"%s" % inst.get_name())
+                dOmega = nessi_list.NessiList()
+                for i in xrange(len_obj):
+                    map_so = hlr_utils.get_map_so(obj, None, i)
+                    dOmega.append(dr_lib.calc_BSS_solid_angle(map_so, inst))
+
+            # Apply the solid angles as a single array division
+            (values, err2s) = array_manip.div_ncerr(values, err2s, dOmega,
+                                                nessi_list.NessiList(len_obj))
         else:
-            value1 = value
+            raise RuntimeError("Do not know how to get solid angle from "\
+                               +"%s" % inst.get_name())
 
-        hlr_utils.result_insert(result, res_descr, value1, obj1, "yonly")
+    for i in xrange(len_obj):
+        obj1 = hlr_utils.get_value(obj, i, o_descr, "all")
+        hlr_utils.result_insert(result, res_descr, (values[i], err2s[i]), obj1,
+                                "yonly")
 
     if not total:
         return result
@@ -0,0 +1,229 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+def integrate_spectra_windows(obj, windows, **kwargs):
+    """
+    This function takes a set of spectra and calculates the integration for
+    several windows on the primary axis in one pass over the data. The
+    cumulative sums of each spectrum are built once by an
+    L{IntegrationTable} and every window is taken from them. If a window for
+    a spectrum cannot be found, an error report will be generated with the
+    following information:
+
+    Range not found: pixel ID, start, end, length of data array
+
+    A failing window will have the integration tuple set to C{(nan, nan)}.
+
+    @param obj: Object containing spectra that will have the integrations
+    calculated from them.
+    @type obj: C{SOM.SOM} or C{SOM.SO}
+
+    @param windows: The integration windows given as (start, end) pairs
+    @type windows: C{list} of C{tuple}s
+
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword axis_pos: This is position of the axis in the axis array. If no
+    argument is given, the default value is I{0}.
+    @type axis_pos: C{int}
+
+    @keyword bin_index: This is a flag to say that the values in the windows
+    are either bin indicies (I{True}) or bounds (I{False}). The default value
+    is I{False}.
+    @type bin_index: C{boolean}
+
+    @keyword norm: This is a flag to turn on the division of the individual
+                   spectrum integrations by the solid angle of the
+                   corresponding pixel. This also activates the multiplication
+                   of the individual spectrum bin values by their
+                   corresponding bin width. The default value of the flag is
+                   I{False}.
+    @type norm: C{boolean}
+
+    @keyword width: This is a flag to turn on the multiplication of the
+                    individual bin values by their corresponding bin width.
+                    The default value of the flag is I{False}.
+    @type width: C{boolean}
+
+    @keyword block_size: The number of spectra whose cumulative sums are held
+                         in an L{IntegrationTable} at one time. The default
+                         value is I{1000}.
+    @type block_size: C{int}
+
+
+    @return: Object containing the integrations and the uncertainties squared
+             associated with the integrations. Each spectrum holds one value
+             per window in the order of the windows, and its axis holds the
+             window indicies. A C{SOM} also carries the windows in the
+             I{integration_windows} attribute.
+    @rtype: C{SOM.SOM} or C{SOM.SO}
+
+
+    @raise RuntimeError: The norm keyword is used with a C{SO}
+
+    @raise RuntimeError: The solid angle cannot be calculated for the
+                         instrument
+    """
+    # import the helper functions
+    import hlr_utils
+
+    if obj is None:
+        return obj
+
+    # set up for working through data
+    (result, res_descr) = hlr_utils.empty_result(obj)
+
+    o_descr = hlr_utils.get_descr(obj)
+    result = hlr_utils.copy_som_attr(result, res_descr, obj, o_descr)
+
+    # Check for axis_pos keyword argument
+    try:
+        axis_pos = kwargs["axis_pos"]
+    except KeyError:
+        axis_pos = 0
+
+    # Check for bin_index keyword argument
+    try:
+        bin_index = kwargs["bin_index"]
+    except KeyError:
+        bin_index = False
+
+    # Check for norm keyword argument
+    try:
+        norm = kwargs["norm"]
+    except KeyError:
+        norm = False
+
+    if norm:
+        if o_descr == "SO":
+            raise RuntimeError("Cannot use norm keyword with SO!")
+        width = True
+        inst = obj.attr_list.instrument
+    else:
+        # Check for width keyword argument only if norm isn't present
+        try:
+            width = kwargs["width"]
+        except KeyError:
+            width = False
+
+    # Check for block_size keyword argument
+    try:
+        block_size = kwargs["block_size"]
+    except KeyError:
+        block_size = 1000
+
+    import array_manip
+    import nessi_list
+
+    import dr_lib
+
+    len_obj = hlr_utils.get_length(obj)
+    len_win = len(windows)
+
+    # One column of values and err2s per window
+    values = [nessi_list.NessiList() for w in xrange(len_win)]
+    err2s = [nessi_list.NessiList() for w in xrange(len_win)]
+
+    nan = float('nan')
+
+    for first in xrange(0, len_obj, block_size):
+        table = dr_lib.IntegrationTable(obj, axis_pos=axis_pos, width=width,
+                                        first=first, last=first + block_size)
+        for i in xrange(len(table)):
+            for w in xrange(len_win):
+                (w_start, w_end) = windows[w]
+                try:
+                    (lo, hi) = table.find_window(i, w_start, w_end, bin_index)
+                    value = table.integrate_range(i, lo, hi)
+                except IndexError:
+                    so = table.getSO(i)
+                    print "Range not found:", so.id, w_start, w_end, len(so)
+                    value = (nan, nan)
+
+                values[w].append(value[0])
+                err2s[w].append(value[1])
+        del table
+
+    if norm:
+        if inst.get_name() == "BSS":
+            geom_table = dr_lib.get_geom_table(obj)
+            if geom_table is not None:
+                dOmega = geom_table.get_column("bss_solid_angle", obj)
+            else:
+                dOmega = nessi_list.NessiList()
+                for i in xrange(len_obj):
+                    map_so = hlr_utils.get_map_so(obj, None, i)
+                    dOmega.append(dr_lib.calc_BSS_solid_angle(map_so, inst))
+
+            dOmega_err2 = nessi_list.NessiList(len_obj)
+            for w in xrange(len_win):
+                (values[w], err2s[w]) = array_manip.div_ncerr(values[w],
+                                                              err2s[w],
+                                                              dOmega,
+                                                              dOmega_err2)
+        else:
+            raise RuntimeError("Do not know how to get solid angle from "\
+                               +"%s" % inst.get_name())
+
+    import SOM
+
+    win_axis = nessi_list.NessiList()
+    win_axis.extend(range(len_win))
+
+    for i in xrange(len_obj):
+        map_so = hlr_utils.get_map_so(obj, None, i)
+
+        so = SOM.SO()
+        so.id = map_so.id
+        so.axis[0].val = win_axis
+        for w in xrange(len_win):
+            so.y.append(values[w][i])
+            so.var_y.append(err2s[w][i])
+
+        if res_descr == "SOM":
+            result.append(so)
+        else:
+            result = so
+
+    if res_descr == "SOM":
+        result.attr_list["integration_windows"] = list(windows)
+
+    return result
+
+if __name__ == "__main__":
+    import hlr_test
+
+    som1 = hlr_test.generate_som()
+
+    print "********** SOM1"
+    print "* ", som1[0]
+    print "* ", som1[1]
+
+    print "********** integrate_spectra_windows"
+    print "* som (0, 5), (1.5, 3.5):", \
+          integrate_spectra_windows(som1, [(0, 5), (1.5, 3.5)])
+    print "* som [0, 1], [2, -1]   :", \
+          integrate_spectra_windows(som1, [(0, 1), (2, -1)], bin_index=True)
+    print "* so  (0.5, 2.75)       :", \
+          integrate_spectra_windows(som1[0], [(0.5, 2.75)])
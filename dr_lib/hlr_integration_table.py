@@ -0,0 +1,365 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+class IntegrationTable(object):
+    """
+    This class holds the cumulative sums of the values and squared
+    uncertainties for a block of spectra. Once the table is created, the
+    integration over any window of any spectrum is the difference of two
+    cumulative sums, so many windows can be integrated without walking
+    through the data again. Bin lookups for windows given as axis bounds are
+    done once per distinct axis, so spectra sharing an axis (see
+    L{hlr_utils.share_axis}) only pay for a single lookup. Values or squared
+    uncertainties of I{nan}, I{inf} or I{-inf} do not contribute to the
+    integration.
+    """
+
+    def __init__(self, obj, **kwargs):
+        """
+        Object constructor
+
+        @param obj: Object containing the spectra for the table
+        @type obj: C{SOM.SOM} or C{SOM.SO}
+
+        @param kwargs: A list of keyword arguments that the function accepts:
+
+        @keyword axis_pos: This is position of the axis in the axis array used
+                           for the bin lookups. If no argument is given, the
+                           default value is I{0}.
+        @type axis_pos: C{int}
+
+        @keyword width: This is a flag to turn on the multiplication of the
+                        individual bin contents with the bins corresponding
+                        width. The default value is I{False}.
+        @type width: C{boolean}
+
+        @keyword first: The index of the first spectrum of the block. The
+                        default value is I{0}.
+        @type first: C{int}
+
+        @keyword last: The index one past the last spectrum of the block. The
+                       default value is the number of spectra in obj.
+        @type last: C{int}
+
+
+        @raise RuntimeError: A C{SOM} or C{SO} is not given to the function.
+        """
+        import hlr_utils
+
+        o_descr = hlr_utils.get_descr(obj)
+        if o_descr == "SO":
+            spectra = [obj]
+        elif o_descr == "SOM":
+            first = kwargs.get("first", 0)
+            last = kwargs.get("last", len(obj))
+            spectra = [obj[i] for i in xrange(first, min(last, len(obj)))]
+        else:
+            raise RuntimeError("Must provide a SOM or a SO to the function.")
+
+        self.__axis_pos = kwargs.get("axis_pos", 0)
+        self.__width = kwargs.get("width", False)
+
+        self.__so = spectra
+        self.__cum_y = []
+        self.__cum_var_y = []
+        # Bin lookups and bin widths keyed on the axis array identity
+        self.__bins = {}
+        self.__widths = {}
+
+        for so in spectra:
+            if self.__width:
+                bin_widths = self.__get_widths(so.axis[0].val)
+            else:
+                bin_widths = None
+            (cum_y, cum_var_y) = self.__make_sums(so.y, so.var_y, bin_widths)
+            self.__cum_y.append(cum_y)
+            self.__cum_var_y.append(cum_var_y)
+
+    def __len__(self):
+        """
+        This method returns the number of spectra in the table.
+
+        @return: The number of spectra
+        @rtype: C{int}
+        """
+        return len(self.__so)
+
+    def __get_widths(self, axis):
+        """
+        This method returns the bin widths for the given axis, calculating
+        them once per distinct axis.
+
+        @param axis: The axis to get the bin widths from
+        @type axis: C{nessi_list.NessiList}
+
+
+        @return: The bin widths
+        @rtype: C{nessi_list.NessiList}
+        """
+        try:
+            return self.__widths[id(axis)]
+        except KeyError:
+            import utils
+            bin_widths = utils.calc_bin_widths(axis)[0]
+            self.__widths[id(axis)] = bin_widths
+            return bin_widths
+
+    def __make_sums(self, y, var_y, bin_widths):
+        """
+        This method creates the cumulative sums for a single spectrum. The
+        element at index i of the cumulative sums holds the integration of
+        bins 0 through i-1.
+
+        @param y: The values of the spectrum
+        @type y: C{nessi_list.NessiList}
+
+        @param var_y: The squared uncertainties of the spectrum
+        @type var_y: C{nessi_list.NessiList}
+
+        @param bin_widths: The bin widths to multiply the bin contents by. Can
+                           be C{None} if no multiplication is requested.
+        @type bin_widths: C{nessi_list.NessiList}
+
+
+        @return: The cumulative sums of the values and squared uncertainties
+        @rtype: C{tuple} of two C{array.array}s
+        """
+        import array
+        import itertools
+
+        cum_y = array.array('d', [0.0])
+        cum_var_y = array.array('d', [0.0])
+
+        total = 0.0
+        total_err2 = 0.0
+
+        # x - x is only zero for finite numbers, so nan, inf and -inf values
+        # are skipped by the checks below
+        if bin_widths is None:
+            for val, err2 in itertools.izip(y, var_y):
+                if val - val == 0.0 and err2 - err2 == 0.0:
+                    total += val
+                    total_err2 += err2
+                cum_y.append(total)
+                cum_var_y.append(total_err2)
+        else:
+            for val, err2, delta in itertools.izip(y, var_y, bin_widths):
+                if val - val == 0.0 and err2 - err2 == 0.0:
+                    total += delta * val
+                    total_err2 += delta * delta * err2
+                cum_y.append(total)
+                cum_var_y.append(total_err2)
+
+        return (cum_y, cum_var_y)
+
+    def __find_bin(self, so, bound):
+        """
+        This method finds the bin containing the given axis value. The lookup
+        is cached per distinct axis.
+
+        @param so: The spectrum whose axis is searched
+        @type so: C{SOM.SO}
+
+        @param bound: The axis value to look up
+        @type bound: C{float}
+
+
+        @return: The index of the bin containing the value. This is I{-1} if
+                 the value is below the axis.
+        @rtype: C{int}
+        """
+        axis = so.axis[self.__axis_pos].val
+        key = (id(axis), bound)
+        try:
+            return self.__bins[key]
+        except KeyError:
+            import bisect
+            index = bisect.bisect(axis, bound) - 1
+            self.__bins[key] = index
+            return index
+
+    def getSO(self, index):
+        """
+        This method returns the spectrum for the given table row.
+
+        @param index: The table row
+        @type index: C{int}
+
+
+        @return: The spectrum
+        @rtype: C{SOM.SO}
+        """
+        return self.__so[index]
+
+    def find_window(self, index, start, end, bin_index=False):
+        """
+        This method converts an integration window into the range of data
+        elements it covers for the given spectrum. Bin indicies follow the
+        conventions of L{integrate_axis_py}: the end bin is inclusive and an
+        end bin of I{-1} means the last bin.
+
+        @param index: The table row
+        @type index: C{int}
+
+        @param start: The start of the window
+        @type start: C{int} or C{float}
+
+        @param end: The end of the window
+        @type end: C{int} or C{float}
+
+        @param bin_index: (OPTIONAL) Flag that says the window is given as bin
+                                     indicies (I{True}) or axis bounds
+                                     (I{False}). The default is I{False}.
+        @type bin_index: C{boolean}
+
+
+        @return: The first data element and one past the last data element of
+                 the window
+        @rtype: C{tuple}
+
+
+        @raise IndexError: The window does not overlap the data
+        """
+        length = len(self.__cum_y[index]) - 1
+
+        if bin_index:
+            if start >= length or start < -length:
+                raise IndexError("Window starts outside of the data")
+            if end == -1:
+                stop = None
+            else:
+                stop = end + 1
+            (lo, hi) = slice(start, stop).indices(length)[:2]
+        else:
+            so = self.__so[index]
+            lo = self.__find_bin(so, start)
+            hi = self.__find_bin(so, end) + 1
+            if lo >= length or hi <= 0:
+                raise IndexError("Window lies outside of the axis")
+            lo = max(lo, 0)
+            hi = min(hi, length)
+
+        return (lo, max(lo, hi))
+
+    def integrate_range(self, index, lo, hi):
+        """
+        This method returns the integration of a range of data elements for
+        the given spectrum.
+
+        @param index: The table row
+        @type index: C{int}
+
+        @param lo: The first data element of the range
+        @type lo: C{int}
+
+        @param hi: One past the last data element of the range
+        @type hi: C{int}
+
+
+        @return: The integration and its associated error^2
+        @rtype: C{tuple}
+        """
+        cum_y = self.__cum_y[index]
+        cum_var_y = self.__cum_var_y[index]
+        return (cum_y[hi] - cum_y[lo], cum_var_y[hi] - cum_var_y[lo])
+
+    def integrate(self, start, end, bin_index=False):
+        """
+        This method integrates every spectrum in the table over a window. The
+        start and end of the window can either be single values used for all
+        spectra or one value per spectrum. If the window of a spectrum cannot
+        be found, an error report will be generated with the following
+        information:
+
+        Range not found: pixel ID, start, end, length of data array
+
+        A failing spectrum will have the integration set to C{(nan, nan)}.
+
+        @param start: The start of the window(s)
+        @type start: C{int}, C{float} or C{list}
+
+        @param end: The end of the window(s)
+        @type end: C{int}, C{float} or C{list}
+
+        @param bin_index: (OPTIONAL) Flag that says the window is given as bin
+                                     indicies (I{True}) or axis bounds
+                                     (I{False}). The default is I{False}.
+        @type bin_index: C{boolean}
+
+
+        @return: The integrations and their associated error^2s
+        @rtype: C{tuple} of two C{nessi_list.NessiList}s
+        """
+        import nessi_list
+
+        values = nessi_list.NessiList()
+        err2s = nessi_list.NessiList()
+
+        multi_start = hasattr(start, "__len__")
+        multi_end = hasattr(end, "__len__")
+
+        for i in xrange(len(self.__so)):
+            if multi_start:
+                i_start = start[i]
+            else:
+                i_start = start
+            if multi_end:
+                i_end = end[i]
+            else:
+                i_end = end
+
+            try:
+                (lo, hi) = self.find_window(i, i_start, i_end, bin_index)
+                value = self.integrate_range(i, lo, hi)
+            except IndexError:
+                print "Range not found:", self.__so[i].id, i_start, i_end, \
+                      len(self.__so[i])
+                value = (float('nan'), float('nan'))
+
+            values.append(value[0])
+            err2s.append(value[1])
+
+        return (values, err2s)
+
+if __name__ == "__main__":
+    import hlr_test
+
+    som1 = hlr_test.generate_som()
+
+    print "********** SOM1"
+    print "* ", som1[0]
+    print "* ", som1[1]
+
+    table = IntegrationTable(som1)
+    wtable = IntegrationTable(som1, width=True)
+
+    print "********** IntegrationTable"
+    print "* som                :", table.integrate(0, 5)
+    print "* som (1.5, 3.5)     :", table.integrate(1.5, 3.5)
+    print "* som [1, 3]         :", table.integrate(1, 3, bin_index=True)
+    print "* som [0, -1]        :", table.integrate(0, -1, bin_index=True)
+    print "* som [1,2], [2,4]   :", table.integrate([1, 2], [2, 4],
+                                                   bin_index=True)
+    print "* som (width)        :", wtable.integrate(0, 5)
+    print "* som (out of range) :", table.integrate(7, 9)
@@ -73,10 +73,13 @@ def lin_interpolate_spectra(obj, lint_range, **kwargs):
 
     result = hlr_utils.copy_som_attr(result, res_descr, obj, o_descr)
 
+    # Filtered axes are created once for each distinct axis and filter range
+    # and shared by the spectra using them
+    filtered_axes = {}
+
     # iterate through the values
     import bisect
 
-    import copy
     for i in xrange(hlr_utils.get_length(obj)):
         map_so = hlr_utils.get_map_so(obj, None, i)
 
@@ -84,9 +87,6 @@ def lin_interpolate_spectra(obj, lint_range, **kwargs):
         y_val = hlr_utils.get_value(obj, i, o_descr, "y")
         y_err2 = hlr_utils.get_err2(obj, i, o_descr, "y")
         x_axis = hlr_utils.get_value(obj, i, o_descr, "x", 0)
-        
-        y_new = copy.deepcopy(y_val)
-        var_y_new = copy.deepcopy(y_err2)
 
         # Find the bins for the range to linearly interpolate
         i_start = bisect.bisect(x_axis, lint_range[i][0]) - 1
@@ -98,32 +98,33 @@ def lin_interpolate_spectra(obj, lint_range, **kwargs):
         
         offset = y_val[i_start] - slope * x_axis[i_start]
 
-        for j in xrange(i_start, i_end+1):
-            y_new[j] = (slope * x_axis[j]) + offset
-            var_y_new[j] = y_err2[i_start]
-
         if filter_axis is not None:
             # Find the bins to filter the data
             f_start = bisect.bisect(x_axis, filter_axis[i][0]) - 1
             f_end = bisect.bisect(x_axis, filter_axis[i][1]) - 1
+        else:
+            f_start = 0
+            f_end = len(y_val)
 
-            len_axis = len(x_axis)
+        # Only the kept bins are copied, the others are never touched
+        y_new = y_val[f_start:f_end]
+        var_y_new = y_err2[f_start:f_end]
 
-            # Filter low side
-            y_new.__delslice__(0, f_start)
-            var_y_new.__delslice__(0, f_start)
-            x_axis.__delslice__(0, f_start)
+        err2_start = y_err2[i_start]
+        for j in xrange(max(i_start, f_start), min(i_end + 1, f_end)):
+            y_new[j - f_start] = (slope * x_axis[j]) + offset
+            var_y_new[j - f_start] = err2_start
 
-            # Filter high side
-            low_index = f_end - f_start
-            hi_index = len_axis - 1 - f_start
-            
-            y_new.__delslice__(low_index, hi_index)
-            var_y_new.__delslice__(low_index, hi_index)
-            x_axis.__delslice__(low_index + 1, hi_index + 1)
+        if filter_axis is not None:
+            key = (id(x_axis), f_start, f_end)
+            try:
+                x_new = filtered_axes[key]
+            except KeyError:
+                x_new = x_axis[f_start:f_end + 1]
+                filtered_axes[key] = x_new
 
             hlr_utils.result_insert(result, res_descr, (y_new, var_y_new),
-                                    map_so, "all", 0, [x_axis])        
+                                    map_so, "all", 0, [x_new])
         else:
             hlr_utils.result_insert(result, res_descr, (y_new, var_y_new),
                                     map_so, "y")
@@ -0,0 +1,277 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+class NeXusReader(object):
+    """
+    This class wraps a U{NeXus<www.nexusformat.org>} C{DST} and keeps a store
+    of the spectra read from the file. Region-of-interest selections are
+    projected onto rectangular pixel ranges (I{start_id}, I{end_id}) so that
+    each range is a single bulk read from the file and pixels outside the
+    selection are never decoded. Selections given as L{hlr_utils.PixelSet}s
+    never touch the disk. Every range that has been read is kept in the store,
+    so overlapping selections (signal and background ROIs for instance) only
+    read the shared pixels once. Results drawn from the store
+    share their spectra, so they must not be modified in place. The store is
+    dropped when L{release_resource} is called.
+    """
+
+    def __init__(self, filename, **kwargs):
+        """
+        Object constructor
+
+        @param filename: The name of the NeXus file to read
+        @type filename: C{string}
+
+        @param kwargs: A list of keyword arguments that the function accepts:
+
+        @keyword max_ranges: The maximum number of pixel ranges a
+                             region-of-interest can be split into before
+                             handing the selection back to the C{DST}. The
+                             default value is I{64}.
+        @type max_ranges: C{int}
+
+
+        @raise SystemError: The file cannot be opened by the C{DST}
+        """
+        import DST
+
+        try:
+            self.__max_ranges = kwargs["max_ranges"]
+        except KeyError:
+            self.__max_ranges = 64
+
+        self.__dst = DST.getInstance("application/x-NeXus", filename)
+        self.__store = {}
+
+    def getSOM(self, data_paths, so_axis, **kwargs):
+        """
+        This method reads the requested spectra from the file. The keywords
+        mirror the ones accepted by the NeXus C{DST} C{getSOM} call.
+
+        @param data_paths: The NeXus path and signal pairs for the requested
+                           detector banks
+        @type data_paths: C{tuple} or C{list} of C{tuple}s
+
+        @param so_axis: The name of the main axis to read from the NeXus file
+        @type so_axis: C{string}
+
+        @param kwargs: A list of keyword arguments that the function accepts:
+
+        @keyword roi_file: The name of a file containing the pixel IDs to read
+                           or the set of pixels to read
+        @type roi_file: C{string} or L{hlr_utils.PixelSet}
+
+        @keyword mask_file: The name of a file containing the pixel IDs to
+                            skip or the set of pixels to skip. Mask files are
+                            handed directly to the C{DST} unless the ROI is a
+                            C{PixelSet}. Pixel sets are applied in memory.
+        @type mask_file: C{string} or L{hlr_utils.PixelSet}
+
+        @keyword start_id: The inclusive starting pixel ID of a range
+        @type start_id: C{tuple}
+
+        @keyword end_id: The exclusive ending pixel ID of a range
+        @type end_id: C{tuple}
+
+        @keyword tof_offset: The time-of-flight offset to apply to the axis
+        @type tof_offset: C{tuple}
+
+
+        @return: The requested spectra
+        @rtype: C{SOM.SOM}
+        """
+        import hlr_utils
+
+        roi_file = kwargs.get("roi_file")
+        mask_file = kwargs.get("mask_file")
+        start_id = kwargs.get("start_id")
+        end_id = kwargs.get("end_id")
+        tof_offset = kwargs.get("tof_offset")
+
+        # Pixel sets are applied in memory, so only files reach the DST
+        if isinstance(mask_file, hlr_utils.PixelSet):
+            mask_set = mask_file
+            mask_file = None
+        else:
+            mask_set = None
+
+        if isinstance(roi_file, hlr_utils.PixelSet):
+            roi_set = roi_file
+            roi_file = None
+        elif roi_file is not None:
+            roi_set = hlr_utils.PixelSet(roi_file)
+        else:
+            roi_set = None
+
+        if mask_file is not None:
+            if roi_file is not None or roi_set is None:
+                return self.__dst.getSOM(data_paths, so_axis,
+                                         roi_file=roi_file,
+                                         mask_file=mask_file,
+                                         tof_offset=tof_offset)
+            else:
+                mask_set = hlr_utils.PixelSet(mask_file)
+
+        if roi_set is None:
+            if start_id is None and end_id is None:
+                som = self.__dst.getSOM(data_paths, so_axis,
+                                        tof_offset=tof_offset)
+            else:
+                part = self.__read_range(data_paths, so_axis, start_id,
+                                         end_id, tof_offset)
+                som = self.__new_som(part)
+                som.extend(part)
+        else:
+            som = self.__read_roi(data_paths, so_axis, roi_set, roi_file,
+                                  tof_offset)
+
+        if mask_set is not None:
+            som = mask_set.exclude(som)
+
+        return som
+
+    def release_resource(self):
+        """
+        This method releases the underlying C{DST} and empties the store.
+        """
+        self.__store.clear()
+        self.__dst.release_resource()
+
+    def __read_roi(self, data_paths, so_axis, roi_set, roi_file,
+                   tof_offset):
+        """
+        This method reads the spectra of a region-of-interest. The ROI is
+        split into rectangular pixel ranges, which are read through the
+        store. ROIs needing too many ranges are handed to the C{DST} if they
+        came from a file, otherwise the banks are read whole and the ROI
+        pixels are selected from them.
+
+        @return: The spectra of the region-of-interest
+        @rtype: C{SOM.SOM}
+        """
+        ranges = roi_set.get_ranges()
+        if sum([len(x) for x in ranges.itervalues()]) > self.__max_ranges:
+            if roi_file is not None:
+                return self.__dst.getSOM(data_paths, so_axis,
+                                         roi_file=roi_file,
+                                         tof_offset=tof_offset)
+            ranges = dict([(bank, [(None, None)]) for bank in ranges])
+
+        if isinstance(data_paths, tuple):
+            paths = [data_paths]
+        else:
+            paths = data_paths
+
+        som = None
+        so_list = []
+        for path in paths:
+            bank = path[0].split('/')[-1]
+            try:
+                bank_ranges = ranges[bank]
+            except KeyError:
+                # No selected pixels in this bank, so it is never read
+                continue
+
+            bank_sos = []
+            for (start, end) in bank_ranges:
+                part = self.__read_range(path, so_axis, start, end,
+                                         tof_offset)
+                if som is None:
+                    som = self.__new_som(part)
+                if start is None:
+                    part = roi_set.select(part)
+                bank_sos.extend(part)
+
+            bank_sos.sort(key=lambda so: so.id[1])
+            so_list.extend(bank_sos)
+
+        if som is None:
+            # Nothing from the ROI lives in the requested banks
+            if roi_file is not None:
+                return self.__dst.getSOM(data_paths, so_axis,
+                                         roi_file=roi_file,
+                                         tof_offset=tof_offset)
+            else:
+                return roi_set.select(self.__dst.getSOM(data_paths, so_axis,
+                                                        tof_offset=tof_offset))
+
+        som.extend(so_list)
+
+        return som
+
+    def __read_range(self, path, so_axis, start_id, end_id, tof_offset):
+        """
+        This method returns the spectra of a single pixel range, reading them
+        from the file only if they are not already in the store.
+
+        @return: The spectra of the pixel range
+        @rtype: C{SOM.SOM}
+        """
+        key = (str(path), so_axis, str(start_id), str(end_id),
+               str(tof_offset))
+        try:
+            return self.__store[key]
+        except KeyError:
+            part = self.__dst.getSOM(path, so_axis, start_id=start_id,
+                                     end_id=end_id, tof_offset=tof_offset)
+            self.__store[key] = part
+            return part
+
+    def __new_som(self, part):
+        """
+        This method creates an empty C{SOM} carrying its own copy of the
+        attributes of a stored C{SOM}, so that rekeying the attributes of the
+        result does not alter the store.
+
+        @return: The empty C{SOM}
+        @rtype: C{SOM.SOM}
+        """
+        import copy
+
+        import SOM
+
+        som = SOM.SOM()
+        som.copyAttributes(part)
+        som.attr_list = copy.deepcopy(part.attr_list)
+
+        return som
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    import hlr_utils
+
+    (fd, roi_name) = tempfile.mkstemp()
+    os.close(fd)
+    roi = open(roi_name, 'w')
+    for x in xrange(2, 5):
+        for y in (3, 4, 5, 9):
+            print >> roi, "bank1_%d_%d" % (x, y)
+    print >> roi, "bank3_0_0"
+    roi.close()
+
+    print "* ROI ranges:", hlr_utils.PixelSet(roi_name).get_ranges()
+
+    os.remove(roi_name)
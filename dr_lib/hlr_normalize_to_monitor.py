@@ -0,0 +1,135 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+def normalize_to_monitor(obj, mon, **kwargs):
+    """
+    This function normalizes the detector spectra by a monitor spectrum. It
+    gives the same result as rebinning the monitor with L{rebin_monitor} and
+    dividing the data by the rebinned monitor with L{common_lib.div_ncerr},
+    but the rebinned monitor spectra are never collected into a C{SOM}. The
+    monitor is rebinned once for each distinct axis in the data and that
+    rebinned spectrum divides every spectrum sharing the axis.
+
+    @param obj: Object containing the detector spectra to normalize
+    @type obj: C{SOM.SOM}
+
+    @param mon: Object containing the monitor spectrum
+    @type mon: C{SOM.SOM}
+
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword rtype: A short string that defines the rebinning function to use.
+                    See L{rebin_monitor} for the possibilities. The default
+                    is I{None} which uses L{common_lib.rebin_axis_1D()}.
+    @type rtype: C{string}
+
+
+    @return: Object containing the normalized detector spectra
+    @rtype: C{SOM.SOM}
+
+
+    @raise TypeError: obj or mon is not a C{SOM}
+    """
+    # import the helper functions
+    import hlr_utils
+
+    # Kickout if monitor object is None
+    if mon is None:
+        return obj
+
+    # set up for working through data
+    (result, res_descr) = hlr_utils.empty_result(obj)
+    (o_descr, m_descr) = hlr_utils.get_descr(obj, mon)
+
+    if o_descr != "SOM" or m_descr != "SOM":
+        raise TypeError("Only SOM-SOM normalization is supported")
+
+    hlr_utils.math_compatible(obj, o_descr, mon, m_descr)
+
+    # Check for keywords
+    rtype = kwargs.get("rtype")
+
+    # Set the name of the rebinning function
+    rebin_function_name = "rebin_axis_1D"
+    if rtype is not None:
+        rebin_function_name += "_" + str(rtype)
+
+    # Get function pointer
+    import common_lib
+    rebin_function = getattr(common_lib, rebin_function_name)
+
+    result = hlr_utils.copy_som_attr(result, res_descr, obj, o_descr,
+                                     mon, m_descr)
+
+    import array_manip
+
+    mon_so = hlr_utils.get_value(mon, 0, m_descr, "all")
+
+    # Rebinned monitor spectra keyed by the identity of the axis
+    mon_rebin = {}
+
+    for i in xrange(hlr_utils.get_length(obj)):
+        val = hlr_utils.get_value(obj, i, o_descr, "y")
+        err2 = hlr_utils.get_err2(obj, i, o_descr, "y")
+        x_axis = hlr_utils.get_value(obj, i, o_descr, "x")
+        map_so = hlr_utils.get_map_so(obj, None, i)
+
+        try:
+            mon_value = mon_rebin[id(x_axis)]
+        except KeyError:
+            mon_value = rebin_function(mon_so, x_axis)
+            mon_rebin[id(x_axis)] = mon_value
+
+        value = array_manip.div_ncerr(val, err2, mon_value.y,
+                                      mon_value.var_y)
+
+        hlr_utils.result_insert(result, res_descr, value, map_so, "y")
+
+    return result
+
+if __name__ == "__main__":
+    import hlr_test
+    import SOM
+
+    som1 = SOM.SOM()
+    som1.setAllAxisUnits(["Angstroms"])
+    so1 = SOM.SO(construct=True)    
+    so1.id = 1
+    so1.axis[0].val.extend(range(0, 7, 2))
+    so1.y.extend(0.994, 0.943, 0.932)
+    so1.var_y.extend(0.010, 0.012, 0.013)
+    som1.append(so1)
+
+    som2 = hlr_test.generate_som()
+    som2.setAllAxisUnits(["Angstroms"])
+
+    print "********** SOM1"
+    print "* ", som1[0]
+
+    print "********** SOM2"
+    print "* ", som2[0]
+    print "* ", som2[1]
+
+    print "********** normalize_to_monitor"
+    print "* som/som :", normalize_to_monitor(som2, som1)
+    print "* som/som :", normalize_to_monitor(som2, som1, rtype="frac")
@@ -22,6 +22,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage(label_key="dataset_type")
 def process_dgs_data(obj, conf, bcan, ecan, tcoeff, **kwargs):
     """
     This function combines Steps 7 through 16 in Section 2.1.1 of the data
@@ -166,6 +169,7 @@ def process_dgs_data(obj, conf, bcan, ecan, tcoeff, **kwargs):
     if conf.dump_ctof_comb and b_som1 is not None:
         b_som_1 = dr_lib.sum_all_spectra(b_som1)
         hlr_utils.write_file(conf.output, "text/Spec", b_som_1,
+                             dump_format=conf.dump_format,
                              output_ext="ctof",
                              extra_tag="background",
                              data_ext=conf.ext_replacement,    
@@ -242,6 +246,7 @@ def process_dgs_data(obj, conf, bcan, ecan, tcoeff, **kwargs):
         obj3_1 = dr_lib.sum_all_spectra(obj3,
                                      rebin_axis=conf.lambda_bins.toNessiList())
         hlr_utils.write_file(conf.output, "text/Spec", obj3_1,
+                             dump_format=conf.dump_format,
                              output_ext="fwv",
                              extra_tag=dataset_type,
                              data_ext=conf.ext_replacement,    
@@ -251,30 +256,16 @@ def process_dgs_data(obj, conf, bcan, ecan, tcoeff, **kwargs):
 
         del obj3_1
 
-    # Step 15: Create the detector efficiency
+    # Steps 15 and 16: Divide the detector pixel spectra by the detector
+    # efficiency without creating the efficiency spectra
     if conf.det_eff is not None:
-        if conf.verbose:
-            print "Creating detector efficiency spectra"
-
-        if t is not None:
-            t.getTime(False)
-            
-        det_eff = dr_lib.create_det_eff(obj3)
-
-        if t is not None:
-            t.getTime(msg="After creating detector efficiency spectra ")
-    else:
-        det_eff = None
-
-    # Step 16: Divide the detector pixel spectra by the detector efficiency
-    if det_eff is not None:
         if conf.verbose:
             print "Correcting %s for detector efficiency" % dataset_type
 
         if t is not None:
             t.getTime(False)
 
-        obj4 = common_lib.div_ncerr(obj3, det_eff)
+        obj4 = dr_lib.correct_det_eff(obj3)
 
         if t is not None:
             t.getTime(msg="After correcting %s for detector efficiency" \
@@ -282,6 +273,12 @@ def process_dgs_data(obj, conf, bcan, ecan, tcoeff, **kwargs):
     else:
         obj4 = obj3
 
-    del obj3, det_eff
+    del obj3
+
+    if conf.verbose:
+        share_info = hlr_utils.get_axis_share_info(obj4)
+        print "Axis sharing (%s): %d distinct of %d axis arrays, %d bytes "\
+              "saved" % (dataset_type, share_info[1], share_info[0],
+                         share_info[2])
 
     return obj4
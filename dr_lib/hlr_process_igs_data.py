@@ -24,7 +24,9 @@
 
 import common_lib
 import dr_lib
+import hlr_utils
 
+@hlr_utils.profile_stage(label_key="dataset_type")
 def process_igs_data(datalist, conf, **kwargs):
     """
     This function combines Steps 1 through 8 of the data reduction process for
@@ -96,6 +98,12 @@ def process_igs_data(datalist, conf, **kwargs):
     except KeyError:
         bkg_som = None    
 
+    # Check for the directory of the accumulation state files
+    try:
+        state_dir = conf.state_dir
+    except AttributeError:
+        state_dir = None
+
     # Step 1: Open appropriate data files
     if not conf.mc:
         so_axis = "time_of_flight"
@@ -127,11 +135,24 @@ def process_igs_data(datalist, conf, **kwargs):
         dst_type = "application/x-NeXus"
         data_paths = conf.data_paths.toPath()
 
+    if state_dir is not None and dst_type == "application/x-NeXus":
+        import os
+        dp_state = dr_lib.AccumulationState(os.path.join(state_dir,
+                                                         dataset_type+".bin"),
+                                            dataset_type)
+        dm_state = dr_lib.AccumulationState(os.path.join(state_dir,
+                                                         dataset_type+
+                                                         "_mon.bin"),
+                                            dataset_type+"-monitor")
+    else:
+        dp_state = None
+        dm_state = None
+
     # The [0] is to get the data SOM and ignore the None background SOM
     dp_som0 = dr_lib.add_files(datalist, Data_Paths=data_paths,
                                SO_Axis=so_axis, Signal_ROI=conf.roi_file,
                                dataset_type=dataset_type,
-                               dst_type=dst_type,
+                               dst_type=dst_type, state=dp_state,
                                Verbose=conf.verbose, Timer=t)
 
     if t is not None:
@@ -151,18 +172,22 @@ def process_igs_data(datalist, conf, **kwargs):
             # Since we have a NeXus file, we need to continue
             conf.pre_norm = False
 
-    # Cut the spectra if necessary
-    dp_somA = dr_lib.cut_spectra(dp_som0, conf.tof_cut_min, conf.tof_cut_max)
-
-    del dp_som0
+    # Cut the spectra if necessary and divide by the bin widths
+    dp_pipe = dr_lib.SpectrumPipeline(dp_som0)
+    dp_pipe.cut_spectra(conf.tof_cut_min, conf.tof_cut_max)
+    dp_pipe.fix_bin_contents()
+    dp_som1 = dp_pipe.run()
 
-    dp_som1 = dr_lib.fix_bin_contents(dp_somA)
-
-    del dp_somA    
+    del dp_som0, dp_pipe
 
     if conf.inst_geom is not None:
         i_geom_dst.setGeometry(conf.data_paths.toPath(), dp_som1)
 
+        if dp_som1.attr_list.instrument.get_name() == "BSS":
+            # Keep the pixel solid angles with the geometry file
+            dr_lib.create_geom_table(dp_som1, ["bss_solid_angle"],
+                                     inst_geom=conf.inst_geom)
+
     if conf.no_mon_norm:
         dm_som1 = None
     else:
@@ -173,6 +198,7 @@ def process_igs_data(datalist, conf, **kwargs):
         dm_som0 = dr_lib.add_files(datalist, Data_Paths=conf.mon_path.toPath(),
                                    SO_Axis=so_axis,
                                    dataset_type=dataset_type,
+                                   state=dm_state,
                                    Verbose=conf.verbose,
                                    Timer=t)
         
@@ -219,7 +245,9 @@ def process_igs_data(datalist, conf, **kwargs):
     if t is not None and conf.tib_tofs is not None:
         t.getTime(False)
             
-    B = dr_lib.determine_time_indep_bkg(dp_som2, conf.tib_tofs)
+    # The SOM form is only needed for writing out the background
+    B = dr_lib.determine_time_indep_bkg(dp_som2, conf.tib_tofs,
+                                        as_list=not conf.dump_tib)
 
     if t is not None and B is not None:
         t.getTime(msg="After determining time-independent background ")
@@ -228,6 +256,7 @@ def process_igs_data(datalist, conf, **kwargs):
         file_comment = "TOFs: %s" % conf.tib_tofs
         
         hlr_utils.write_file(conf.output, "text/num-info", B,
+                             dump_format=conf.dump_format,
                              output_ext="tib",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -243,36 +272,23 @@ def process_igs_data(datalist, conf, **kwargs):
     if conf.verbose and B is not None:
         print "Subtracting time-independent background from data"
 
-    if t is not None:
-        t.getTime(False)
-            
-    if B is not None:
-        dp_som3 = common_lib.sub_ncerr(dp_som2, B)
-    else:
-        dp_som3 = dp_som2
-
-    if B is not None and t is not None:
-        t.getTime(msg="After subtracting time-independent background ")
-
-    del dp_som2, B
-
     # Step 5: Subtract time-independent background constant
     if conf.verbose and tib_const is not None:
         print "Subtracting time-independent background constant from data"
-            
-    if t is not None and tib_const is not None:
+
+    if t is not None:
         t.getTime(False)
-                
-    if tib_const is not None:
-        dp_som4 = common_lib.sub_ncerr(dp_som3, tib_const)
-    else:
-        dp_som4 = dp_som3
 
-    if t is not None and tib_const is not None:
-        t.getTime(msg="After subtracting time-independent background "\
-                  +"constant ")
+    # Both subtractions are done in a single pass over the spectra
+    dp_pipe = dr_lib.SpectrumPipeline(dp_som2)
+    dp_pipe.sub_ncerr(B)
+    dp_pipe.sub_ncerr(tib_const)
+    dp_som4 = dp_pipe.run()
+
+    if t is not None and (B is not None or tib_const is not None):
+        t.getTime(msg="After subtracting time-independent background ")
 
-    del dp_som3
+    del dp_som2, dp_pipe, B
 
     # Provide override capability for final wavelength, time-zero slope and
     # time-zero offset
@@ -323,6 +339,7 @@ def process_igs_data(datalist, conf, **kwargs):
 
     if conf.dump_wave:
         hlr_utils.write_file(conf.output, "text/Spec", dp_som5,
+                             dump_format=conf.dump_format,
                              output_ext="pxl",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -331,6 +348,7 @@ def process_igs_data(datalist, conf, **kwargs):
                              message="pixel wavelength information")
     if conf.dump_mon_wave and dm_som2 is not None:
         hlr_utils.write_file(conf.output, "text/Spec", dm_som2,
+                             dump_format=conf.dump_format,
                              output_ext="mxl",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -357,6 +375,7 @@ def process_igs_data(datalist, conf, **kwargs):
 
     if conf.dump_mon_effc and not conf.no_mon_effc and dm_som3 is not None:   
         hlr_utils.write_file(conf.output, "text/Spec", dm_som3,
+                             dump_format=conf.dump_format,
                              output_ext="mel",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -367,22 +386,34 @@ def process_igs_data(datalist, conf, **kwargs):
 
     del dm_som2
 
-    # Step 8: Rebin monitor axis onto detector pixel axis
-    if conf.verbose and dm_som3 is not None:
-        print "Rebin monitor axis to detector pixel axis"
+    # The lambda-dependent background is only done on sample data (aka data)
+    # for the BSS instrument at the SNS
+    do_ldb = conf.inst == "BSS" and conf.ldb_const is not None and \
+             dataset_type == "data"
 
-    if t is not None:
-        t.getTime(False)
+    # Step 8: Rebin monitor axis onto detector pixel axis. The rebinned
+    # monitor spectra are only kept if they are needed beyond the
+    # normalization, otherwise Steps 8 and 15 are done together.
+    if do_ldb or conf.dump_mon_rebin:
+        if conf.verbose and dm_som3 is not None:
+            print "Rebin monitor axis to detector pixel axis"
+
+        if t is not None:
+            t.getTime(False)
 
-    dm_som4 = dr_lib.rebin_monitor(dm_som3, dp_som5)
+        dm_som4 = dr_lib.rebin_monitor(dm_som3, dp_som5)
 
-    if t is not None and dm_som4 is not None:
-        t.getTime(msg="After rebinning monitor ")
+        if t is not None and dm_som4 is not None:
+            t.getTime(msg="After rebinning monitor ")
 
-    del dm_som3
+        # Only the rebinned monitor is needed from here on
+        dm_som3 = None
+    else:
+        dm_som4 = None
 
     if conf.dump_mon_rebin and dm_som4 is not None:        
         hlr_utils.write_file(conf.output, "text/Spec", dm_som4,
+                             dump_format=conf.dump_format,
                              output_ext="mrl",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -391,10 +422,7 @@ def process_igs_data(datalist, conf, **kwargs):
                              message="monitor wavelength information "\
                              +"(rebinned)")
 
-    # The lambda-dependent background is only done on sample data (aka data)
-    # for the BSS instrument at the SNS
-    if conf.inst == "BSS" and conf.ldb_const is not None and \
-           dataset_type == "data":
+    if do_ldb:
         # Step 9: Convert chopper center wavelength to TOF center
         if conf.verbose:
             print "Converting chopper center wavelength to TOF"
@@ -483,7 +511,8 @@ def process_igs_data(datalist, conf, **kwargs):
     del dp_som5
     
     # Step 15: Normalize data by monitor
-    if conf.verbose and dm_som4 is not None:
+    mon_norm = dm_som3 is not None or dm_som4 is not None
+    if conf.verbose and mon_norm:
         print "Normalizing data by monitor"
 
     if t is not None:
@@ -491,21 +520,24 @@ def process_igs_data(datalist, conf, **kwargs):
 
     if dm_som4 is not None:
         dp_som7 = common_lib.div_ncerr(dp_som6, dm_som4)
-
-        if t is not None:
-            t.getTime(msg="After normalizing data by monitor ")
+    elif dm_som3 is not None:
+        dp_som7 = dr_lib.normalize_to_monitor(dp_som6, dm_som3)
     else:
         dp_som7 = dp_som6
 
+    if t is not None and mon_norm:
+        t.getTime(msg="After normalizing data by monitor ")
+
     if conf.dump_wave_mnorm:
         dp_som7_1 = dr_lib.sum_all_spectra(dp_som7,\
                                    rebin_axis=conf.lambda_bins.toNessiList())
 
         write_message = "combined pixel wavelength information"
-        if dm_som4 is not None:
+        if mon_norm:
             write_message += " (monitor normalized)"
         
         hlr_utils.write_file(conf.output, "text/Spec", dp_som7_1,
+                             dump_format=conf.dump_format,
                              output_ext="pml",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -514,7 +546,13 @@ def process_igs_data(datalist, conf, **kwargs):
                              message=write_message)
         del dp_som7_1
 
-    del dm_som4, dp_som6
+    del dm_som3, dm_som4, dp_som6
+
+    if conf.verbose:
+        share_info = hlr_utils.get_axis_share_info(dp_som7)
+        print "Axis sharing (%s): %d distinct of %d axis arrays, %d bytes "\
+              "saved" % (dataset_type, share_info[1], share_info[0],
+                         share_info[2])
 
     return dp_som7
 
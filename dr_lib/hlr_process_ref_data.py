@@ -22,6 +22,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage(label_key="dataset_type")
 def process_ref_data(datalist, conf, signal_roi_file, bkg_roi_file=None,
                      no_bkg=False, **kwargs):
     """
@@ -175,34 +178,29 @@ def process_ref_data(datalist, conf, signal_roi_file, bkg_roi_file=None,
         tof_cut_min = conf.tof_cut_min
         tof_cut_max = conf.tof_cut_max
 
-    # Cut the spectra if necessary
-    d_som2 = dr_lib.cut_spectra(d_som1A, tof_cut_min, tof_cut_max)
-
-    del d_som1A
-
-    if b_som1A is not None:
-        b_som2 = dr_lib.cut_spectra(b_som1A, tof_cut_min, tof_cut_max)
-        del b_som1A
-    else:
-        b_som2 = b_som1A
-
     # Fix TOF cuts to make them list of integers
     try:
         tof_cuts = [int(x) for x in tof_cuts]
     # This will trigger if tof_cuts is None
     except TypeError:
         pass
-        
-    d_som3 = dr_lib.zero_bins(d_som2, tof_cuts)
 
-    del d_som2
+    # Cut the spectra if necessary and zero the requested bins
+    d_pipe = dr_lib.SpectrumPipeline(d_som1A)
+    d_pipe.cut_spectra(tof_cut_min, tof_cut_max)
+    d_pipe.zero_bins(tof_cuts)
+    d_som3 = d_pipe.run()
 
-    if b_som2 is not None:
-        b_som3 = dr_lib.zero_bins(b_som2, tof_cuts)
-        
-        del b_som2
+    del d_som1A, d_pipe
+
+    if b_som1A is not None:
+        b_pipe = dr_lib.SpectrumPipeline(b_som1A)
+        b_pipe.cut_spectra(tof_cut_min, tof_cut_max)
+        b_pipe.zero_bins(tof_cuts)
+        b_som3 = b_pipe.run()
+        del b_som1A, b_pipe
     else:
-        b_som3 = b_som2
+        b_som3 = b_som1A
 
     if conf.dump_specular:
         if no_tof_cuts:
@@ -211,6 +209,7 @@ def process_ref_data(datalist, conf, signal_roi_file, bkg_roi_file=None,
         else:
             d_som3_1 = d_som3
         hlr_utils.write_file(conf.output, "text/Spec", d_som3_1,
+                             dump_format=conf.dump_format,
                              output_ext="sdc",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -244,6 +243,7 @@ def process_ref_data(datalist, conf, signal_roi_file, bkg_roi_file=None,
         else:
             B_1 = B
         hlr_utils.write_file(conf.output, "text/Spec", B_1,
+                             dump_format=conf.dump_format,
                              output_ext="bkg",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -271,6 +271,7 @@ def process_ref_data(datalist, conf, signal_roi_file, bkg_roi_file=None,
         else:
             d_som4_1 = d_som4
         hlr_utils.write_file(conf.output, "text/Spec", d_som4_1,
+                             dump_format=conf.dump_format,
                              output_ext="sub",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -22,6 +22,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage()
 def process_reflp_data(datalist, conf, roi_file, bkg_roi_file=None,
                      no_bkg=False, **kwargs):
     """
@@ -21,6 +21,9 @@
 
 # $Id$
 
+import hlr_utils
+
+@hlr_utils.profile_stage(label_key="dataset_type")
 def process_sas_data(datalist, conf, **kwargs):
     """
     This function combines Steps 1 through 9 of the data reduction process for
@@ -147,6 +150,11 @@ def process_sas_data(datalist, conf, **kwargs):
     if conf.inst_geom is not None:
         i_geom_dst.setGeometry(conf.data_paths.toPath(), dp_som1)
 
+        if conf.facility == "LENS":
+            # Keep the geometrical correction factors with the geometry file
+            dr_lib.create_geom_table(dp_som1, ["sas_correct"],
+                                     inst_geom=conf.inst_geom)
+
     if conf.dump_tof_r:
         dp_som1_1 = dr_lib.create_param_vs_Y(dp_som1, "radius", "param_array",
                                              conf.r_bins.toNessiList(),
@@ -156,6 +164,7 @@ def process_sas_data(datalist, conf, **kwargs):
                                              x_units=["m", "usec"])
 
         hlr_utils.write_file(conf.output, "text/Dave2d", dp_som1_1,
+                             dump_format=conf.dump_format,
                              output_ext="tvr",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -174,6 +183,7 @@ def process_sas_data(datalist, conf, **kwargs):
                                              x_units=["rads", "usec"])
 
         hlr_utils.write_file(conf.output, "text/Dave2d", dp_som1_1,
+                             dump_format=conf.dump_format,
                              output_ext="tvt",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -341,6 +351,7 @@ def process_sas_data(datalist, conf, **kwargs):
         
     if conf.dump_wave:
         hlr_utils.write_file(conf.output, "text/Spec", dp_som3,
+                             dump_format=conf.dump_format,
                              output_ext="pxl",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -350,6 +361,7 @@ def process_sas_data(datalist, conf, **kwargs):
     if conf.dump_bmon_wave:
         if conf.beammon_over is None:
             hlr_utils.write_file(conf.output, "text/Spec", dbm_som2,
+                                 dump_format=conf.dump_format,
                                  output_ext="bmxl",
                                  extra_tag=dataset_type,
                                  verbose=conf.verbose,
@@ -361,6 +373,7 @@ def process_sas_data(datalist, conf, **kwargs):
             dbm_som2_1 = dr_lib.sum_by_rebin_frac(dbm_som2,
                                                conf.lambda_bins.toNessiList())
             hlr_utils.write_file(conf.output, "text/Spec", dbm_som2_1,
+                                 dump_format=conf.dump_format,
                                  output_ext="bmxl",
                                  extra_tag=dataset_type,
                                  verbose=conf.verbose,
@@ -410,6 +423,7 @@ def process_sas_data(datalist, conf, **kwargs):
 
     if conf.dump_bmon_effc and conf.mon_effc:   
         hlr_utils.write_file(conf.output, "text/Spec", dbm_som3,
+                             dump_format=conf.dump_format,
                              output_ext="bmel",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -438,29 +452,24 @@ def process_sas_data(datalist, conf, **kwargs):
     if t is not None and conf.mon_effc and dtm_som2 is not None:
         t.getTime(msg="After efficiency correcting beam monitor ")
 
+    # The detector efficiency, transmission monitor and geometrical
+    # corrections are applied together after the beam monitor normalization
+    # unless the data is needed in between
+    fuse_corr = not transmission and not conf.dump_wave_bmnorm \
+                and not conf.dump_wave_r and not conf.dump_wave_theta
+
     # Step 5: Efficiency correct detector pixels
-    if conf.det_effc:
+    if conf.det_effc and not fuse_corr:
         if conf.verbose:
-            print "Calculating detector efficiency"
+            print "Applying detector efficiency"
 
         if t is not None:
             t.getTime(False)
 
-        det_eff = dr_lib.create_det_eff(dp_som4, inst_name=conf.inst,
+        dp_som5 = dr_lib.correct_det_eff(dp_som4, inst_name=conf.inst,
                                       eff_scale_const=conf.det_eff_scale_const,
                                       eff_atten_const=conf.det_eff_atten_const)
 
-        if t is not None:
-            t.getTime(msg="After calculating detector efficiency")
-
-        if conf.verbose:
-            print "Applying detector efficiency"
-
-        if t is not None:
-            t.getTime(False)
-
-        dp_som5 = common_lib.div_ncerr(dp_som4, det_eff)
-
         if t is not None:
             t.getTime(msg="After spplying detector efficiency")
 
@@ -469,8 +478,14 @@ def process_sas_data(datalist, conf, **kwargs):
 
     del dp_som4
 
-    # Step 6: Rebin beam monitor axis onto detector pixel axis
-    if conf.beammon_over is None:
+    # Step 6: Rebin beam monitor axis onto detector pixel axis. The rebinned
+    # beam monitor spectra are only kept if they are dumped, otherwise Steps
+    # 6 and 7 are done together.
+    fuse_bmon_norm = conf.beammon_over is None and not conf.no_bmon_norm \
+                     and not conf.dump_bmon_rebin
+    if fuse_bmon_norm:
+        dbm_som4 = None
+    elif conf.beammon_over is None:
         if not conf.no_bmon_norm:
             if conf.verbose:
                 print "Rebin beam monitor axis to detector pixel axis"
@@ -487,10 +502,9 @@ def process_sas_data(datalist, conf, **kwargs):
     else:
         dbm_som4 = dbm_som3
 
-    del dbm_som3
-
     if conf.dump_bmon_rebin:
         hlr_utils.write_file(conf.output, "text/Spec", dbm_som4,
+                             dump_format=conf.dump_format,
                              output_ext="bmrl",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -507,14 +521,18 @@ def process_sas_data(datalist, conf, **kwargs):
         if t is not None:
             t.getTime(False)
 
-        dp_som6 = common_lib.div_ncerr(dp_som5, dbm_som4)
+        if fuse_bmon_norm:
+            dp_som6 = dr_lib.normalize_to_monitor(dp_som5, dbm_som3,
+                                                  rtype="frac")
+        else:
+            dp_som6 = common_lib.div_ncerr(dp_som5, dbm_som4)
 
         if t is not None:
             t.getTime(msg="After normalizing data by beam monitor ")
     else:
         dp_som6 = dp_som5
 
-    del dp_som5
+    del dbm_som3, dbm_som4, dp_som5
 
     if transmission:
         return dp_som6
@@ -527,6 +545,7 @@ def process_sas_data(datalist, conf, **kwargs):
         write_message += " (beam monitor normalized)"
         
         hlr_utils.write_file(conf.output, "text/Spec", dp_som6_1,
+                             dump_format=conf.dump_format,
                              output_ext="pbml",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -545,6 +564,7 @@ def process_sas_data(datalist, conf, **kwargs):
                                    x_units=["m", "Angstrom"])
 
         hlr_utils.write_file(conf.output, "text/Dave2d", dp_som6_1,
+                             dump_format=conf.dump_format,
                              output_ext="lvr",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -564,6 +584,7 @@ def process_sas_data(datalist, conf, **kwargs):
                                    x_units=["rads", "Angstrom"])
 
         hlr_utils.write_file(conf.output, "text/Dave2d", dp_som6_1,
+                             dump_format=conf.dump_format,
                              output_ext="lvt",
                              extra_tag=dataset_type,
                              verbose=conf.verbose,
@@ -573,7 +594,7 @@ def process_sas_data(datalist, conf, **kwargs):
 
         del dp_som6_1
 
-    # Step 8: Rebin transmission monitor axis onto detector pixel axis
+    # Use the transmission spectrum from file if one was provided
     if trans_data is not None:
         print "Reading in transmission monitor data from file"
 
@@ -583,43 +604,53 @@ def process_sas_data(datalist, conf, **kwargs):
                                     Verbose=conf.verbose,
                                     Timer=t)
 
-    
-    if conf.verbose and dtm_som3 is not None:
-        print "Rebin transmission monitor axis to detector pixel axis"
-        
-    if t is not None:
-        t.getTime(False)
-
-    dtm_som4 = dr_lib.rebin_monitor(dtm_som3, dp_som6, rtype="frac")
-
-    if t is not None and dtm_som3 is not None:
-        t.getTime(msg="After rebinning transmission monitor ")
 
-    del dtm_som3
-
-    # Step 9: Normalize data by transmission monitor    
-    if conf.verbose and dtm_som4 is not None:
+    # Steps 8 and 9: Rebin transmission monitor axis onto detector pixel axis
+    # and normalize data by transmission monitor. The monitor is rebinned
+    # once for each distinct pixel axis while normalizing.
+    if conf.verbose and dtm_som3 is not None:
         print "Normalizing data by transmission monitor"
 
     if t is not None:
         t.getTime(False)
 
-    if dtm_som4 is not None:
+    if dtm_som3 is not None:
         # The transmission spectra derived from sas_tranmission does not have
         # the same y information by convention as sample data or a
         # tranmission monitor. Therefore, we'll fake it by setting the
         # y information from the sample data into the transmission
         if trans_data is not None:
-            dtm_som4.setYLabel(dp_som6.getYLabel())
-            dtm_som4.setYUnits(dp_som6.getYUnits())
-        dp_som7 = common_lib.div_ncerr(dp_som6, dtm_som4)
+            dtm_som3.setYLabel(dp_som6.getYLabel())
+            dtm_som3.setYUnits(dp_som6.getYUnits())
+
+    if fuse_corr:
+        # Steps 5, 9 and 11 are done together. The geometrical correction
+        # factors do not depend on the axis, so they are applied before the
+        # conversion to scalar Q.
+        if conf.verbose:
+            if conf.det_effc:
+                print "Applying detector efficiency"
+            if conf.facility == "LENS":
+                print "Applying geometrical correction"
+
+        dp_som7 = dr_lib.apply_sas_factors(dp_som6, det_eff=conf.det_effc,
+                                      inst_name=conf.inst,
+                                      eff_scale_const=conf.det_eff_scale_const,
+                                      eff_atten_const=conf.det_eff_atten_const,
+                                      trans_mon=dtm_som3, rtype="frac",
+                                      sas_correct=(conf.facility == "LENS"))
+    elif dtm_som3 is not None:
+        dp_som7 = dr_lib.normalize_to_monitor(dp_som6, dtm_som3, rtype="frac")
     else:
         dp_som7 = dp_som6
 
-    if t is not None and dtm_som4 is not None:
-        t.getTime(msg="After normalizing data by transmission monitor ")
+    if t is not None:
+        if fuse_corr:
+            t.getTime(msg="After applying SAS corrections ")
+        elif dtm_som3 is not None:
+            t.getTime(msg="After normalizing data by transmission monitor ")
 
-    del dp_som6
+    del dtm_som3, dp_som6
 
     # Step 10: Convert wavelength to Q for data
     if conf.verbose:
@@ -635,7 +666,7 @@ def process_sas_data(datalist, conf, **kwargs):
         
     del dp_som7
 
-    if conf.facility == "LENS":
+    if conf.facility == "LENS" and not fuse_corr:
         # Step 11: Apply SAS correction factor to data
         if conf.verbose:
             print "Applying geometrical correction"
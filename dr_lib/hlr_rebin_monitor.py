@@ -28,7 +28,11 @@ def rebin_monitor(obj1, obj2, **kwargs):
     and rebins the data for obj1 onto the axis provided by obj2. The pixel ID
     can be transferred as the pixel ID of the rebinned monitor histogram. A
     prefix is placed on the bank ID to dilineate that this is a rebinned
-    monitor spectrum for that pixel.
+    monitor spectrum for that pixel. The monitor is only rebinned once for
+    each distinct axis and the spectra for pixels sharing that axis share the
+    rebinned arrays, so they must not be modified in place. To normalize data
+    by a monitor without keeping the rebinned monitor spectra, use
+    L{normalize_to_monitor}.
 
     @param obj1: Monitor object that will be rebinned
     @type obj1: C{SOM.SOM} or C{SOM.SO}
@@ -110,7 +114,7 @@ def rebin_monitor(obj1, obj2, **kwargs):
 
     # Get function pointer
     import common_lib
-    rebin_function = common_lib.__getattribute__(rebin_function_name)
+    rebin_function = getattr(common_lib, rebin_function_name)
 
     result = hlr_utils.copy_som_attr(result, res_descr, obj1, o1_descr)
 
@@ -120,10 +124,26 @@ def rebin_monitor(obj1, obj2, **kwargs):
     # Cache length
     len_obj2 = hlr_utils.get_length(obj2)
 
+    # Rebinned monitor spectra keyed by the identity of the axis
+    mon_rebin = {}
+
+    import SOM
+
     for i in xrange(len_obj2):
         val2 = hlr_utils.get_value(obj2, i, o2_descr, "x")
 
-        value = rebin_function(val1, val2)
+        try:
+            rebin_so = mon_rebin[id(val2)]
+        except KeyError:
+            value = rebin_function(val1, val2)
+            mon_rebin[id(val2)] = value
+        else:
+            # Spectra with the same axis share the rebinned monitor arrays
+            value = SOM.SO(rebin_so.dim())
+            value.id = rebin_so.id
+            value.y = rebin_so.y
+            value.var_y = rebin_so.var_y
+            hlr_utils.share_axis(value, rebin_so)
 
         if use_pix_id:
             # Set the pixel ID to the spectrum with modified bank ID
@@ -65,15 +65,25 @@ def shift_spectrum(obj, shift_point, min_ext, max_ext, scale_const=None):
     import array_manip
     import utils
 
+    # Bin centers are calculated once for each distinct axis
+    bin_centers = {}
+
     len_obj = hlr_utils.get_length(obj)
     for i in xrange(len_obj):
         val = hlr_utils.get_value(obj, i, o_descr, "y")
         err2 = hlr_utils.get_err2(obj, i, o_descr, "y")
         x_axis = hlr_utils.get_value(obj, i, o_descr, "x", 0)
-        x_err2 = hlr_utils.get_err2(obj, i, o_descr, "x", 0)
         map_so = hlr_utils.get_map_so(obj, None, i)
 
-        bin_center = utils.calc_bin_centers(x_axis, x_err2)
+        # The axis error^2 is a new array of zeros on every call when the
+        # axis has none, so the key uses the stored one
+        key = (id(x_axis), id(map_so.axis[0].var))
+        try:
+            bin_center = bin_centers[key]
+        except KeyError:
+            x_err2 = hlr_utils.get_err2(obj, i, o_descr, "x", 0)
+            bin_center = utils.calc_bin_centers(x_axis, x_err2)
+            bin_centers[key] = bin_center
 
         # Get shift point and extents
         sp = hlr_utils.get_value(shift_point, i, s_descr, "y")
@@ -0,0 +1,335 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+class SpectrumPipeline(object):
+    """
+    This class records a chain of per-spectrum operations (L{cut_spectra},
+    L{fix_bin_contents}, L{zero_bins}, C{common_lib.sub_ncerr} and
+    C{common_lib.mult_ncerr}) and runs them together when L{run} is called.
+    Each spectrum is taken through the whole chain in one pass, so only the
+    final C{SOM} is created instead of one C{SOM} per step. Cut ranges and
+    bin widths are calculated once per distinct axis and the cut axes are
+    shared between the resulting spectra. The results are the same as calling
+    the individual functions one after the other. Every recording method
+    returns the pipeline so calls can be chained.
+    """
+
+    def __init__(self, obj):
+        """
+        Object constructor
+
+        @param obj: Object containing the spectra to transform
+        @type obj: C{SOM.SOM} or C{SOM.SO}
+
+
+        @raise TypeError: A C{SOM} or C{SO} is not given to the function.
+        """
+        import hlr_utils
+
+        o_descr = hlr_utils.get_descr(obj)
+        if o_descr != "SOM" and o_descr != "SO":
+            raise TypeError("Incoming object must be a SOM or a SO")
+
+        self.__obj = obj
+        self.__o_descr = o_descr
+        self.__steps = []
+
+    def cut_spectra(self, low_cut, high_cut, **kwargs):
+        """
+        This method records a L{cut_spectra} step.
+
+        @param low_cut: The low-side axis cutoff
+        @type low_cut: C{float}
+
+        @param high_cut: The high-side axis cutoff
+        @type high_cut: C{float}
+
+        @param kwargs: A list of keyword arguments that the function accepts:
+
+        @keyword num_bins_clean: The number of extra bins to cut from the
+                                 spectra.
+        @type num_bins_clean: C{int}
+
+
+        @return: The pipeline
+        @rtype: L{SpectrumPipeline}
+        """
+        if low_cut is not None or high_cut is not None:
+            self.__steps.append(("cut", (low_cut, high_cut,
+                                         kwargs.get("num_bins_clean", 0))))
+        return self
+
+    def fix_bin_contents(self, **kwargs):
+        """
+        This method records a L{fix_bin_contents} step.
+
+        @param kwargs: A list of keyword arguments that the function accepts:
+
+        @keyword scale: A flag that signals multiplication by the required bin
+                        quantity. The default is I{False} (divide).
+        @type scale: C{bool}
+
+        @keyword width: A flag that signals that the adjusting quantity is the
+                        bin width. The default is I{True}. If I{False}, the
+                        bin center is used.
+        @type width: C{bool}
+
+        @keyword units: The expected units for this function. The default for
+                        this function is I{microsecond}.
+        @type units: C{string}
+
+
+        @return: The pipeline
+        @rtype: L{SpectrumPipeline}
+        """
+        import hlr_utils
+
+        units = kwargs.get("units", "microsecond")
+        if self.__o_descr == "SOM":
+            axis_pos = hlr_utils.one_d_units(self.__obj, units)
+        else:
+            axis_pos = 0
+
+        self.__steps.append(("fix", (kwargs.get("scale", False),
+                                     kwargs.get("width", True), axis_pos)))
+        return self
+
+    def zero_bins(self, z_bins):
+        """
+        This method records a L{zero_bins} step.
+
+        @param z_bins: The set of bins that will be zeroed
+        @type z_bins: C{list} of C{int}s
+
+
+        @return: The pipeline
+        @rtype: L{SpectrumPipeline}
+        """
+        if z_bins is not None:
+            self.__steps.append(("zero", frozenset(z_bins)))
+        return self
+
+    def sub_ncerr(self, right):
+        """
+        This method records the subtraction of an object from the spectra.
+
+        @param right: Object on the right of the subtraction sign
+        @type right: C{SOM.SOM}, C{SOM.SO}, C{tuple} or C{list} of C{tuple}s
+
+
+        @return: The pipeline
+        @rtype: L{SpectrumPipeline}
+        """
+        return self.__add_math("sub", right)
+
+    def mult_ncerr(self, right):
+        """
+        This method records the multiplication of the spectra by an object.
+
+        @param right: Object on the right of the multiplication sign
+        @type right: C{SOM.SOM}, C{SOM.SO}, C{tuple} or C{list} of C{tuple}s
+
+
+        @return: The pipeline
+        @rtype: L{SpectrumPipeline}
+        """
+        return self.__add_math("mult", right)
+
+    def run(self):
+        """
+        This method runs the recorded steps over all the spectra.
+
+        @return: Object containing the transformed spectra
+        @rtype: C{SOM.SOM} or C{SOM.SO}
+        """
+        if not len(self.__steps):
+            return self.__obj
+
+        import array_manip
+        import hlr_utils
+        import utils
+
+        obj = self.__obj
+        o_descr = self.__o_descr
+
+        (result, res_descr) = hlr_utils.empty_result(obj)
+        result = hlr_utils.copy_som_attr(result, res_descr, obj, o_descr)
+
+        # Attributes are merged step by step as the individual calls would
+        for (kind, args) in self.__steps:
+            if kind != "sub" and kind != "mult":
+                continue
+            (right, r_descr) = args
+            if r_descr == "SOM" and o_descr == "SOM":
+                hlr_utils.math_compatible(obj, o_descr, right, r_descr)
+            if res_descr == "SOM":
+                (tmp, tmp_descr) = hlr_utils.empty_result(result)
+                result = hlr_utils.copy_som_attr(tmp, tmp_descr,
+                                                 result, res_descr,
+                                                 right, r_descr)
+
+        cuts = {}
+        bin_consts = {}
+
+        for i in xrange(hlr_utils.get_length(obj)):
+            map_so = hlr_utils.get_map_so(obj, None, i)
+
+            y_val = hlr_utils.get_value(obj, i, o_descr, "y")
+            y_err2 = hlr_utils.get_err2(obj, i, o_descr, "y")
+            # The axis at position 0 is the one that can be cut
+            axis = hlr_utils.get_value(obj, i, o_descr, "x", 0)
+            axis_err2 = hlr_utils.get_err2(obj, i, o_descr, "x", 0)
+            is_cut = False
+            owned = False
+
+            for step in xrange(len(self.__steps)):
+                (kind, args) = self.__steps[step]
+
+                if kind == "cut":
+                    key = (id(axis), step)
+                    try:
+                        (low_bin, high_bin, axis_new) = cuts[key]
+                    except KeyError:
+                        (low_cut, high_cut, offset) = args
+                        if low_cut is None:
+                            low_bin = 0
+                        else:
+                            low_bin = utils.bisect_helper(axis, low_cut)
+                            low_bin += 1 + offset
+                        if high_cut is None:
+                            high_bin = len(axis)
+                        else:
+                            high_bin = utils.bisect_helper(axis, high_cut)
+                            high_bin -= offset
+                        if high_bin != 0:
+                            axis_new = axis[low_bin:high_bin+1]
+                        else:
+                            axis_new = axis
+                        cuts[key] = (low_bin, high_bin, axis_new)
+
+                    if high_bin != 0:
+                        y_val = y_val[low_bin:high_bin]
+                        y_err2 = y_err2[low_bin:high_bin]
+                        # A cut axis is inserted without its uncertainties
+                        axis = axis_new
+                        axis_err2 = None
+                        owned = True
+                    is_cut = True
+
+                elif kind == "fix":
+                    (scale, width, axis_pos) = args
+                    if axis_pos == 0:
+                        (x_val, x_err2) = (axis, axis_err2)
+                    else:
+                        x_val = hlr_utils.get_value(obj, i, o_descr, "x",
+                                                    axis_pos)
+                        x_err2 = hlr_utils.get_err2(obj, i, o_descr, "x",
+                                                    axis_pos)
+                    key = (id(x_val), step)
+                    try:
+                        (bin_const, bin_const_err2) = bin_consts[key]
+                    except KeyError:
+                        if width:
+                            bin_const_info = utils.calc_bin_widths(x_val,
+                                                                   x_err2)
+                        else:
+                            bin_const_info = utils.calc_bin_centers(x_val,
+                                                                    x_err2)
+                        bin_consts[key] = bin_const_info
+                        (bin_const, bin_const_err2) = bin_const_info
+
+                    if scale:
+                        math_op = array_manip.mult_ncerr
+                    else:
+                        math_op = array_manip.div_ncerr
+                    (y_val, y_err2) = math_op(y_val, y_err2, bin_const,
+                                              bin_const_err2)
+                    owned = True
+
+                elif kind == "zero":
+                    if not owned:
+                        y_val = y_val[:]
+                        y_err2 = y_err2[:]
+                        owned = True
+                    len_y = len(y_val)
+                    for j in args:
+                        if j >= 0 and j < len_y:
+                            y_val[j] = 0.0
+                            y_err2[j] = 0.0
+
+                else:
+                    (right, r_descr) = args
+                    val2 = hlr_utils.get_value(right, i, r_descr, "y")
+                    err2_2 = hlr_utils.get_err2(right, i, r_descr, "y")
+                    if kind == "sub":
+                        math_op = array_manip.sub_ncerr
+                    else:
+                        math_op = array_manip.mult_ncerr
+                    (y_val, y_err2) = math_op(y_val, y_err2, val2, err2_2)
+                    owned = True
+
+            if is_cut:
+                hlr_utils.result_insert(result, res_descr, (y_val, y_err2),
+                                        map_so, "all", 0, [axis])
+            else:
+                hlr_utils.result_insert(result, res_descr, (y_val, y_err2),
+                                        map_so, "y")
+
+        return result
+
+    def __add_math(self, kind, right):
+        """
+        This method records an arithmetic step.
+
+        @param kind: The type of operation: I{sub} or I{mult}
+        @type kind: C{string}
+
+        @param right: Object on the right of the operator
+        @type right: C{SOM.SOM}, C{SOM.SO}, C{tuple} or C{list} of C{tuple}s
+
+
+        @return: The pipeline
+        @rtype: L{SpectrumPipeline}
+        """
+        import hlr_utils
+
+        if right is not None:
+            self.__steps.append((kind, (right, hlr_utils.get_descr(right))))
+        return self
+
+if __name__ == "__main__":
+    import hlr_test
+
+    som1 = hlr_test.generate_som("histogram")
+    som1.setAllAxisUnits(["microsecond"])
+
+    print "********** SOM1"
+    print "* ", som1[0]
+    print "* ", som1[1]
+
+    print "********** SpectrumPipeline"
+    pipe = SpectrumPipeline(som1)
+    pipe.cut_spectra(0.6, 3.75).fix_bin_contents().zero_bins([1])
+    pipe.sub_ncerr((1, 1)).mult_ncerr((2, 1))
+    print "* som: ", pipe.run()
@@ -62,6 +62,8 @@ def zero_bins(obj, z_bins):
     # iterate through the values
     import nessi_list
 
+    z_set = set(z_bins)
+
     for i in xrange(hlr_utils.get_length(obj)):
         map_so = hlr_utils.get_map_so(obj, None, i)
 
@@ -73,7 +75,7 @@ def zero_bins(obj, z_bins):
         var_y_new = nessi_list.NessiList()
 
         for j in xrange(len(y_val)):
-            if j in z_bins:
+            if j in z_set:
                 y_new.append(0.0)
                 var_y_new.append(0.0)            
             else:
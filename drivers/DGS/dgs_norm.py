@@ -176,8 +176,11 @@ def run(config, tim=None):
         print "Making mask file"
 
     # Make mask file from threshold
-    dr_lib.filter_normalization(n_som3, config.lo_threshold,
-                                config.hi_threshold, config)
+    mask = dr_lib.filter_normalization(n_som3, config.lo_threshold,
+                                       config.hi_threshold, config)
+
+    if config.verbose:
+        print "Masked %d pixels" % len(mask)
 
     if tim is not None:
         tim.getTime(msg="After making mask file ")
@@ -253,6 +256,11 @@ if __name__ == "__main__":
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
     (options, args) = parser.parse_args()
 
     # Set up the configuration
@@ -275,12 +283,8 @@ if __name__ == "__main__":
     if hlr_utils.cli_provide_override(configure, "wb_norm", "--wb-norm"):
         configure.wb_norm = options.wb_norm
         
-    # Set timer object if timing option is used
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
 
     # Need to add a None for the mask file
     configure.mask_file = None
@@ -67,17 +67,16 @@ def run(config, tim=None):
         if type(config.mask_file) == type([]):
             if len(config.mask_file) > 1:
                 if config.verbose:
-                    print "Creating combined mask file"
+                    print "Creating combined mask"
 
                 if tim is not None:
                     tim.getTime(False)
-        
-                config.mask_file = hlr_utils.merge_roi_files(\
-                        config.mask_file,
-                        config)
+
+                # The combined mask is kept in memory
+                config.mask_file = hlr_utils.PixelSet(config.mask_file)
 
                 if tim is not None:
-                    tim.getTime(msg="After creating combined mask file")
+                    tim.getTime(msg="After creating combined mask")
             else:
                 config.mask_file = config.mask_file[0]
         else:
@@ -153,12 +152,26 @@ def run(config, tim=None):
         if config.verbose:
             print "Reading normalization information"
 
+        # The text read needs a mask file, so a combined mask is written to
+        # a temporary file
+        if isinstance(config.mask_file, hlr_utils.PixelSet):
+            import os
+            import tempfile
+            (fd, norm_mask) = tempfile.mkstemp(suffix=".dat")
+            os.close(fd)
+            config.mask_file.write(norm_mask)
+        else:
+            norm_mask = config.mask_file
+
         norm_int = dr_lib.add_files(config.norm, Signal_ROI=config.roi_file,
-                                    Signal_MASK=config.mask_file,
+                                    Signal_MASK=norm_mask,
                                     dataset_type="normalization",
                                     dst_type="text/num-info",
                                     Verbose=config.verbose,
                                     Timer=tim)
+
+        if norm_mask is not config.mask_file:
+            os.remove(norm_mask)
         
         # Make the labels and units compatible with a NeXus file based SOM
         norm_int.setAllAxisLabels(["wavelength"])
@@ -219,6 +232,7 @@ def run(config, tim=None):
     if config.dump_et_comb:
         d_som5_1 = dr_lib.sum_all_spectra(d_som5)
         hlr_utils.write_file(config.output, "text/Spec", d_som5_1,
+                             dump_format=config.dump_format,
                              output_ext="et",
                              data_ext=config.ext_replacement,    
                              path_replacement=config.path_replacement,
@@ -360,6 +374,14 @@ if __name__ == "__main__":
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
+    # Add the result cache options
+    hlr_utils.add_cache_options(parser)
+
     (options, args) = parser.parse_args()
 
     # Set up the configuration
@@ -368,12 +390,10 @@ if __name__ == "__main__":
     # Call the configuration setter for DgsRedOptions
     hlr_utils.DgsRedConfiguration(parser, configure, options, args)
 
-    # Set timer object if timing option is used
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
     
-    # Run the program
-    run(configure, timer)
+    # Run the program unless an identical run is in the result cache
+    hlr_utils.run_cached(run, configure, timer, no_cache=options.no_cache,
+                         cache_dir=options.cache_dir,
+                         cache_size=options.cache_size)
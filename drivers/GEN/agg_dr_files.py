@@ -54,9 +54,16 @@ def run(config, tim):
     if config.verbose:
         print "Initial file type:", dst_type
 
-    d_som1 = dr_lib.add_files(config.data, dst_type=dst_type,
-                              Verbose=config.verbose,
-                              Timer=tim)
+    if config.state is not None:
+        state = dr_lib.AccumulationState(config.state)
+    else:
+        state = None
+
+    d_som1 = dr_lib.accumulate_files(config.data, dst_type=dst_type,
+                                     read_ahead=config.read_ahead,
+                                     state=state,
+                                     Verbose=config.verbose,
+                                     Timer=tim)
 
     hlr_utils.write_file(config.output, dst_type, d_som1,
                          verbose=config.verbose,
@@ -92,6 +99,23 @@ if __name__ == "__main__":
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
+    parser.add_option("", "--read-ahead", dest="read_ahead", type="int",
+                      help="Specify the number of files to parse in "\
+                      +"worker processes while the sum is made. The default "\
+                      +"is 0.")
+    parser.set_defaults(read_ahead=0)
+
+    parser.add_option("", "--state", dest="state", metavar="FILENAME",
+                      help="Specify a state file holding the sum of the "\
+                      +"files already combined. Only the data files that are "\
+                      +"not part of the state are read and added, and the "\
+                      +"state file is updated.")
+
     # Change help message for output option
     parser.get_option("-o").help = "Specify a new output file name, a new "\
                                    +"data directory or a new directory plus "\
@@ -138,6 +162,9 @@ if __name__ == "__main__":
     # Reset verbosity
     configure.verbose = old_verbosity
 
+    configure.read_ahead = options.read_ahead
+    configure.state = options.state
+
     # This is a standard file, but we need to remove the segment number
     if not have_output:
         if is_dir:
@@ -169,12 +196,8 @@ if __name__ == "__main__":
     if configure.verbose:
         print "Using %s as output file" % configure.output
         
-    # Setup the timing object
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
 
     # Run the program
     run(configure, timer)
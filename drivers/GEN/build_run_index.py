@@ -0,0 +1,96 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+"""
+This program scans a data archive for U{NeXus<www.nexusformat.org>} files and
+writes a run index that maps instrument and run number to file path. The index
+lets run numbers be resolved without calling B{findnexus} once per run.
+"""
+
+def run(config):
+    """
+    This method is where the index creation gets done.
+
+    @param config: Object containing the configuration information.
+    @type config: L{hlr_utils.Configure}
+    """
+    import hlr_utils
+
+    if config.append and hlr_utils.file_exists(config.output):
+        index = hlr_utils.RunIndex(config.output)
+    else:
+        index = hlr_utils.RunIndex()
+
+    for archive_root in config.archive_roots:
+        if config.verbose:
+            print "Scanning %s" % archive_root
+        index.build(archive_root)
+
+    if config.verbose:
+        print "Writing %d runs to %s" % (len(index), config.output)
+
+    index.write(config.output)
+
+if __name__ == "__main__":
+    import hlr_utils
+
+    # Make description for driver
+    result = []
+    result.append("This driver scans the given archive directories for NeXus")
+    result.append("files and writes a run index file. Pointing the")
+    result.append("HLR_RUN_INDEX environment variable at the index lets the")
+    result.append("drivers resolve run numbers without calling findnexus.")
+    result.append("The default filename for the index is runs.idx.")
+
+    # set up the options available
+    parser = hlr_utils.BasicOptions("usage: %prog [options] <archive_root>",
+                                    None, None, hlr_utils.program_version(),
+                                    'error', " ".join(result))
+
+    parser.add_option("-a", "--append", action="store_true", dest="append",
+                      help="Flag for adding the runs to an existing index "\
+                      +"file")
+    parser.set_defaults(append=False)
+
+    (options, args) = parser.parse_args()
+
+    # set up the configuration
+    configure = hlr_utils.Configure()
+
+    configure.verbose = options.verbose
+
+    if options.output:
+        configure.output = hlr_utils.fix_filename(options.output)
+    else:
+        configure.output = "runs.idx"
+
+    if len(args) == 0:
+        parser.error("Must provide at least one archive directory to scan.")
+    else:
+        configure.archive_roots = [hlr_utils.fix_filename(arg) \
+                                   for arg in args]
+
+    configure.append = options.append
+
+    run(configure)
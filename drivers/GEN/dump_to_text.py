@@ -0,0 +1,96 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+"""
+This program converts the binary dump files (I{.bin}) written by the data
+reduction drivers when run with I{--dump-format=binary} into the text files
+the drivers would have written with the default dump format.
+"""
+
+def run(config):
+    """
+    This method is where the conversion gets done.
+
+    @param config: Object containing the configuration information.
+    @type config: L{hlr_utils.Configure}
+    """
+    import os
+
+    import hlr_utils
+
+    for dumpfile in config.data:
+        (dst_type, d_som, kwargs) = hlr_utils.read_binary_dump(dumpfile)
+
+        # The text file is the dump file without the binary extension
+        filename = os.path.splitext(dumpfile)[0]
+
+        if config.path_replacement is None:
+            kwargs["replace_path"] = False
+        else:
+            kwargs["replace_path"] = True
+            kwargs["path_replacement"] = config.path_replacement
+
+        kwargs["replace_ext"] = False
+        kwargs["verbose"] = config.verbose
+        kwargs["message"] = os.path.basename(filename)
+
+        hlr_utils.write_file(filename, dst_type, d_som, **kwargs)
+
+if __name__ == "__main__":
+    import os
+
+    import hlr_utils
+
+    # Make description for driver
+    result = []
+    result.append("This driver converts binary dump files (.bin) into the")
+    result.append("text files the reduction drivers write with the default")
+    result.append("dump format. The text files are written next to the dump")
+    result.append("files unless an output directory is given.")
+
+    # set up the options available
+    parser = hlr_utils.BasicOptions("usage: %prog [options] <dumpfile(s)>",
+                                    None, None, hlr_utils.program_version(),
+                                    'error', " ".join(result))
+
+    (options, args) = parser.parse_args()
+
+    # set up the configuration
+    configure = hlr_utils.Configure()
+
+    configure.verbose = options.verbose
+
+    if len(args) == 0:
+        parser.error("Must provide at least one binary dump file.")
+    else:
+        configure.data = [hlr_utils.fix_filename(arg) for arg in args]
+
+    if options.output:
+        configure.path_replacement = hlr_utils.fix_filename(options.output)
+        if not os.path.isdir(configure.path_replacement):
+            parser.error("The output option must be an existing directory.")
+    else:
+        configure.path_replacement = None
+
+    run(configure)
@@ -0,0 +1,132 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+
+# $Id$
+
+"""
+This program runs the benchmark suite of the library on synthetic data and
+optionally compares the timings with the results of an earlier run.
+"""
+
+def run(config):
+    """
+    This method is where the benchmarks get run.
+
+    @param config: Object containing the configuration information.
+    @type config: L{hlr_utils.Configure}
+    """
+    import hlr_test
+
+    if config.list:
+        for (name, group, setup) in hlr_test.get_benchmarks(config.select):
+            print "%-45s %s" % (name, group)
+        return
+
+    results = hlr_test.run_benchmarks(config.select, scale=config.scale,
+                                      repeat=config.repeat,
+                                      verbose=config.verbose)
+
+    if config.output is not None:
+        if config.verbose:
+            print "Writing results to %s" % config.output
+        hlr_test.write_benchmark_results(results, config.output)
+
+    if config.compare is not None:
+        baseline = hlr_test.read_benchmark_results(config.compare)
+        if baseline["scale"] != results["scale"]:
+            print "WARNING: Comparing against results with scale %s" % \
+                  baseline["scale"]
+
+        print "%-45s %10s %10s %6s" % ("Benchmark", "Baseline", "Current",
+                                       "Ratio")
+        for entry in hlr_test.compare_benchmark_results(baseline, results,
+                                                        config.threshold):
+            print "%-45s %10.4f %10.4f %6.2f %s" % entry
+
+if __name__ == "__main__":
+    import hlr_utils
+
+    # Make description for driver
+    result = []
+    result.append("This driver runs the benchmarks of the library functions")
+    result.append("and of the driver processing chains on synthetic data.")
+    result.append("The arguments select benchmarks by name or by group")
+    result.append("(common_lib, dr_lib, scenario or import). All benchmarks")
+    result.append("are run if none are given.")
+
+    # set up the options available
+    parser = hlr_utils.BasicOptions("usage: %prog [options] [benchmarks]",
+                                    None, None, hlr_utils.program_version(),
+                                    'error', " ".join(result))
+
+    parser.add_option("", "--scale", dest="scale", type="float",
+                      help="Specify the factor for the number of pixels in "\
+                      +"the synthetic data. The default is 1.0.")
+    parser.set_defaults(scale=1.0)
+
+    parser.add_option("", "--repeat", dest="repeat", type="int",
+                      help="Specify the number of times each benchmark is "\
+                      +"run. The default is 3.")
+    parser.set_defaults(repeat=3)
+
+    parser.add_option("", "--compare", dest="compare",
+                      help="Specify a results file to compare the timings "\
+                      +"with")
+
+    parser.add_option("", "--threshold", dest="threshold", type="float",
+                      help="Specify the relative change in time that flags a "\
+                      +"benchmark as slower or faster. The default is 0.1.")
+    parser.set_defaults(threshold=0.1)
+
+    parser.add_option("-l", "--list", action="store_true", dest="list",
+                      help="Flag for listing the benchmarks without running "\
+                      +"them")
+    parser.set_defaults(list=False)
+
+    (options, args) = parser.parse_args()
+
+    # set up the configuration
+    configure = hlr_utils.Configure()
+
+    configure.verbose = options.verbose
+
+    if options.output:
+        configure.output = hlr_utils.fix_filename(options.output)
+    else:
+        configure.output = None
+
+    if options.compare:
+        configure.compare = hlr_utils.fix_filename(options.compare)
+    else:
+        configure.compare = None
+
+    if options.repeat < 1:
+        parser.error("The number of repeats must be at least 1.")
+
+    configure.select = args
+    configure.scale = options.scale
+    configure.repeat = options.repeat
+    configure.threshold = options.threshold
+    configure.list = options.list
+
+    run(configure)
@@ -36,46 +36,28 @@ def run(config):
                    information.
     @type config: L{hlr_utils.Configure}
     """
-    index = 0
-
-    if config.append:
-        option = "a"
-    else:
-        option = "w"
+    import hlr_utils
 
-    resource = open(config.output, option)
+    pixels = hlr_utils.PixelSet()
 
+    index = 0
     for pid in config.bank_ids:
 
         try:
-            h_min = config.h_ranges[index][0]
+            h_range = (config.h_ranges[index][0], config.h_ranges[index][1])
         except TypeError:
-            h_min = config.h_ranges[0]
+            h_range = config.h_ranges
 
         try:
-            h_max = config.h_ranges[index][1]+1
+            v_range = (config.v_ranges[index][0], config.v_ranges[index][1])
         except TypeError:
-            h_max = config.h_ranges[1]+1
-
-        for i in xrange(h_min, h_max):
-
-            try:
-                v_min = config.v_ranges[index][0]
-            except TypeError:
-                v_min = config.v_ranges[0]
-                
-            try:
-                v_max = config.v_ranges[index][1]+1
-            except TypeError:
-                v_max = config.v_ranges[1]+1    
+            v_range = config.v_ranges
 
-            for j in xrange(v_min, v_max):
+        pixels.add_rectangle(pid, h_range, v_range)
 
-                print >> resource, "bank%s_%d_%d" % (pid, i, j) 
-                
         index += 1
 
-    resource.close()
+    pixels.write(config.output, append=config.append)
 
 if __name__ == "__main__":
     import hlr_utils
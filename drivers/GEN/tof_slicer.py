@@ -39,10 +39,9 @@ def run(config):
     import sys
 
     import dr_lib
-    import DST
 
     try:
-        data_dst = DST.getInstance("application/x-NeXus", config.data[0])
+        data_dst = dr_lib.NeXusReader(config.data[0])
     except SystemError:
         print "ERROR: Failed to data read file %s" % config.data[0]
         sys.exit(-1)
@@ -69,6 +68,7 @@ def run(config):
 
     if config.dump_pxl:
         hlr_utils.write_file(config.data[0], "text/Spec", d_som1,
+                             dump_format=config.dump_format,
                              output_ext="tfp", verbose=config.verbose,
                              path_replacement=config.path_replacement,
                              message="pixel TOF information")
@@ -81,6 +81,7 @@ def run(config):
 
         if config.dump_sxl:
             hlr_utils.write_file(config.data[0], "text/Spec", d_som2,
+                                 dump_format=config.dump_format,
                                  output_ext="tsp", verbose=config.verbose,
                                  path_replacement=config.path_replacement,
                                  message="TIB const sub pixel TOF information")
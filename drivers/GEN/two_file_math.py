@@ -56,21 +56,23 @@ def run(config, tim):
     if config.verbose:
         print "Initial file type (data set 1):", dst_type1
 
-    d_som1 = dr_lib.add_files(config.data1, dst_type=dst_type1,
-                              Verbose=config.verbose,
-                              Timer=tim)
+    d_som1 = dr_lib.accumulate_files(config.data1, dst_type=dst_type1,
+                                     read_ahead=config.read_ahead,
+                                     Verbose=config.verbose,
+                                     Timer=tim)
 
     dst_type2 = hlr_utils.file_peeker(config.data2[0])
 
     if config.verbose:
         print "Initial file type (data set 2):", dst_type2
 
-    d_som2 = dr_lib.add_files(config.data2, dst_type=dst_type2,
-                              Verbose=config.verbose,
-                              Timer=tim)
+    d_som2 = dr_lib.accumulate_files(config.data2, dst_type=dst_type2,
+                                     read_ahead=config.read_ahead,
+                                     Verbose=config.verbose,
+                                     Timer=tim)
 
     # Get requested simple math operation
-    func = common_lib.__getattribute__(config.operation)
+    func = getattr(common_lib, config.operation)
 
     d_som3 = func(d_som1, d_som2)
 
@@ -153,6 +155,17 @@ if __name__ == "__main__":
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
+    parser.add_option("", "--read-ahead", dest="read_ahead", type="int",
+                      help="Specify the number of files to parse in "\
+                      +"worker processes while the sums are made. The "\
+                      +"default is 0.")
+    parser.set_defaults(read_ahead=0)
+
     # Change help message for output option
     parser.get_option("-o").help = "Specify a new output file name, a new "\
                                    +"data directory or a new directory plus "\
@@ -253,18 +266,17 @@ if __name__ == "__main__":
     # Set the math operation
     configure.operation = options.operation
 
+    # Set the number of files to read ahead
+    configure.read_ahead = options.read_ahead
+
     # Set the rescaling constant
     try:
         configure.rescale = float(options.rescale)
     except TypeError:
         configure.rescale = options.rescale
     
-    # Setup the timing object
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
 
     # Run the program
     run(configure, timer)
@@ -189,6 +189,7 @@ def run(config, tim=None):
                                   rebin_axis=config.lambda_bins.toNessiList())
 
             hlr_utils.write_file(config.output, "text/Spec", ds_som2_1,
+                                 dump_format=config.dump_format,
                                  output_ext="lin",
                                  data_ext=config.ext_replacement,    
                                  path_replacement=config.path_replacement,
@@ -335,6 +336,7 @@ def run(config, tim=None):
 
     if config.dump_initial_energy:
         hlr_utils.write_file(config.output, "text/Spec", d_som6,
+                             dump_format=config.dump_format,
                              output_ext="ixl",
                              data_ext=config.ext_replacement,
                              path_replacement=config.path_replacement,
@@ -357,6 +359,7 @@ def run(config, tim=None):
         
     if config.dump_energy:
         hlr_utils.write_file(config.output, "text/Spec", d_som7,
+                             dump_format=config.dump_format,
                              output_ext="exl",
                              data_ext=config.ext_replacement,
                              path_replacement=config.path_replacement,
@@ -386,6 +389,7 @@ def run(config, tim=None):
 
     if config.dump_energy:
         hlr_utils.write_file(config.output, "text/Spec", d_som9,
+                             dump_format=config.dump_format,
                              output_ext="sexl",
                              data_ext=config.ext_replacement,    
                              path_replacement=config.path_replacement,
@@ -453,6 +457,14 @@ if __name__ == "__main__":
     parser.add_option("", "--timing", action="store_true", dest="timing",
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
+
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
+    # Add the result cache options
+    hlr_utils.add_cache_options(parser)
     
     (options, args) = parser.parse_args()
 
@@ -465,12 +477,10 @@ if __name__ == "__main__":
     # Call the configuration setter for AmrOptions
     hlr_utils.AmrConfiguration(parser, configure, options, args)
 
-    # Set timer object if timing option is used
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
     
-    # Run the program
-    run(configure, timer)
+    # Run the program unless an identical run is in the result cache
+    hlr_utils.run_cached(run, configure, timer, no_cache=options.no_cache,
+                         cache_dir=options.cache_dir,
+                         cache_size=options.cache_size)
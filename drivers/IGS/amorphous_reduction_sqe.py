@@ -199,6 +199,7 @@ def run(config, tim=None):
                                   rebin_axis=config.lambda_bins.toNessiList())
 
             hlr_utils.write_file(config.output, "text/Spec", ds_som2_1,
+                                 dump_format=config.dump_format,
                                  output_ext="lin",
                                  data_ext=config.ext_replacement,    
                                  path_replacement=config.path_replacement,
@@ -354,6 +355,7 @@ def run(config, tim=None):
             tim.getTime(False)
 
         hlr_utils.write_file(config.output, "text/Spec", d_som4,
+                             dump_format=config.dump_format,
                              output_ext="wvn",
                              data_ext=config.ext_replacement,    
                              path_replacement=config.path_replacement,
@@ -382,7 +384,8 @@ def run(config, tim=None):
                                           x_units=["1/Angstroms","ueV"],
                                           split=config.split,
                                           Q_filter=False,
-                                          configure=config)
+                                          configure=config,
+                                          timer=tim)
         if tim is not None:
             tim.getTime(msg="After creation of final spectrum ")
 
@@ -515,6 +518,11 @@ if __name__ == "__main__":
     parser.add_option("", "--timing", action="store_true", dest="timing",
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
+
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
     
     (options, args) = parser.parse_args()
 
@@ -524,12 +532,8 @@ if __name__ == "__main__":
     # Call the configuration setter for AmrOptions
     hlr_utils.AmrConfiguration(parser, configure, options, args)
 
-    # Set timer object if timing option is used
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
     
     # Run the program
     run(configure, timer)
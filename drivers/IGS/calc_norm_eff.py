@@ -209,6 +209,11 @@ if __name__ == "__main__":
     parser.add_option("", "--timing", action="store_true", dest="timing",
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
+
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
     
     (options, args) = parser.parse_args()
 
@@ -228,12 +233,8 @@ if __name__ == "__main__":
     # Since this option is never used, set it to None
     configure.ldb_const = None
 
-    # Set timer object if timing option is used
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
     
     # Run the program
     run(configure, timer)
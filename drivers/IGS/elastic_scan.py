@@ -22,24 +22,13 @@ def run(config, tim=None):
 
     import nessi_list
     import SOM
-    
-    import bisect
+
+    import numpy
 
     if tim is not None:
         tim.getTime(False)
         old_time = tim.getOldTime()
 
-    is_init = False
-    Q_axis = None
-    E_axis = None
-    len_Q = 0
-    len_E = 0
-    so_id = None
-    lo_val = -999
-    hi_val = -999
-    scan = nessi_list.NessiList()
-    scan_err2 = nessi_list.NessiList()
-    
     # Object to hold integrated data for each temperature scan
     result = SOM.SOM()
     result.attr_list["filename"] = config.data
@@ -48,55 +37,40 @@ def run(config, tim=None):
     result.setYLabel("Integral")
     result.setYUnits("")
     result.setDataSetType("density")
-    
-    int_so = SOM.SO()
-
-    # Read in all data files
-    for datafile in config.data:
-        som = dr_lib.add_files([datafile], dst_type=dst_type,
-                               Verbose=config.verbose)
-
-        if not is_init:
-            Q_axis = som[0].axis[0].val
-            len_Q = len(Q_axis)
-            E_axis = som[0].axis[1].val
-            len_E = len(E_axis)
-            so_id = som[0].id
-            int_so.id = so_id
-            int_so.axis[0].val = E_axis
-            lo_val = bisect.bisect_left(E_axis, config.int_range[0])
-            hi_val = bisect.bisect_left(E_axis, config.int_range[1])
-
-        for i in xrange(len_Q):
-            int_so.y = som[0].y[i*len_E:(i+1)*len_E]
-            int_so.var_y = som[0].var_y[i*len_E:(i+1)*len_E]
-            value = dr_lib.integrate_axis_py(int_so, start=lo_val, end=hi_val)
-            scan.append(value[0])
-            scan_err2.append(value[1])
-
-        is_init = True
-
-    # Reorient data to make groups of temps for a single Q bin
+
+    # Integrate the elastic window of all data files
+    jobs = [(datafile, dst_type, config.int_range, config.verbose)
+            for datafile in config.data]
+
+    if config.processes > 1 and len(jobs) > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(min(config.processes, len(jobs)))
+        try:
+            scans = pool.map(__integrate_file, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        scans = [__integrate_file(job) for job in jobs]
+
+    (so_id, Q_axis) = scans[0][:2]
+
+    # Assemble the (Q, T) matrix: groups of temps for a single Q bin
+    scan = numpy.column_stack([value[2] for value in scans])
+    scan_err2 = numpy.column_stack([value[3] for value in scans])
+
     final_data = nessi_list.NessiList()
+    final_data.extend(scan.ravel().tolist())
     final_data_err2 = nessi_list.NessiList()
+    final_data_err2.extend(scan_err2.ravel().tolist())
 
-    scann = scan.toNumPy()
-    scann_err2 = scan_err2.toNumPy()
-
-    import itertools
-    for i in xrange(len_Q):
-        sslice = scann[i::len_Q]
-        sslice_err2 = scann_err2[i::len_Q]
-        for val, err in itertools.izip(sslice, sslice_err2):
-            final_data.append(val)
-            final_data_err2.append(err)
-    
     # Create placeholder for combined spectrum
     so = SOM.SO(2)
     so.id = so_id
     so.y = final_data
     so.var_y = final_data_err2
-    so.axis[0].val = Q_axis
+    so.axis[0].val = nessi_list.NessiList()
+    so.axis[0].val.extend(Q_axis.tolist())
     temp = nessi_list.NessiList()
     temp.extend(config.temps)
     so.axis[1].val = temp
@@ -123,6 +97,52 @@ def run(config, tim=None):
         tim.setOldTime(old_time)
         tim.getTime(msg="Total Running Time")
 
+def __integrate_file(job):
+    """
+    This function reads a single temperature scan and integrates the energy
+    window for every Q bin in one reduction over the (Q, E) array of the
+    file.
+
+    @param job: The data file name, its C{DST} type, the energy integration
+                range and the verbose flag
+    @type job: C{tuple}
+
+
+    @return: The spectrum id, the Q axis and the integrals and their
+             uncertainties for each Q bin
+    @rtype: C{tuple}
+    """
+    import bisect
+
+    import numpy
+
+    import dr_lib
+
+    (datafile, dst_type, int_range, verbose) = job
+
+    som = dr_lib.add_files([datafile], dst_type=dst_type, Verbose=verbose)
+
+    Q_axis = som[0].axis[0].val
+    E_axis = som[0].axis[1].val
+    len_Q = len(Q_axis)
+    len_E = len(E_axis)
+
+    # Make the window inclusive of the ending bin
+    lo_val = bisect.bisect_left(E_axis, int_range[0])
+    hi_val = bisect.bisect_left(E_axis, int_range[1]) + 1
+
+    y = som[0].y.toNumPy()[:len_Q * len_E].reshape(len_Q, len_E)
+    var_y = som[0].var_y.toNumPy()[:len_Q * len_E].reshape(len_Q, len_E)
+    y = y[:, lo_val:hi_val]
+    var_y = var_y[:, lo_val:hi_val]
+
+    # Bins with NaN or infinite values are left out of the integration
+    good = numpy.isfinite(y) & numpy.isfinite(var_y)
+
+    return (som[0].id, Q_axis.toNumPy(),
+            numpy.where(good, y, 0.0).sum(axis=1),
+            numpy.where(good, var_y, 0.0).sum(axis=1))
+
 if __name__ == "__main__":
     import dr_lib
     import hlr_utils
@@ -150,10 +170,20 @@ if __name__ == "__main__":
                       +"can be made, so you must make sure the order is "\
                       +"correct.")
 
+    parser.add_option("", "--processes", dest="processes", type="int",
+                      help="Specify the number of processes used to read "\
+                      +"and integrate the data files. The default is 1.")
+    parser.set_defaults(processes=1)
+
     parser.add_option("", "--timing", action="store_true", dest="timing",
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
     # Change help slightly for data option
     parser.get_option("--data").help = "Specify the DAVE 2D ASCII files."
 
@@ -184,18 +214,18 @@ if __name__ == "__main__":
     if options.int_range is not None:
         configure.int_range = options.int_range
 
+    # Set the number of processes
+    if hlr_utils.cli_provide_override(configure, "processes", "--processes"):
+        configure.processes = options.processes
+
     # Set the temperature list
     try:
         configure.temps = [float(T) for T in options.temps.split(',')]
     except AttributeError:
         configure.temps = [float(T) for T in configure.temps]
 
-    # Set timer object if timing option is used
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
 
     # run the program
     run(configure, timer)
@@ -118,18 +118,19 @@ def __calculate_ratio(conf, ctib, t=None):
     if t is not None:
         t.getTime(msg="After running amorphous_reduction_sqe ")
 
-    pos_int = dr_lib.integrate_spectra_py(som, start=conf.et_pos_range[0],
-                                          end=conf.et_pos_range[1], axis_pos=1)
+    # Integrate the positive and negative energy ranges in one pass
+    int_som = dr_lib.integrate_spectra_windows(som, [conf.et_pos_range,
+                                                     conf.et_neg_range],
+                                               axis_pos=1)
 
-    neg_int = dr_lib.integrate_spectra_py(som, start=conf.et_neg_range[0],
-                                          end=conf.et_neg_range[1], axis_pos=1)
+    pos_int = int_som[0].y[0]
+    neg_int = int_som[0].y[1]
 
     if conf.verbose:
-        print "Ratio: %e / %e, %f" % (pos_int[0].y, neg_int[0].y,
-                                      __make_ratio((pos_int[0].y,
-                                                    neg_int[0].y)))
+        print "Ratio: %e / %e, %f" % (pos_int, neg_int,
+                                      __make_ratio((pos_int, neg_int)))
 
-    return (pos_int[0].y, neg_int[0].y)
+    return (pos_int, neg_int)
 
 def __make_ratio(ratio):
     """
@@ -288,6 +289,11 @@ if __name__ == "__main__":
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
     # Removing output flag
     parser.remove_option("-o")
 
@@ -344,11 +350,7 @@ if __name__ == "__main__":
     # Set the verbosity for the amorphous_reduction_sqe code
     configure.amr_verbose = options.amr_verbose
 
-    # Set timer object if timing option is used
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
 
     run(configure, timer)
@@ -141,6 +141,7 @@ def run(config, tim):
             d_som2_2.setDataSetType("density")
         
         hlr_utils.write_file(config.output, "text/Spec", d_som2_2,
+                             dump_format=config.dump_format,
                              output_ext="crtof",
                              verbose=config.verbose,
                              data_ext=config.ext_replacement,
@@ -156,6 +157,7 @@ def run(config, tim):
             d_som2_1 = dr_lib.filter_ref_data(d_som2)
         
         hlr_utils.write_file(config.output, "text/Spec", d_som2_1,
+                             dump_format=config.dump_format,
                              output_ext="rtof",
                              verbose=config.verbose,
                              data_ext=config.ext_replacement,
@@ -201,6 +203,7 @@ def run(config, tim):
         if config.dump_rq:
             d_som3_1 = dr_lib.data_filter(d_som3, clean_axis=True)
             hlr_utils.write_file(config.output, "text/Spec", d_som3_1,
+                                 dump_format=config.dump_format,
                                  output_ext="rq",
                                  verbose=config.verbose,
                                  data_ext=config.ext_replacement,
@@ -276,6 +279,7 @@ def run(config, tim):
     
         if config.dump_rqr:
             hlr_utils.write_file(config.output, "text/Spec", d_som5,
+                                 dump_format=config.dump_format,
                                  output_ext="rqr",
                                  verbose=config.verbose,
                                  data_ext=config.ext_replacement,
@@ -383,6 +387,11 @@ if __name__ == "__main__":
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
     (options, args) = parser.parse_args()
     
     # Set up the configuration
@@ -425,12 +434,8 @@ if __name__ == "__main__":
     if options.dump_all:
         configure.dump_ecell_rtof = True
 
-    # Setup the timing object
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
 
     # Run the program
     run(configure, timer)
@@ -249,6 +249,7 @@ def run(config, tim):
                                            x_units="$\AA$")
 
         hlr_utils.write_file(config.output, "text/Dave2d", d_som5,
+                             dump_format=config.dump_format,
                              output_ext="plp", verbose=config.verbose,
                              data_ext=config.ext_replacement,
                              path_replacement=config.path_replacement,
@@ -335,6 +336,11 @@ if __name__ == "__main__":
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
     (options, args) = parser.parse_args()
 
     # Set up the configuration
@@ -368,12 +374,8 @@ if __name__ == "__main__":
         if options.dump_all:
             configure.dump_twod = True
 
-    # Setup the timing object
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
 
     # Run the program
     run(configure, timer)
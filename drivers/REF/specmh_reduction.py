@@ -147,6 +147,7 @@ def run(config, tim):
         del d_som2_2
         
         hlr_utils.write_file(config.output, "text/Spec", d_som2_3,
+                             dump_format=config.dump_format,
                              output_ext="crtof",
                              verbose=config.verbose,
                              data_ext=config.ext_replacement,
@@ -164,6 +165,7 @@ def run(config, tim):
                                       config.tof_cut_max)
         del d_som2_1
         hlr_utils.write_file(config.output, "text/Spec", d_som2_2,
+                             dump_format=config.dump_format,
                              output_ext="rtof",
                              verbose=config.verbose,
                              data_ext=config.ext_replacement,
@@ -238,6 +240,7 @@ def run(config, tim):
         d_som3_2 = dr_lib.cut_spectra(d_som3_1, Q_cut_min, Q_cut_max)
         del d_som3_1
         hlr_utils.write_file(config.output, "text/Spec", d_som3_2,
+                             dump_format=config.dump_format,
                              output_ext="rq",
                              verbose=config.verbose,
                              data_ext=config.ext_replacement,
@@ -256,6 +259,7 @@ def run(config, tim):
             d_som4_2 = dr_lib.cut_spectra(d_som4_1, Q_cut_min, Q_cut_max)
             del d_som4_1
             hlr_utils.write_file(config.output, "text/Spec", d_som4_2,
+                                 dump_format=config.dump_format,
                                  output_ext="rqr",
                                  verbose=config.verbose,
                                  data_ext=config.ext_replacement,
@@ -338,6 +342,11 @@ if __name__ == "__main__":
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
 
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
     (options, args) = parser.parse_args()
     
     # Set up the configuration
@@ -346,12 +355,8 @@ if __name__ == "__main__":
     # Call the configuration setter for SmhrOptions
     hlr_utils.SmhrConfiguration(parser, configure, options, args)
 
-    # Setup the timing object
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
 
     # Run the program
     run(configure, timer)
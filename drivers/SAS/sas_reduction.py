@@ -161,6 +161,7 @@ def run(config, tim=None):
                                        x_units=["m", "1/Angstroms"])
 
         hlr_utils.write_file(config.output, "text/Dave2d", d_som5_1,
+                             dump_format=config.dump_format,
                              output_ext="qvr", verbose=config.verbose,
                              data_ext=config.ext_replacement,
                              path_replacement=config.path_replacement,
@@ -179,6 +180,7 @@ def run(config, tim=None):
                                        x_units=["rads", "1/Angstroms"])
 
         hlr_utils.write_file(config.output, "text/Dave2d", d_som5_1,
+                             dump_format=config.dump_format,
                              output_ext="qvt", verbose=config.verbose,
                              data_ext=config.ext_replacement,
                              path_replacement=config.path_replacement,
@@ -286,6 +288,14 @@ if __name__ == "__main__":
     parser.add_option("", "--timing", action="store_true", dest="timing",
                       help="Flag to turn on timing of code")
     parser.set_defaults(timing=False)
+
+    parser.add_option("", "--profile", dest="profile", metavar="FILENAME",
+                      help="Specify a file for the profile of the reduction "\
+                      +"stages (JSON). A Chrome trace file with a _trace tag "\
+                      +"is also written and the stage tree is printed.")
+
+    # Add the result cache options
+    hlr_utils.add_cache_options(parser)
     
     (options, args) = parser.parse_args()
 
@@ -295,13 +305,11 @@ if __name__ == "__main__":
     # Call the configuration setter for SansOptions
     hlr_utils.SansConfiguration(parser, configure, options, args)
 
-    # Set timer object if timing option is used
-    if options.timing:
-        import sns_timing
-        timer = sns_timing.DiffTime()
-    else:
-        timer = None
+    # Set timer object if timing or profile option is used
+    timer = hlr_utils.make_timer(options.timing, options.profile)
     
-    # Run the program
-    run(configure, timer)
+    # Run the program unless an identical run is in the result cache
+    hlr_utils.run_cached(run, configure, timer, no_cache=options.no_cache,
+                         cache_dir=options.cache_dir,
+                         cache_size=options.cache_size)
     
@@ -26,6 +26,9 @@ from DGS import dgs_reduction
 
 # GEN drivers
 from GEN import agg_dr_files
+from GEN import build_run_index
+from GEN import dump_to_text
+from GEN import hlr_benchmark
 from GEN import mask_generator
 from GEN import plot_file
 from GEN import plot_multi
@@ -22,10 +22,15 @@
 
 """
 The functions in this module help with generating data objects for simple
-function tests.
+function tests. It also holds synthetic data generators of realistic size and
+a benchmark suite built on them.
 """
 
 from test_helpers import *
+from synthetic_helpers import *
+from benchmarks import register_benchmark, get_benchmarks, run_benchmarks, \
+     write_benchmark_results, read_benchmark_results, \
+     compare_benchmark_results
 
 from HLR_version import version as __version__
 
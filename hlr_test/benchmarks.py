@@ -0,0 +1,565 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+
+# $Id$
+
+"""
+This module holds a suite of benchmarks for the library functions and for
+the main processing chains of the drivers. The benchmarks run on synthetic
+data made by L{generate_synthetic_som}, so no data files are needed. The
+results can be written to a file and compared against an earlier run.
+"""
+
+import time
+
+from synthetic_helpers import SyntheticInstrument, generate_axis, \
+     generate_synthetic_som
+
+#: The format version of the benchmark results file
+RESULTS_VERSION = 1
+
+#: The registered benchmarks as (name, group, setup function) C{tuple}s
+BENCHMARKS = []
+
+def register_benchmark(name, group):
+    """
+    This function is a decorator that adds a setup function to the list of
+    benchmarks. The setup function receives the size scale of the run and
+    returns a function with no arguments that does the measured work. The
+    time needed by the setup function is not measured.
+
+    @param name: The name of the benchmark
+    @type name: C{string}
+
+    @param group: The group of the benchmark (I{common_lib}, I{dr_lib},
+                  I{scenario} or I{import})
+    @type group: C{string}
+
+
+    @return: The decorator
+    @rtype: C{function}
+    """
+    def decorator(setup):
+        BENCHMARKS.append((name, group, setup))
+        return setup
+    return decorator
+
+
+def get_benchmarks(selection=None):
+    """
+    This function returns the registered benchmarks selected by name or by
+    group. A selection also picks the variants of a benchmark, so
+    I{common_lib.add_ncerr} selects I{common_lib.add_ncerr.2D} as well.
+
+    @param selection: (OPTIONAL) The benchmark names or groups to select. If
+                      not given, all the benchmarks are returned.
+    @type selection: C{list} of C{string}s
+
+
+    @return: The selected benchmarks as (name, group, setup function)
+             C{tuple}s
+    @rtype: C{list}
+    """
+    if not selection:
+        return list(BENCHMARKS)
+
+    return [bench for bench in BENCHMARKS
+            if [sel for sel in selection
+                if bench[0] == sel or bench[0].startswith(sel + ".") or \
+                bench[1] == sel]]
+
+
+def run_benchmarks(selection=None, scale=1.0, repeat=3, verbose=False):
+    """
+    This function runs the selected benchmarks. Each benchmark is set up
+    again for each repetition so that functions changing their input work on
+    fresh data every time.
+
+    @param selection: (OPTIONAL) The benchmark names or groups to run. If not
+                      given, all the benchmarks are run.
+    @type selection: C{list} of C{string}s
+
+    @param scale: (OPTIONAL) The factor applied to the number of pixels of
+                  the synthetic data.
+    @type scale: C{float}
+
+    @param repeat: (OPTIONAL) The number of times each benchmark is run
+    @type repeat: C{int}
+
+    @param verbose: (OPTIONAL) A flag for printing the timing of each
+                    benchmark as it finishes
+    @type verbose: C{boolean}
+
+
+    @return: The benchmark results
+    @rtype: C{dict}
+    """
+    import gc
+    import platform
+
+    import HLR_version
+
+    results = {}
+    for (name, group, setup) in get_benchmarks(selection):
+        times = []
+        for i in xrange(repeat):
+            func = setup(scale)
+            gc.collect()
+            start = time.time()
+            func()
+            times.append(time.time() - start)
+            del func
+
+        results[name] = {"group" : group,
+                         "times" : times,
+                         "min" : min(times),
+                         "mean" : sum(times) / len(times),
+                         "max" : max(times)}
+
+        if verbose:
+            print "%-45s %10.4f s (min of %d)" % (name, min(times), repeat)
+
+    return {"version" : RESULTS_VERSION,
+            "hlr_version" : HLR_version.version,
+            "date" : time.strftime("%Y-%m-%d %H:%M:%S"),
+            "host" : platform.node(),
+            "python" : platform.python_version(),
+            "scale" : scale,
+            "repeat" : repeat,
+            "results" : results}
+
+
+def write_benchmark_results(results, filename):
+    """
+    This function writes benchmark results to a file.
+
+    @param results: The results from L{run_benchmarks}
+    @type results: C{dict}
+
+    @param filename: The name of the file to write
+    @type filename: C{string}
+    """
+    import json
+
+    ofile = open(filename, "w")
+    json.dump(results, ofile, indent=1, sort_keys=True)
+    ofile.close()
+
+
+def read_benchmark_results(filename):
+    """
+    This function reads benchmark results from a file.
+
+    @param filename: The name of the file to read
+    @type filename: C{string}
+
+
+    @return: The benchmark results
+    @rtype: C{dict}
+
+
+    @raise RuntimeError: The file does not hold benchmark results of a known
+                         format version
+    """
+    import json
+
+    ifile = open(filename, "r")
+    results = json.load(ifile)
+    ifile.close()
+
+    if results.get("version") != RESULTS_VERSION:
+        raise RuntimeError(("%s does not contain benchmark results of "\
+                            +"version %d") % (filename, RESULTS_VERSION))
+
+    return results
+
+
+def compare_benchmark_results(baseline, current, threshold=0.1):
+    """
+    This function compares the fastest times of the benchmarks found in both
+    sets of results.
+
+    @param baseline: The results to compare against
+    @type baseline: C{dict}
+
+    @param current: The results being checked
+    @type current: C{dict}
+
+    @param threshold: (OPTIONAL) The relative change in time above which a
+                      benchmark is flagged as slower or faster.
+    @type threshold: C{float}
+
+
+    @return: The comparison as (name, baseline time, current time, ratio,
+             flag) C{tuple}s. The flag is I{slower}, I{faster} or an empty
+             string.
+    @rtype: C{list} of C{tuple}s
+    """
+    base_res = baseline["results"]
+    cur_res = current["results"]
+
+    comparison = []
+    for name in sorted(cur_res.keys()):
+        if name not in base_res:
+            continue
+
+        old_time = base_res[name]["min"]
+        new_time = cur_res[name]["min"]
+        try:
+            ratio = new_time / old_time
+        except ZeroDivisionError:
+            ratio = 1.0
+
+        if ratio > 1.0 + threshold:
+            flag = "slower"
+        elif ratio < 1.0 - threshold:
+            flag = "faster"
+        else:
+            flag = ""
+
+        comparison.append((name, old_time, new_time, ratio, flag))
+
+    return comparison
+
+
+def __bss_inst(scale):
+    """
+    This function makes a I{BSS} like instrument whose pixel count follows
+    the size scale.
+    """
+    return SyntheticInstrument("BSS", banks=max(1, int(2 * scale)), nx=8,
+                               ny=64, primary=84.0, secondary=2.5,
+                               polar_range=(0.2, 2.4))
+
+
+def __sans_inst(scale):
+    """
+    This function makes a I{SAS} like instrument whose pixel count follows
+    the size scale.
+    """
+    return SyntheticInstrument("SAS", banks=max(1, int(scale)), nx=32,
+                               ny=32, primary=14.0, secondary=4.0,
+                               polar_range=(0.002, 0.1))
+
+
+def __tof_range(inst, wavelength_range, l_f=None):
+    """
+    This function returns the time-of-flight range in microseconds that
+    covers the given wavelength range for the instrument.
+    """
+    # Conversion from meters and Angstroms to microseconds
+    const = 252.78
+    (L_s, L_s_err2) = inst.get_primary()
+    (L_d, L_d_err2) = inst.get_secondary()
+    if l_f is None:
+        return (const * (L_s + L_d) * wavelength_range[0],
+                const * (L_s + L_d) * wavelength_range[1])
+    else:
+        return (const * (L_s * wavelength_range[0] + L_d * l_f),
+                const * (L_s * wavelength_range[1] + L_d * l_f))
+
+
+@register_benchmark("common_lib.add_ncerr", "common_lib")
+def __bench_add_ncerr(scale):
+    import common_lib
+
+    inst = __bss_inst(scale)
+    som1 = generate_synthetic_som(inst, seed=1)
+    som2 = generate_synthetic_som(inst, seed=2)
+    return lambda: common_lib.add_ncerr(som1, som2)
+
+
+@register_benchmark("common_lib.add_ncerr.2D", "common_lib")
+def __bench_add_ncerr_2D(scale):
+    import common_lib
+
+    inst = SyntheticInstrument(banks=max(1, int(scale)), nx=4, ny=4)
+    som1 = generate_synthetic_som(inst, 201, axis_len2=201, seed=1)
+    som2 = generate_synthetic_som(inst, 201, axis_len2=201, seed=2)
+    return lambda: common_lib.add_ncerr(som1, som2)
+
+
+@register_benchmark("common_lib.rebin_axis_1D", "common_lib")
+def __bench_rebin_axis_1D(scale):
+    import common_lib
+
+    som = generate_synthetic_som(__bss_inst(scale))
+    axis = generate_axis(0.0, 1.0, 734)
+    return lambda: common_lib.rebin_axis_1D(som, axis)
+
+
+@register_benchmark("common_lib.rebin_axis_1D.per_pixel", "common_lib")
+def __bench_rebin_axis_1D_per_pixel(scale):
+    import common_lib
+
+    som = generate_synthetic_som(__bss_inst(scale), shared_axis=False)
+    axis = generate_axis(0.0, 1.0, 734)
+    return lambda: common_lib.rebin_axis_1D(som, axis)
+
+
+@register_benchmark("common_lib.tof_to_wavelength", "common_lib")
+def __bench_tof_to_wavelength(scale):
+    import common_lib
+
+    inst = __sans_inst(scale)
+    som = generate_synthetic_som(inst,
+                                 axis_range=__tof_range(inst, (1.0, 16.0)))
+    return lambda: common_lib.tof_to_wavelength(som, inst_param="total")
+
+
+@register_benchmark("dr_lib.data_filter", "dr_lib")
+def __bench_data_filter(scale):
+    import dr_lib
+
+    som = generate_synthetic_som(__bss_inst(scale))
+    return lambda: dr_lib.data_filter(som)
+
+
+@register_benchmark("dr_lib.sum_all_spectra", "dr_lib")
+def __bench_sum_all_spectra(scale):
+    import dr_lib
+
+    som = generate_synthetic_som(__bss_inst(scale))
+    return lambda: dr_lib.sum_all_spectra(som)
+
+
+@register_benchmark("dr_lib.sum_all_spectra.rebin", "dr_lib")
+def __bench_sum_all_spectra_rebin(scale):
+    import dr_lib
+
+    som = generate_synthetic_som(__bss_inst(scale), shared_axis=False)
+    axis = generate_axis(0.0, 1.0, 734)
+    return lambda: dr_lib.sum_all_spectra(som, rebin_axis=axis)
+
+
+@register_benchmark("dr_lib.correct_det_eff", "dr_lib")
+def __bench_correct_det_eff(scale):
+    import dr_lib
+
+    som = generate_synthetic_som(__sans_inst(scale), axis_range=(1.0, 16.0),
+                                 units=["Angstroms"])
+    dr_lib.clear_det_eff_cache()
+    return lambda: dr_lib.correct_det_eff(som)
+
+
+@register_benchmark("dr_lib.apply_sas_factors", "dr_lib")
+def __bench_apply_sas_factors(scale):
+    import dr_lib
+
+    som = generate_synthetic_som(__sans_inst(scale), axis_range=(1.0, 16.0),
+                                 units=["Angstroms"])
+    mon = generate_synthetic_som(axis_len=2001, axis_range=(0.5, 17.0),
+                                 units=["Angstroms"], num_pixels=1)
+    dr_lib.create_geom_table(som, ["sas_correct"])
+    dr_lib.clear_det_eff_cache()
+    return lambda: dr_lib.apply_sas_factors(som, det_eff=True, trans_mon=mon,
+                                            rtype="frac", sas_correct=True)
+
+
+@register_benchmark("dr_lib.find_nz_extent", "dr_lib")
+def __bench_find_nz_extent(scale):
+    import dr_lib
+    import nessi_list
+
+    som = generate_synthetic_som(__bss_inst(scale))
+    # Individual pixels are sparse, most of them see no counts at all
+    for i in xrange(len(som)):
+        if i % 10:
+            som[i].y = nessi_list.NessiList(len(som[i].y))
+    return lambda: dr_lib.find_nz_extent(som, split=True)
+
+
+@register_benchmark("dr_lib.create_axis_from_data", "dr_lib")
+def __bench_create_axis_from_data(scale):
+    import dr_lib
+
+    som = generate_synthetic_som(__bss_inst(scale))
+    return lambda: dr_lib.create_axis_from_data(som)
+
+
+@register_benchmark("dr_lib.filter_normalization", "dr_lib")
+def __bench_filter_normalization(scale):
+    import dr_lib
+
+    som = generate_synthetic_som(__bss_inst(10.0 * scale), 2, seed=1)
+    for so in som:
+        so.y = so.y[0]
+        so.var_y = so.var_y[0]
+    return lambda: dr_lib.filter_normalization(som, 10.0, 900.0,
+                                               write_mask=False)
+
+
+@register_benchmark("dr_lib.create_E_vs_Q_igs", "dr_lib")
+def __bench_create_E_vs_Q_igs(scale):
+    import dr_lib
+    import hlr_utils
+
+    inst = SyntheticInstrument("BSS", banks=1, nx=8, ny=max(1, int(8 * scale)),
+                               primary=84.0, polar_range=(0.2, 2.4))
+    som = generate_synthetic_som(inst, 501, (6.0, 6.6), units=["Angstroms"])
+    som.attr_list["Wavelength_final"] = (6.267, 0.0)
+
+    config = hlr_utils.Configure()
+    config.dump_pix_contrib = False
+    config.scale_sqe = False
+
+    E_axis = generate_axis(-200.0, 200.0, 201)
+    Q_axis = generate_axis(0.0, 2.5, 101)
+    return lambda: dr_lib.create_E_vs_Q_igs(som, E_axis, Q_axis,
+                                            configure=config)
+
+
+@register_benchmark("dr_lib.create_param_vs_Y", "dr_lib")
+def __bench_create_param_vs_Y(scale):
+    import dr_lib
+
+    inst = __sans_inst(scale)
+    som = generate_synthetic_som(inst, axis_range=(0.0, 0.5),
+                                 units=["1/Angstroms"], shared_axis=False)
+    polar_axis = generate_axis(0.0, 0.1, 51)
+    Q_axis = generate_axis(0.0, 0.5, 251)
+    return lambda: dr_lib.create_param_vs_Y(som, "polar", "param_array",
+                                            polar_axis, rebin_axis=Q_axis,
+                                            binnorm=True)
+
+
+@register_benchmark("scenario.amorphous_reduction_sqe", "scenario")
+def __bench_amorphous_reduction_sqe(scale):
+    import hlr_utils
+
+    inst = __bss_inst(scale)
+    l_f = 6.267
+    som = generate_synthetic_som(inst, 1001,
+                                 __tof_range(inst, (6.0, 6.6), l_f))
+    som.attr_list["Wavelength_final"] = (l_f, 0.0)
+    som.attr_list["Time_zero_slope"] = (0.0, 0.0)
+    som.attr_list["Time_zero_offset"] = (0.0, 0.0)
+
+    config = hlr_utils.Configure()
+    config.dump_pix_contrib = False
+    config.scale_sqe = False
+
+    E_axis = generate_axis(-200.0, 200.0, 201)
+    Q_axis = generate_axis(0.0, 2.5, 101)
+
+    def run():
+        import common_lib
+        import dr_lib
+
+        som1 = common_lib.tof_to_initial_wavelength_igs_lin_time_zero(som)
+        som2 = dr_lib.data_filter(som1)
+        del som1
+        dr_lib.create_E_vs_Q_igs(som2, E_axis, Q_axis, configure=config)
+
+    return run
+
+
+@register_benchmark("scenario.sas_reduction", "scenario")
+def __bench_sas_reduction(scale):
+    inst = __sans_inst(scale)
+    som = generate_synthetic_som(inst, 1001,
+                                 __tof_range(inst, (1.0, 16.0)))
+    polar_axis = generate_axis(0.0, 0.1, 51)
+    Q_axis = generate_axis(0.0, 0.5, 251)
+
+    def run():
+        import common_lib
+        import dr_lib
+
+        dr_lib.clear_det_eff_cache()
+        som1 = common_lib.tof_to_wavelength(som, inst_param="total")
+        dr_lib.correct_det_eff(som1)
+        som2 = common_lib.wavelength_to_scalar_Q(som1)
+        del som1
+        dr_lib.create_param_vs_Y(som2, "polar", "param_array", polar_axis,
+                                 rebin_axis=Q_axis, binnorm=True)
+
+    return run
+
+
+@register_benchmark("scenario.dgs_reduction", "scenario")
+def __bench_dgs_reduction(scale):
+    inst = SyntheticInstrument("ARCS", banks=max(1, int(2 * scale)), nx=8,
+                               ny=64, primary=11.6, secondary=3.0,
+                               polar_range=(-0.5, 2.4))
+    som = generate_synthetic_som(inst, 1001,
+                                 __tof_range(inst, (0.5, 4.0)),
+                                 shared_axis=False)
+    lambda_axis = generate_axis(0.5, 4.0, 701)
+
+    def run():
+        import common_lib
+        import dr_lib
+
+        dr_lib.clear_det_eff_cache()
+        som1 = common_lib.tof_to_wavelength(som, inst_param="total")
+        som2 = common_lib.rebin_axis_1D(som1, lambda_axis)
+        del som1
+        dr_lib.correct_det_eff(som2)
+        dr_lib.sum_all_spectra(som2)
+
+    return run
+
+
+def __python_command(code):
+    """
+    This function returns a function that runs the given code in a new
+    Python interpreter.
+    """
+    import subprocess
+    import sys
+
+    def run():
+        if subprocess.call([sys.executable, "-c", code]):
+            raise RuntimeError("Running %s failed" % code)
+
+    return run
+
+
+@register_benchmark("import.python", "import")
+def __bench_import_python(scale):
+    return __python_command("pass")
+
+
+@register_benchmark("import.lazy", "import")
+def __bench_import_lazy(scale):
+    return __python_command("import hlr_utils, common_lib, dr_lib")
+
+
+@register_benchmark("import.driver", "import")
+def __bench_import_driver(scale):
+    return __python_command("import hlr_utils; "\
+                            +"hlr_utils.SansOptions; hlr_utils.Configure; "\
+                            +"import dr_lib; dr_lib.process_sas_data")
+
+
+@register_benchmark("import.eager", "import")
+def __bench_import_eager(scale):
+    return __python_command("from hlr_utils import *; "\
+                            +"from common_lib import *; from dr_lib import *")
+
+
+if __name__ == "__main__":
+    results = run_benchmarks(scale=0.5, repeat=1, verbose=True)
+    for entry in compare_benchmark_results(results, results):
+        print "%-45s %10.4f %10.4f %6.2f %s" % entry
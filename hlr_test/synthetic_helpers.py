@@ -0,0 +1,435 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+
+# $Id$
+
+"""
+This module provides generators for synthetic data objects of realistic size.
+The objects are meant for performance measurements of the library functions
+and not for checking their results.
+"""
+
+import math
+import random
+
+import SOM
+
+#: The diffraction geometry parameters provided for the I{BSS} instrument
+BSS_DIFF_GEOM = {"dh" : 0.0254 / 8.0,
+                 "dtd" : 0.0127,
+                 "dlf_dh" : 1.0e-3,
+                 "dpol_dh" : 1.0e-2,
+                 "dpol_dtd" : 5.0e-3,
+                 "dazi_dh" : 2.0e-2,
+                 "dazi_dtd" : 1.0e-3}
+
+class SyntheticInstrument:
+    """
+    This class is a stand-in for a C{SOM.Instrument} with a simple, regular
+    detector geometry. The detector is made of banks, each having C{nx} by
+    C{ny} pixels, and the polar angle increases with the flat index of the
+    pixel. Every geometry accessor returns a C{tuple} of value and error^2 in
+    the same way the C{SOM.Instrument} accessors do.
+    """
+
+    def __init__(self, name="BSS", banks=1, nx=8, ny=128, **kwargs):
+        """
+        Object constructor
+
+        @param name: (OPTIONAL) The short name of the instrument
+        @type name: C{string}
+
+        @param banks: (OPTIONAL) The number of detector banks
+        @type banks: C{int}
+
+        @param nx: (OPTIONAL) The number of pixels along x in each bank
+        @type nx: C{int}
+
+        @param ny: (OPTIONAL) The number of pixels along y in each bank
+        @type ny: C{int}
+
+        @param kwargs: A list of keyword arguments that the class accepts:
+
+        @keyword primary: The source to sample distance in meters. The default
+                          is I{20.0}.
+        @type primary: C{float}
+
+        @keyword secondary: The sample to detector distance in meters. The
+                            default is I{2.5}.
+        @type secondary: C{float}
+
+        @keyword polar_range: The range of polar angles in radians covered by
+                              the detector. The default is I{(0.1, 2.5)}.
+        @type polar_range: C{tuple} of two C{float}s
+
+        @keyword pixel_size: The size of a pixel in meters. The default is
+                             I{0.005}.
+        @type pixel_size: C{float}
+        """
+        self.__name = name
+        self.banks = banks
+        self.nx = nx
+        self.ny = ny
+        self.__primary = kwargs.get("primary", 20.0)
+        self.__secondary = kwargs.get("secondary", 2.5)
+        self.__polar_range = kwargs.get("polar_range", (0.1, 2.5))
+        self.__pixel_size = kwargs.get("pixel_size", 0.005)
+
+    def get_name(self):
+        """
+        This method returns the short name of the instrument.
+
+        @return: The instrument name
+        @rtype: C{string}
+        """
+        return self.__name
+
+    def get_num_pixels(self):
+        """
+        This method returns the total number of pixels in the detector.
+
+        @return: The number of pixels
+        @rtype: C{int}
+        """
+        return self.banks * self.nx * self.ny
+
+    def get_pixel_ids(self):
+        """
+        This method returns the pixel IDs of the detector in the order they
+        are read from a NeXus file.
+
+        @return: The pixel IDs
+        @rtype: C{list} of C{tuple}s
+        """
+        return [("bank%d" % (b + 1), (i, j))
+                for b in xrange(self.banks)
+                for i in xrange(self.nx)
+                for j in xrange(self.ny)]
+
+    def __index(self, id):
+        """
+        This method returns the flat index of the given pixel ID.
+
+        @param id: The pixel ID
+        @type id: C{tuple}
+
+        @return: The flat index of the pixel
+        @rtype: C{int}
+
+        @raise IndexError: The pixel ID is not part of the detector
+        """
+        (bank, (i, j)) = id
+        b = int(bank[4:]) - 1
+        if b < 0 or b >= self.banks or i < 0 or i >= self.nx or \
+               j < 0 or j >= self.ny:
+            raise IndexError("Pixel %s is not part of the detector" % str(id))
+        return (b * self.nx + i) * self.ny + j
+
+    def get_primary(self, id=None):
+        """
+        This method returns the source to sample distance.
+
+        @param id: (OPTIONAL) The pixel ID
+        @type id: C{tuple}
+
+        @return: The distance and its error^2
+        @rtype: C{tuple}
+        """
+        return (self.__primary, 0.0)
+
+    def get_secondary(self, id=None):
+        """
+        This method returns the sample to pixel distance. The distance grows
+        slightly with the pixel height so that the pixels are not all alike.
+
+        @param id: (OPTIONAL) The pixel ID. If not given, the distance to the
+                   detector center is returned.
+        @type id: C{tuple}
+
+        @return: The distance and its error^2
+        @rtype: C{tuple}
+        """
+        if id is None:
+            return (self.__secondary, 0.0)
+        (x_off, x_off_err2) = self.get_x_pix_offset(id)
+        (y_off, y_off_err2) = self.get_y_pix_offset(id)
+        return (math.sqrt(self.__secondary * self.__secondary + \
+                          x_off * x_off + y_off * y_off), 0.0)
+
+    def get_total_path(self, id=None):
+        """
+        This method returns the source to pixel distance.
+
+        @param id: (OPTIONAL) The pixel ID
+        @type id: C{tuple}
+
+        @return: The distance and its error^2
+        @rtype: C{tuple}
+        """
+        return (self.__primary + self.get_secondary(id)[0], 0.0)
+
+    def get_polar(self, id=None):
+        """
+        This method returns the polar angle of the pixel.
+
+        @param id: (OPTIONAL) The pixel ID. If not given, the angle of the
+                   detector center is returned.
+        @type id: C{tuple}
+
+        @return: The angle in radians and its error^2
+        @rtype: C{tuple}
+        """
+        (p_min, p_max) = self.__polar_range
+        if id is None:
+            return (0.5 * (p_min + p_max), 0.0)
+        frac = (self.__index(id) + 0.5) / self.get_num_pixels()
+        return (p_min + (p_max - p_min) * frac, 0.0)
+
+    def get_azimuthal(self, id=None):
+        """
+        This method returns the azimuthal angle of the pixel.
+
+        @param id: (OPTIONAL) The pixel ID
+        @type id: C{tuple}
+
+        @return: The angle in radians and its error^2
+        @rtype: C{tuple}
+        """
+        if id is None:
+            return (0.0, 0.0)
+        (x_off, x_off_err2) = self.get_x_pix_offset(id)
+        (y_off, y_off_err2) = self.get_y_pix_offset(id)
+        return (math.atan2(y_off, x_off), 0.0)
+
+    def get_x_pix_offset(self, id):
+        """
+        This method returns the x offset of the pixel from the bank center.
+
+        @param id: The pixel ID
+        @type id: C{tuple}
+
+        @return: The offset in meters and its error^2
+        @rtype: C{tuple}
+        """
+        self.__index(id)
+        return ((id[1][0] - 0.5 * (self.nx - 1)) * self.__pixel_size, 0.0)
+
+    def get_y_pix_offset(self, id):
+        """
+        This method returns the y offset of the pixel from the bank center.
+
+        @param id: The pixel ID
+        @type id: C{tuple}
+
+        @return: The offset in meters and its error^2
+        @rtype: C{tuple}
+        """
+        self.__index(id)
+        return ((id[1][1] - 0.5 * (self.ny - 1)) * self.__pixel_size, 0.0)
+
+    def get_radius(self, id):
+        """
+        This method returns the distance of the pixel from the beam axis.
+
+        @param id: The pixel ID
+        @type id: C{tuple}
+
+        @return: The radius in meters and its error^2
+        @rtype: C{tuple}
+        """
+        return (self.get_secondary(id)[0] * math.sin(self.get_polar(id)[0]),
+                0.0)
+
+    def get_diff_geom_keys(self):
+        """
+        This method returns the names of the diffraction geometry parameters.
+
+        @return: The parameter names
+        @rtype: C{list} of C{string}s
+        """
+        return BSS_DIFF_GEOM.keys()
+
+    def get_diff_geom(self, key, id):
+        """
+        This method returns a diffraction geometry parameter of the pixel.
+
+        @param key: The name of the parameter
+        @type key: C{string}
+
+        @param id: The pixel ID
+        @type id: C{tuple}
+
+        @return: The parameter value and its error^2
+        @rtype: C{tuple}
+        """
+        self.__index(id)
+        return (BSS_DIFF_GEOM[key], 0.0)
+
+
+def generate_axis(start, stop, num):
+    """
+    This function generates an evenly spaced axis.
+
+    @param start: The first value of the axis
+    @type start: C{float}
+
+    @param stop: The last value of the axis
+    @type stop: C{float}
+
+    @param num: The number of values in the axis
+    @type num: C{int}
+
+    @return: The axis
+    @rtype: C{nessi_list.NessiList}
+    """
+    import nessi_list
+
+    axis = nessi_list.NessiList()
+    step = float(stop - start) / float(num - 1)
+    axis.extend([start + step * i for i in xrange(num)])
+    return axis
+
+
+def generate_synthetic_som(inst=None, axis_len=1001, axis_range=(0.0, 1.0),
+                           **kwargs):
+    """
+    This function generates a C{SOM} with one spectrum per pixel of a
+    L{SyntheticInstrument}. The spectra contain a peak on a flat background
+    with some noise and their uncertainties are the counting statistics.
+
+    @param inst: (OPTIONAL) The instrument providing the pixels and the
+                 geometry. If not given, a default L{SyntheticInstrument} is
+                 made.
+    @type inst: L{SyntheticInstrument}
+
+    @param axis_len: (OPTIONAL) The length of the primary axis
+    @type axis_len: C{int}
+
+    @param axis_range: (OPTIONAL) The first and last value of the primary axis
+    @type axis_range: C{tuple} of two C{float}s
+
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword shared_axis: A flag for having all spectra use the same axis
+                          arrays. If I{False}, every spectrum gets its own
+                          slightly shifted axis. The default is I{True}.
+    @type shared_axis: C{boolean}
+
+    @keyword axis_len2: The length of a second axis. Giving this makes the
+                        spectra 2D.
+    @type axis_len2: C{int}
+
+    @keyword axis_range2: The first and last value of the second axis. The
+                          default is I{(0.0, 1.0)}.
+    @type axis_range2: C{tuple} of two C{float}s
+
+    @keyword units: The units of the axes. The default is I{microseconds} for
+                    each axis.
+    @type units: C{list} of C{string}s
+
+    @keyword data_type: The type of the data, either I{histogram} or
+                        I{density}. The default is I{histogram}.
+    @type data_type: C{string}
+
+    @keyword seed: The seed for the noise. The default is I{0}.
+    @type seed: C{int}
+
+    @keyword num_pixels: Only make spectra for the first given number of
+                         pixels.
+    @type num_pixels: C{int}
+
+
+    @return: The synthetic data
+    @rtype: C{SOM.SOM}
+    """
+    import nessi_list
+
+    if inst is None:
+        inst = SyntheticInstrument()
+
+    shared_axis = kwargs.get("shared_axis", True)
+    axis_len2 = kwargs.get("axis_len2", None)
+    axis_range2 = kwargs.get("axis_range2", (0.0, 1.0))
+    data_type = kwargs.get("data_type", "histogram")
+    rand = random.Random(kwargs.get("seed", 0))
+
+    if axis_len2 is None:
+        dim = 1
+    else:
+        dim = 2
+
+    units = kwargs.get("units", ["microseconds"] * dim)
+
+    if data_type.lower() == "histogram":
+        offset = 1
+    else:
+        offset = 0
+
+    axes = [generate_axis(axis_range[0], axis_range[1], axis_len)]
+    if dim == 2:
+        axes.append(generate_axis(axis_range2[0], axis_range2[1], axis_len2))
+
+    num_y = 1
+    for axis in axes:
+        num_y *= len(axis) - offset
+
+    # A peak on a flat background shared by all spectra
+    width = 0.05 * num_y
+    profile = [10.0 + 1000.0 * math.exp(-0.5 * ((k - 0.4 * num_y) / width)**2)
+               for k in xrange(num_y)]
+
+    pixel_ids = inst.get_pixel_ids()
+    try:
+        pixel_ids = pixel_ids[:kwargs["num_pixels"]]
+    except KeyError:
+        pass
+
+    som = SOM.SOM()
+    som.setDataSetType(data_type)
+
+    for index, pixel_id in enumerate(pixel_ids):
+        so = SOM.SO(dim)
+        so.id = pixel_id
+
+        for i in xrange(dim):
+            if shared_axis:
+                so.axis[i].val = axes[i]
+            else:
+                shift = (axes[i][1] - axes[i][0]) * (index % 10) / 10.0
+                so.axis[i].val = nessi_list.NessiList()
+                so.axis[i].val.extend([val + shift for val in axes[i]])
+
+        scale = 0.5 + rand.random()
+        so.y = nessi_list.NessiList()
+        so.y.extend([val * scale + rand.random() for val in profile])
+        so.var_y = nessi_list.NessiList()
+        so.var_y.extend(so.y)
+
+        som.append(so)
+
+    som.attr_list.instrument = inst
+    som.setAllAxisUnits(units)
+    som.setYLabel("Intensity")
+    som.setYUnits("Counts")
+
+    return som
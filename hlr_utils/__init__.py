@@ -25,30 +25,63 @@ The functions and objects in this module provide support functionality for
 handling various data reduction requests.
 """
 
-from hlr_1D_units import *
-from hlr_2D_helper import *
-from hlr_amr_options import AmrOptions, AmrConfiguration
-from hlr_axis_object import *
-from hlr_binner_helper import *
-from hlr_bisect_helper import bisect_helper
-from hlr_config import Configure, ConfigFromXml
-from hlr_dgs_options import DgsOptions, DgsConfiguration
-from hlr_dgsred_options import DgsRedOptions, DgsRedConfiguration
-from hlr_drparameter import *
-from hlr_fix_index import *
-from hlr_geom_helper import *
-from hlr_igs_options import IgsOptions, IgsConfiguration
-from hlr_math_compatible import *
-from hlr_merge_roi_files import *
-from hlr_nxpath import *
-from hlr_options import *
-from hlr_ref_options import RefOptions, RefConfiguration
-from hlr_sas_options import SansOptions, SansConfiguration
-from hlr_smhr_options import SmhrOptions, SmhrConfiguration
-from hlr_data_helper import *
-from hlr_driver_helper import *
+from hlr_lazy_module import LazyModule, make_lazy_module
+
+# The modules of the package with the public names they provide. A module is
+# only imported when one of its names is first used.
+__lazy_imports = [
+    ("hlr_1D_units", ["force_units", "one_d_units"]),
+    ("hlr_2D_helper", ["cos_param_array", "negcos_param_array",
+                       "negparam_array", "negsin_param_array",
+                       "negtan_param_array", "param_array", "sin_param_array",
+                       "tan_param_array"]),
+    ("hlr_amr_options", ["AmrConfiguration", "AmrOptions"]),
+    ("hlr_axis_object", ["Axis", "AxisFromString", "AxisFromXmlConfig"]),
+    ("hlr_binary_dump", ["read_binary_dump", "write_binary_dump"]),
+    ("hlr_binner_helper", ["create_binner_string", "create_config_hash",
+                           "make_binner_connection"]),
+    ("hlr_bisect_helper", ["bisect_helper"]),
+    ("hlr_config", ["ConfigFromXml", "Configure"]),
+    ("hlr_dgs_options", ["DgsConfiguration", "DgsOptions"]),
+    ("hlr_dgsred_options", ["DgsRedConfiguration", "DgsRedOptions"]),
+    ("hlr_drparameter", ["DrParameter", "DrParameterFromString",
+                         "DrParameterFromXmlConfig"]),
+    ("hlr_fix_index", ["fix_index"]),
+    ("hlr_geom_helper", ["Angles", "get_corner_geometry"]),
+    ("hlr_igs_options", ["IgsConfiguration", "IgsOptions"]),
+    ("hlr_math_compatible", ["math_compatible"]),
+    ("hlr_merge_roi_files", ["merge_roi_files"]),
+    ("hlr_nxpath", ["NxPath", "NxPathFromXmlConfig"]),
+    ("hlr_options", ["BasicConfiguration", "BasicOptions", "InstConfiguration",
+                     "InstOptions"]),
+    ("hlr_pixel_set", ["PixelSet"]),
+    ("hlr_profiler", ["Profiler", "end_stage", "get_profiler", "make_timer",
+                      "profile_stage", "start_stage"]),
+    ("hlr_ref_options", ["RefConfiguration", "RefOptions"]),
+    ("hlr_result_cache", ["ResultCache", "add_cache_options", "record_output",
+                          "run_cached"]),
+    ("hlr_run_index", ["RunIndex", "parse_run_list"]),
+    ("hlr_sas_options", ["SansConfiguration", "SansOptions"]),
+    ("hlr_smhr_options", ["SmhrConfiguration", "SmhrOptions"]),
+    ("hlr_data_helper", ["SOM_type", "SO_type", "angle_to_radians",
+                         "check_lojac", "copy_som_attr", "detach_axis",
+                         "empty_result", "empty_type", "get_axis_share_info",
+                         "get_descr", "get_err2", "get_length", "get_map_so",
+                         "get_parameter", "get_ref_integration_direction",
+                         "get_special", "get_type", "get_value", "list_type",
+                         "num_type", "result_insert", "scale_proton_charge",
+                         "share_axis", "swap_args"]),
+    ("hlr_driver_helper", ["add_tag", "cli_checker", "cli_provide_override",
+                           "create_data_paths", "create_id_pairs",
+                           "create_pixel_id", "determine_files", "ext_replace",
+                           "file_exists", "file_peeker", "fix_filename",
+                           "make_axis", "make_axis_file", "program_version",
+                           "split_values", "write_file"]),
+    ]
 
 from HLR_version import version as __version__
 
 #version
 __id__ = "$Id$"
+
+make_lazy_module(__name__, __lazy_imports)
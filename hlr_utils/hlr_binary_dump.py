@@ -0,0 +1,315 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+"""
+This module provides a compact binary format for the intermediate (dump)
+files produced by the data reduction drivers. A binary dump is a I{gzip}
+compressed file holding a metadata header (ids, axis labels and units, the
+distinct axes, the instrument name and the original output options) followed
+by the raw double precision arrays of the C{SOM}. Spectra that share an axis array only store
+that axis once. The dump can be turned back into the text file the driver
+would have written by L{read_binary_dump} and L{hlr_utils.write_file}.
+"""
+
+BINARY_DUMP_MAGIC = "HLRB2\n"
+"""The signature at the beginning of every binary dump file"""
+
+# write_file options that only control the output file name and reporting.
+# These are not stored in the dump header.
+__FILE_KWARGS = ("message", "data_ext", "output_ext", "verbose",
+                 "replace_path", "path_replacement", "replace_ext",
+                 "extra_tag", "dump_format")
+
+def write_binary_dump(filename, dst_type, som, **kwargs):
+    """
+    This function writes a C{SOM} into a binary dump file. The keyword
+    arguments are the ones handed to L{hlr_utils.write_file}. The options
+    that do not determine the output file name are stored in the header so
+    that the text file created from the dump matches the one the driver would
+    have produced. Attributes and options that cannot be stored (open files, C
+    extension objects like the instrument geometry) are left out and listed
+    when the I{verbose} option is set. The name of the instrument is stored
+    on its own.
+
+    @param filename: The name of the binary dump file
+    @type filename: C{string}
+
+    @param dst_type: The MIME type of the text formatter the dump replaces
+    @type dst_type: C{string}
+
+    @param som: Object to write into the dump
+    @type som: C{SOM.SOM}
+
+    @param kwargs: The keyword arguments given to L{hlr_utils.write_file}
+    """
+    import array
+    import cPickle
+    import gzip
+    import sys
+
+    # Build the distinct axis table. Spectra sharing axis arrays point to
+    # the same table entry.
+    axis_index = {}
+    axes = []
+    so_axes = []
+    so_info = []
+    for so in som:
+        indices = []
+        for axis in so.axis:
+            key = (id(axis.val), id(axis.var))
+            try:
+                indices.append(axis_index[key])
+            except KeyError:
+                axis_index[key] = len(axes)
+                indices.append(len(axes))
+                axes.append(axis)
+        so_axes.append(tuple(indices))
+        # Spectra holding a single value (text/num-info) are stored as one
+        # element arrays and flagged so they are restored as numbers
+        scalar = not hasattr(so.y, "__len__")
+        if scalar:
+            so_info.append((so.id, 1, so.var_y is not None, True))
+        else:
+            so_info.append((so.id, len(so.y), so.var_y is not None, False))
+
+    axis_info = []
+    for axis in axes:
+        if axis.var is None:
+            axis_info.append((len(axis.val), -1))
+        else:
+            axis_info.append((len(axis.val), len(axis.var)))
+
+    header = {}
+    header["dst_type"] = dst_type
+    header["byteorder"] = sys.byteorder
+    header["data_set_type"] = som.getDataSetType()
+    header["y_label"] = som.getYLabel()
+    header["y_units"] = som.getYUnits()
+    header["axis_labels"] = som.getAllAxisLabels()
+    header["axis_units"] = som.getAllAxisUnits()
+    header["axes"] = axis_info
+    header["so_axes"] = so_axes
+    header["spectra"] = so_info
+    try:
+        header["instrument_name"] = som.attr_list.instrument.get_name()
+    except (AttributeError, RuntimeError):
+        header["instrument_name"] = None
+    (header["attributes"], dropped) = __pickle_entries(som.attr_list)
+    (header["kwargs"], dropped_kwargs) = __pickle_entries(kwargs,
+                                                          __FILE_KWARGS)
+
+    if kwargs.get("verbose", False):
+        if dropped:
+            print "Attributes not stored in %s: %s" \
+                  % (filename, ", ".join(dropped))
+        if dropped_kwargs:
+            print "Options not stored in %s: %s" \
+                  % (filename, ", ".join(dropped_kwargs))
+
+    ofile = gzip.open(filename, "wb")
+    ofile.write(BINARY_DUMP_MAGIC)
+    cPickle.dump(header, ofile, cPickle.HIGHEST_PROTOCOL)
+
+    for axis in axes:
+        ofile.write(array.array('d', axis.val).tostring())
+        if axis.var is not None:
+            ofile.write(array.array('d', axis.var).tostring())
+
+    for so in som:
+        if hasattr(so.y, "__len__"):
+            ofile.write(array.array('d', so.y).tostring())
+            if so.var_y is not None:
+                ofile.write(array.array('d', so.var_y).tostring())
+        else:
+            ofile.write(array.array('d', [so.y]).tostring())
+            if so.var_y is not None:
+                ofile.write(array.array('d', [so.var_y]).tostring())
+
+    ofile.close()
+
+def read_binary_dump(filename):
+    """
+    This function reads a binary dump file written by L{write_binary_dump}.
+    The instrument geometry is not part of the dump. The name of the
+    instrument, if there was one, is handed back as the I{instrument_name}
+    attribute of the C{SOM}.
+
+    @param filename: The name of the binary dump file
+    @type filename: C{string}
+
+
+    @return: The MIME type of the text formatter the dump replaces, the
+             C{SOM} held in the dump and the output options stored with it
+    @rtype: C{tuple} of (C{string}, C{SOM.SOM}, C{dict})
+
+
+    @raise RuntimeError: The file is not a binary dump file
+    """
+    import array
+    import cPickle
+    import gzip
+    import sys
+
+    import SOM
+
+    ifile = gzip.open(filename, "rb")
+    if ifile.read(len(BINARY_DUMP_MAGIC)) != BINARY_DUMP_MAGIC:
+        ifile.close()
+        raise RuntimeError("%s is not a binary dump file" % filename)
+
+    header = cPickle.load(ifile)
+    swap = header["byteorder"] != sys.byteorder
+
+    def read_array(length):
+        """Read one double precision array from the dump"""
+        values = array.array('d')
+        values.fromstring(ifile.read(length * values.itemsize))
+        if swap:
+            values.byteswap()
+        return __to_nessi_list(values)
+
+    axes = []
+    for (val_len, var_len) in header["axes"]:
+        val = read_array(val_len)
+        if var_len < 0:
+            var = None
+        else:
+            var = read_array(var_len)
+        axes.append((val, var))
+
+    som = SOM.SOM()
+    som.setDataSetType(header["data_set_type"])
+    som.setYLabel(header["y_label"])
+    som.setYUnits(header["y_units"])
+    som.setAllAxisLabels(header["axis_labels"])
+    som.setAllAxisUnits(header["axis_units"])
+    for key, value in header["attributes"].iteritems():
+        som.attr_list[key] = cPickle.loads(value)
+    if header["instrument_name"] is not None:
+        som.attr_list["instrument_name"] = header["instrument_name"]
+
+    for (so_id, length, has_var, scalar), indices in zip(header["spectra"],
+                                                         header["so_axes"]):
+        so = SOM.SO(len(indices))
+        so.id = so_id
+        # Spectra that shared an axis in the dump share it again
+        for i in xrange(len(indices)):
+            (so.axis[i].val, so.axis[i].var) = axes[indices[i]]
+        so.y = read_array(length)
+        if has_var:
+            so.var_y = read_array(length)
+        else:
+            so.var_y = None
+        if scalar:
+            so.y = so.y[0]
+            if has_var:
+                so.var_y = so.var_y[0]
+        som.append(so)
+
+    ifile.close()
+
+    kwargs = {}
+    for key, value in header["kwargs"].iteritems():
+        kwargs[key] = cPickle.loads(value)
+
+    return (header["dst_type"], som, kwargs)
+
+def __pickle_entries(mapping, skip=()):
+    """
+    This function pickles the entries of a mapping for the dump header. Each
+    value is pickled once and kept as a string. Entries that cannot be
+    pickled (open files, C extension objects) are left out.
+
+    @param mapping: The mapping to pickle
+    @type mapping: C{dict}
+
+    @param skip: (OPTIONAL) Keys that should not be kept
+    @type skip: C{tuple}
+
+
+    @return: The pickled entries and the sorted keys of the entries that
+             could not be pickled
+    @rtype: C{tuple} of (C{dict}, C{list})
+    """
+    import cPickle
+
+    result = {}
+    dropped = []
+    for key, value in mapping.iteritems():
+        if key in skip:
+            continue
+        try:
+            result[key] = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+        except Exception:
+            dropped.append(str(key))
+    dropped.sort()
+
+    return (result, dropped)
+
+def __to_nessi_list(values):
+    """
+    This function copies a C{array.array} into a C{NessiList}.
+
+    @param values: The values to copy
+    @type values: C{array.array}
+
+
+    @return: The copied values
+    @rtype: C{nessi_list.NessiList}
+    """
+    import nessi_list
+
+    nlist = nessi_list.NessiList()
+    nlist.extend(values)
+
+    return nlist
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    import hlr_test
+
+    som1 = hlr_test.generate_som()
+    som1[1].axis[0].val = som1[0].axis[0].val
+    som1.attr_list["filename"] = "test.nxs"
+    som1.attr_list["scale"] = lambda x: 2.0 * x
+
+    print "********** SOM1"
+    print "* ", som1[0]
+    print "* ", som1[1]
+
+    (fd, dumpname) = tempfile.mkstemp(suffix=".bin")
+    os.close(fd)
+    write_binary_dump(dumpname, "text/Spec", som1, data_ext="nxs",
+                      extra_tag="test", y_label="Intensity", verbose=True)
+    (dst_type, som2, kwargs) = read_binary_dump(dumpname)
+    os.remove(dumpname)
+
+    print "********** read_binary_dump"
+    print "* ", dst_type, kwargs
+    print "* ", som2.attr_list
+    print "* ", som2[0]
+    print "* ", som2[1]
+    print "* shared axis:", som2[0].axis[0].val is som2[1].axis[0].val
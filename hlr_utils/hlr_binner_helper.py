@@ -35,42 +35,44 @@ def create_binner_string(config):
     @return: A unique string based off an MD5 sum of the amended configuration
     @rtype: C{string}
     """
-    import copy
-    import hashlib
-
-    cconf = copy.deepcopy(config)
-
     # Remove certain aspects of configuration that do not constitute needing
     # a brand new 3D mesh.
+    exclude = ["lambda_bins", "verbose", "path_replacement", "ext_replacement",
+               "dsmon_path", "so_axis", "data_paths", "output", "file",
+               "socket", "dump_tof_comb", "dump_wave_comb", "dump_et_comb"]
+
+    return create_config_hash(config, exclude)
+
+def create_config_hash(config, exclude=None):
+    """
+    This function takes a L{hlr_utils.Configure} object and creates an MD5
+    sum ID from the string forms of its parameters.
+
+    @param config: The current data reduction configuration
+    @type config: L{hlr_utils.Configure}
+
+    @param exclude: (OPTIONAL) The names of the parameters to leave out of the
+                               MD5 sum
+    @type exclude: C{list} of C{string}s
+
+
+    @return: A unique string based off an MD5 sum of the configuration
+    @rtype: C{string}
+    """
+    import hashlib
 
-    del cconf.__dict__["lambda_bins"]
-    del cconf.__dict__["verbose"]
-    del cconf.__dict__["path_replacement"]
-    del cconf.__dict__["ext_replacement"]
-    del cconf.__dict__["dsmon_path"]
-    del cconf.__dict__["so_axis"]
-    del cconf.__dict__["data_paths"]
-    del cconf.__dict__["output"]
-    if "file" in cconf.__dict__:
-        del cconf.__dict__["file"]
-    if "socket" in cconf.__dict__:
-        del cconf.__dict__["socket"]
-    if "dump_tof_comb" in cconf.__dict__:
-        del cconf.__dict__["dump_tof_comb"]        
-    if "dump_wave_comb" in cconf.__dict__:
-        del cconf.__dict__["dump_wave_comb"]
-    if "dump_et_comb" in cconf.__dict__:
-        del cconf.__dict__["dump_et_comb"]
+    if exclude is None:
+        exclude = []
 
     # Get the keys, sort them and create the string. This should make a more
     # stable MD5 sum.
     
-    ckeys = cconf.__dict__.keys()
+    ckeys = [ckey for ckey in config.__dict__.keys() if ckey not in exclude]
     ckeys.sort()
 
     result = []
     for ckey in ckeys:
-        result.append("%s:%s" % (ckey, str(cconf.__dict__[ckey])))
+        result.append("%s:%s" % (ckey, str(config.__dict__[ckey])))
 
     output = " ".join(result)
     return hashlib.new("md5", output).hexdigest()
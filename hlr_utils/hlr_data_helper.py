@@ -99,10 +99,12 @@ def result_insert(result, descr, value, map_so, axis="y", pap=0, xvals=None):
     @type map_so: C{SOM.SO}
     
     @param axis: (OPTIONAL) The axis from which to grab the values. The
-                            possible values are I{y} (copy id and axis, insert
-                            y and var_y), I{x} (copy id, y and var_y, insert
-                            axis), I{yonly} (copy id, axis and var_y, insert
-                            y) and I{all} (insert id, axis, y and var_y).
+                            possible values are I{y} (copy id, share axis,
+                            insert y and var_y), I{x} (copy id, y and var_y,
+                            insert axis), I{yonly} (copy id, axis and var_y,
+                            insert y) and I{all} (insert id, axis, y and
+                            var_y). Copied axes are shared with map_so via
+                            L{share_axis}.
     @type axis: C{string}
     
     @param pap: (OPTIONAL) The primary axis position. This is used to pull the
@@ -148,21 +150,16 @@ def result_insert(result, descr, value, map_so, axis="y", pap=0, xvals=None):
             result.var_y = value[1]
             result.id = map_so.id
             if not axis.lower() == "yonly":
-                result.axis = copy.deepcopy(map_so.axis)
+                share_axis(result, map_so)
 
         elif axis.lower() == "x":
             result.id = map_so.id
             result.y = copy.deepcopy(map_so.y)
             result.var_y = copy.deepcopy(map_so.var_y)
-            for i in range(map_so.dim()):
-                if i == pap:
-                    result.axis[pap].val = value[0]
-                    if map_so.axis[pap].var is not None:
-                        result.axis[pap].var = value[1]
-                else:
-                    result.axis[i].val = copy.deepcopy(map_so.axis[i].val)
-                    if map_so.axis[i].var is not None:
-                        result.axis[i].var = copy.deepcopy(map_so.axis[i].var)
+            share_axis(result, map_so, skip=pap)
+            result.axis[pap].val = value[0]
+            if map_so.axis[pap].var is not None:
+                result.axis[pap].var = value[1]
 
         elif axis.lower() == "all":
             if map_so is not None:
@@ -188,7 +185,7 @@ def result_insert(result, descr, value, map_so, axis="y", pap=0, xvals=None):
                 result.id = value.id
                 result.y = copy.deepcopy(value.y)
                 result.var_y = copy.deepcopy(value.var_y)
-                result.axis = copy.deepcopy(value.axis)
+                share_axis(result, value)
 
     elif result_type == num_type:
         result.append(value[0])
@@ -209,6 +206,101 @@ def result_insert(result, descr, value, map_so, axis="y", pap=0, xvals=None):
         raise TypeError("Object type not recognized by result_insert "\
                         +"function.")
 
+def share_axis(result, map_so, skip=None):
+    """
+    This function makes the axes of the result C{SO} reference the axis arrays
+    of the mapping C{SO} instead of deep copies of them. This keeps a C{SOM}
+    whose spectra were produced from one shared axis from holding one copy of
+    that axis per spectrum. The axis arrays are treated as copy-on-write:
+    replacing an axis (C{so.axis[i].val = new_axis}) only affects that C{SO},
+    but a function that wants to change an axis array in place must call
+    L{detach_axis} first.
+
+    @param result: Object that will receive the shared axes
+    @type result: C{SOM.SO}
+
+    @param map_so: Object providing the axes to share
+    @type map_so: C{SOM.SO}
+
+    @param skip: (OPTIONAL) The position of an axis that should not be shared
+                            since the caller provides it.
+    @type skip: C{int}
+    """
+    if len(result.axis) != len(map_so.axis):
+        import copy
+        result.axis = copy.deepcopy(map_so.axis)
+        return
+
+    for i in xrange(len(map_so.axis)):
+        if i == skip:
+            continue
+        result.axis[i].val = map_so.axis[i].val
+        result.axis[i].var = map_so.axis[i].var
+
+def detach_axis(so, axis_pos=0):
+    """
+    This function gives a C{SO} private copies of the axis arrays at the
+    requested position. It is the copy part of the copy-on-write behavior set
+    up by L{share_axis} and must be called before an axis array is changed in
+    place.
+
+    @param so: Object whose axis will be detached
+    @type so: C{SOM.SO}
+
+    @param axis_pos: (OPTIONAL) The position of the axis to detach. The
+                                default value is I{0}.
+    @type axis_pos: C{int}
+
+
+    @return: The detached axis value array and its associated error^2 array
+    (C{None} if the axis has no uncertainties)
+    @rtype: C{tuple}
+    """
+    import copy
+
+    so.axis[axis_pos].val = copy.deepcopy(so.axis[axis_pos].val)
+    if so.axis[axis_pos].var is not None:
+        so.axis[axis_pos].var = copy.deepcopy(so.axis[axis_pos].var)
+
+    return (so.axis[axis_pos].val, so.axis[axis_pos].var)
+
+def get_axis_share_info(obj):
+    """
+    This function inspects the axis arrays of the given object and reports
+    how many of them are shared between spectra. The memory estimate assumes
+    double precision axis arrays.
+
+    @param obj: Object to inspect
+    @type obj: C{SOM.SOM} or C{SOM.SO}
+
+
+    @return: The total number of axis arrays, the number of distinct axis
+             arrays and the number of bytes saved by sharing
+    @rtype: C{tuple} of (C{int}, C{int}, C{int})
+    """
+    o_descr = get_type(obj)
+    if o_descr == SO_type:
+        obj = [obj]
+    elif o_descr != SOM_type:
+        return (0, 0, 0)
+
+    total = 0
+    seen = {}
+    bytes_saved = 0
+
+    for so in obj:
+        for axis in so.axis:
+            for arr in (axis.val, axis.var):
+                if arr is None:
+                    continue
+                total += 1
+                if id(arr) in seen:
+                    bytes_saved += 8 * len(arr)
+                else:
+                    seen[id(arr)] = None
+
+    return (total, len(seen), bytes_saved)
+
 def get_length(obj1, obj2=None):
     """
     This function returns the length appropriate for iterating
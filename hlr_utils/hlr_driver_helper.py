@@ -350,6 +350,15 @@ def write_file(filename, dst_type, data, **kwargs):
     @keyword getsom_kwargs: This is a collection of keyword arguments that
                             are to be passed to the writeSOM function call.
     @type getsom_kwargs: C{dict}
+
+    @keyword dump_format: This is the format for the file: I{text} writes the
+                          file with the requested C{DST}, I{binary} writes a
+                          compressed binary dump (see
+                          L{hlr_utils.write_binary_dump}) with a I{.bin}
+                          extension added to the output filename instead. The
+                          binary format is not used for I{application/x-RedNxs}
+                          files. The default value is I{text}.
+    @type dump_format: C{string}
     """
 
     import os
@@ -404,6 +413,8 @@ def write_file(filename, dst_type, data, **kwargs):
 
     getsom_kwargs = kwargs.get("getsom_kwargs", {})
 
+    dump_format = kwargs.get("dump_format", "text")
+
     if replace_path:
         if path_replacement is None:
             path_replacement = os.getcwd()
@@ -422,6 +433,16 @@ def write_file(filename, dst_type, data, **kwargs):
     if extra_tag is not None:
         fixed_filename = hlr_utils.add_tag(fixed_filename, extra_tag)
 
+    # Binary dumps are written without the DST
+    if dump_format == "binary" and dst_type != "application/x-RedNxs":
+        if verbose:
+            print "Writing %s (binary)" % message
+
+        hlr_utils.write_binary_dump(fixed_filename + ".bin", dst_type, data,
+                                    **kwargs)
+        hlr_utils.record_output(fixed_filename + ".bin")
+        return
+
     # Handle difference between NeXus and other files
     if dst_type != "application/x-RedNxs":
         resource = open(fixed_filename, "w")
@@ -435,6 +456,7 @@ def write_file(filename, dst_type, data, **kwargs):
     output_dst.writeSOM(data, **getsom_kwargs)
     output_dst.release_resource()
 
+    hlr_utils.record_output(fixed_filename)
 
 def create_id_pairs(pairs, paths, **kwargs):
     """
@@ -585,6 +607,13 @@ def determine_files(inputlist, inst=None, facility=None, proposal=None,
                        is I{False}.
     @type one_file: C{boolean}
 
+    @keyword run_index: The name of a run index file (see
+                        L{hlr_utils.RunIndex}) used to look up run numbers
+                        before falling back to B{findnexus} for the runs that
+                        are not in the index. The default is the value of the
+                        I{HLR_RUN_INDEX} environment variable, if set.
+    @type run_index: C{string}
+
 
     @return: The fully qualified file names
     @rtype: C{list}
@@ -601,6 +630,12 @@ def determine_files(inputlist, inst=None, facility=None, proposal=None,
     except KeyError:
         one_file = False
 
+    try:
+        run_index = kwargs["run_index"]
+    except KeyError:
+        import os
+        run_index = os.environ.get("HLR_RUN_INDEX")
+
     # Kickout is inputlist is of NoneType
     if inputlist is None:
         return None
@@ -609,17 +644,16 @@ def determine_files(inputlist, inst=None, facility=None, proposal=None,
         if __check_for_path(inputlist):
             filelist = inputlist.split(',')
         elif __check_for_digit(inputlist):
-            filelist = __run_findnexus(inputlist, inst, facility, proposal)
+            filelist = __find_runs(inputlist, inst, facility, proposal,
+                                   run_index)
         else:
             raise RuntimeError("Do not know how to interpret %s" % inputlist)
     except AttributeError:
         if __check_for_path(inputlist[0]):
             filelist = inputlist
         elif __check_for_digit(inputlist[0]):
-            filelist = []
-            for number in inputlist:
-                filelist.extend(__run_findnexus(number, inst, facility,
-                                                proposal))
+            filelist = __find_runs(",".join(inputlist), inst, facility,
+                                   proposal, run_index)
         else:
             raise RuntimeError("Do not know how to interpret %s" % inputlist)
 
@@ -705,6 +739,73 @@ def __run_findnexus(nums, inst, facility, proposal):
     filestring = __clean_str(__run_cmd(cmd, False))
     return filestring.split(' ')
     
+def __find_runs(nums, inst, facility, proposal, run_index):
+    """
+    This function looks up the requested runs in the run index and runs the
+    findnexus command only for the runs the index does not know about.
+    """
+    index = __get_run_index(run_index)
+    if index is None or inst is None:
+        return __run_findnexus(nums, inst, facility, proposal)
+
+    import hlr_utils
+    try:
+        runs = hlr_utils.parse_run_list(nums)
+    except (ValueError, RuntimeError):
+        # Let findnexus deal with run lists the index cannot understand
+        return __run_findnexus(nums, inst, facility, proposal)
+
+    filelist = index.lookup(inst, runs, proposal)
+    missing = [str(runs[i]) for i in xrange(len(runs)) if filelist[i] is None]
+    if not len(missing):
+        return filelist
+
+    # Put the files found by findnexus back in the requested run order
+    import os
+    found = {}
+    extra = []
+    for filename in __run_findnexus(",".join(missing), inst, facility,
+                                    proposal):
+        try:
+            run = int(os.path.basename(filename).split('.')[0]\
+                      .rsplit('_', 1)[1])
+            found[run] = filename
+        except (IndexError, ValueError):
+            extra.append(filename)
+
+    for i in xrange(len(runs)):
+        if filelist[i] is None:
+            filelist[i] = found.get(runs[i])
+            if filelist[i] is None:
+                print "Run [%d] cannot be found, removing from list" % runs[i]
+
+    return [filename for filename in filelist if filename is not None] + extra
+
+__run_indexes = {}
+
+def __get_run_index(run_index):
+    """
+    This function loads a run index file once and hands back the same index
+    on later calls. I{None} is returned if no usable index is available.
+    """
+    if run_index is None:
+        return None
+
+    try:
+        return __run_indexes[run_index]
+    except KeyError:
+        pass
+
+    import hlr_utils
+    try:
+        index = hlr_utils.RunIndex(hlr_utils.fix_filename(run_index))
+    except IOError:
+        print "Run index [%s] cannot be read, using findnexus" % run_index
+        index = None
+
+    __run_indexes[run_index] = index
+    return index
+
 def program_version():
     """
     This function returns a version string for an option parser.
@@ -241,6 +241,12 @@ class IgsOptions(hlr_options.InstOptions):
                         help="Specify the low and high TOF values that "\
                         +"bracket the elastic peak")
 
+        self.add_option("", "--state-dir", dest="state_dir",
+                        help="Specify a directory for the summed raw counts "\
+                        +"of the datasets. Runs that have already been "\
+                        +"summed into the state files are not read again, "\
+                        +"so new runs can be added to a reduction.")
+
 def IgsConfiguration(parser, configure, options, args):
     """
     This function sets the incoming C{Configure} object with all the options
@@ -359,6 +365,10 @@ def IgsConfiguration(parser, configure, options, args):
         configure.time_zero_slope = hlr_utils.DrParameterFromString(\
             options.time_zero_slope, True)
 
+    # Set the directory for the accumulation state files
+    if hlr_utils.cli_provide_override(configure, "state_dir", "--state-dir"):
+        configure.state_dir = options.state_dir
+
     # Set the lambda bins for use with dump-mnorm-wave
     if hlr_utils.cli_provide_override(configure, "lambda_bins",
                                       "--lambda-bins"):    
@@ -0,0 +1,141 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+
+# $Id$
+
+import imp
+import sys
+import types
+
+class LazyModule(types.ModuleType):
+    """
+    This class is a package module that imports the modules providing its
+    public names only when one of the names is first used. Drivers only pay
+    the import cost of the functions they actually call. Once imported, a
+    name is stored in the package so later lookups are as fast as for an
+    ordinary module.
+    """
+
+    def __init__(self, module, lazy_imports):
+        """
+        Object constructor
+
+        @param module: The package module being replaced
+        @type module: C{module}
+
+        @param lazy_imports: The modules of the package with the public names
+                             they provide. A name provided by several modules
+                             comes from the last one, as it would for a list
+                             of star imports.
+        @type lazy_imports: C{list} of (C{string}, C{list} of C{string}s)
+                            C{tuple}s
+        """
+        types.ModuleType.__init__(self, module.__name__, module.__doc__)
+        self.__dict__.update(module.__dict__)
+        # Keep the original module alive since Python clears the globals of
+        # a module when it goes away.
+        self.__module = module
+        self.__attr_map = {}
+        for (modname, names) in lazy_imports:
+            for name in names:
+                self.__attr_map[name] = modname
+        names = set(self.__attr_map.keys())
+        for (name, value) in module.__dict__.items():
+            if not name.startswith("_") and \
+                   not isinstance(value, types.ModuleType):
+                names.add(name)
+        self.__all__ = sorted(names)
+
+    def __getattr__(self, name):
+        """
+        This method imports the module providing the requested name and
+        stores the name in the package. Submodules of the package that are
+        not imported yet are handled as well.
+
+        @param name: The requested name
+        @type name: C{string}
+
+
+        @return: The object for the requested name
+        @rtype: C{object}
+
+
+        @raise AttributeError: The package does not provide the name
+        """
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        try:
+            modname = self.__attr_map[name]
+        except KeyError:
+            try:
+                imp.find_module(name, self.__path__)
+            except ImportError:
+                raise AttributeError("'module' object has no attribute '%s'" \
+                                     % name)
+            return self.__import(name)
+
+        value = getattr(self.__import(modname), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        """
+        This method returns the names of the package including the ones not
+        imported yet.
+
+        @return: The names in the package
+        @rtype: C{list} of C{string}s
+        """
+        return sorted(set(self.__dict__.keys()) | set(self.__attr_map.keys()))
+
+    def __import(self, modname):
+        """
+        This method imports a submodule of the package.
+
+        @param modname: The name of the submodule
+        @type modname: C{string}
+
+
+        @return: The submodule
+        @rtype: C{module}
+        """
+        fullname = "%s.%s" % (self.__name__, modname)
+        __import__(fullname)
+        return sys.modules[fullname]
+
+
+def make_lazy_module(name, lazy_imports):
+    """
+    This function replaces an imported package by a L{LazyModule}. It must be
+    called at the end of the C{__init__} of the package.
+
+    @param name: The name of the package
+    @type name: C{string}
+
+    @param lazy_imports: The modules of the package with the public names
+                         they provide.
+    @type lazy_imports: C{list} of (C{string}, C{list} of C{string}s)
+                        C{tuple}s
+    """
+    sys.modules[name] = LazyModule(sys.modules[name], lazy_imports)
@@ -38,17 +38,8 @@ def merge_roi_files(filelist, conf):
     @rtype: C{string}
     """
     import hlr_utils
-    # Get first set of pixel IDs
-    rfile = open(filelist[0], 'r')
-    roi_set = set([rid.strip() for rid in rfile])
-    rfile.close()
 
-    # Merge each of the other sets of pixel IDs
-    for filename in filelist[1:]:
-        rfile = open(filename, 'r')
-        for rid in rfile:
-            roi_set.add(rid.strip())
-        rfile.close()
+    roi_set = hlr_utils.PixelSet(filelist)
 
     # Create output filename
     import os
@@ -61,9 +52,6 @@ def merge_roi_files(filelist, conf):
     ofilename = hlr_utils.add_tag(ofilename, "comb")
     
     # Create new ROI file from combined information
-    ofile = open(ofilename, 'w')
-    for rid in roi_set:
-        print >> ofile, rid
-    ofile.close()
+    roi_set.write(ofilename)
     
     return ofilename
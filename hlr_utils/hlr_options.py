@@ -324,6 +324,15 @@ class InstOptions(BasicOptions):
         else:
             pass
 
+        # Intermediate (dump) output options
+        self.add_option("", "--dump-format", dest="dump_format",
+                        choices=["text", "binary"],
+                        help="Specify the format for the intermediate dump "\
+                        +"files: text or binary. Binary dumps are compressed "\
+                        +"sidecar files (.bin) that can be converted to text "\
+                        +"with dump_to_text. The default is text.")
+        self.set_defaults(dump_format="text")
+
 def InstConfiguration(parser, configure, options, args, **kwargs):
     """
     This function sets the incoming C{Configure} object with all the options
@@ -366,6 +375,11 @@ def InstConfiguration(parser, configure, options, args, **kwargs):
     if hlr_utils.cli_provide_override(configure, "data_paths", "--data-paths"):
         configure.data_paths = hlr_utils.NxPath(options.data_paths)
 
+    # Set the intermediate dump file format
+    if hlr_utils.cli_provide_override(configure, "dump_format",
+                                      "--dump-format"):
+        configure.dump_format = options.dump_format
+
     # Set the normalization file list
     if hlr_utils.cli_provide_override(configure, "norm", "--norm"):
         configure.norm = hlr_utils.determine_files(options.norm,
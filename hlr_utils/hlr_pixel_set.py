@@ -0,0 +1,503 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+class PixelSet(object):
+    """
+    This class holds a set of detector pixels that can be used as a
+    region-of-interest (ROI) or a mask. The pixels of every bank are kept as
+    one bitset per horizontal pixel (tube), with the bits giving the vertical
+    pixels, so set operations work on whole tubes at a time. A C{PixelSet}
+    can be handed to L{dr_lib.NeXusReader} in place of a ROI or mask file.
+    Pixel ID files (I{bankN_x_y} per line) are still supported for reading
+    and writing the sets.
+    """
+
+    def __init__(self, filenames=None):
+        """
+        Object constructor
+
+        @param filenames: (OPTIONAL) The name of a pixel ID file or a list of
+                                     them. The pixels of all the files are
+                                     combined.
+        @type filenames: C{string} or C{list} of C{string}s
+        """
+        self.__banks = {}
+        self.__sources = []
+
+        if filenames is None:
+            return
+
+        if isinstance(filenames, basestring):
+            filenames = [filenames]
+
+        for filename in filenames:
+            self.read(filename)
+
+    def __len__(self):
+        """
+        This method returns the number of pixels in the set.
+
+        @return: The number of pixels
+        @rtype: C{int}
+        """
+        count = 0
+        for tubes in self.__banks.itervalues():
+            for bits in tubes.itervalues():
+                count += bin(bits).count("1")
+        return count
+
+    def __repr__(self):
+        """
+        This method returns a representation of the set. The pixel ID files
+        the set was read from are listed.
+
+        @return: The representation of the set
+        @rtype: C{string}
+        """
+        if self.__sources:
+            return "PixelSet(%d pixels from %s)" % (len(self),
+                                                    ", ".join(self.__sources))
+        else:
+            return "PixelSet(%d pixels in %s)" % (len(self),
+                                                  ", ".join(self.banks()))
+
+    def __contains__(self, pixel):
+        """
+        This method checks if a pixel is in the set.
+
+        @param pixel: The pixel ID as a I{bankN_x_y} string or a C{SO} id
+        @type pixel: C{string} or C{tuple}
+
+
+        @return: I{True} if the pixel is in the set, I{False} otherwise
+        @rtype: C{boolean}
+        """
+        (bank, x, y) = self.__split_id(pixel)
+        try:
+            return bool(self.__banks[bank][x] >> y & 1)
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        """
+        This method goes through the pixels in bank, horizontal and vertical
+        order.
+
+        @return: The pixel IDs in the form of C{SO} ids
+        @rtype: C{generator} of C{tuple}s
+        """
+        for bank in self.banks():
+            tubes = self.__banks[bank]
+            for x in sorted(tubes):
+                bits = tubes[x]
+                y = 0
+                while bits:
+                    if bits & 1:
+                        yield (bank, (x, y))
+                    bits >>= 1
+                    y += 1
+
+    def __or__(self, other):
+        """
+        This method returns the union of two sets. See L{union}.
+
+        @param other: The other set
+        @type other: L{hlr_utils.PixelSet}
+
+
+        @return: The union of the sets
+        @rtype: L{hlr_utils.PixelSet}
+        """
+        return self.union(other)
+
+    def __and__(self, other):
+        """
+        This method returns the intersection of two sets. See L{intersection}.
+
+        @param other: The other set
+        @type other: L{hlr_utils.PixelSet}
+
+
+        @return: The intersection of the sets
+        @rtype: L{hlr_utils.PixelSet}
+        """
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        """
+        This method returns the difference of two sets. See L{difference}.
+
+        @param other: The other set
+        @type other: L{hlr_utils.PixelSet}
+
+
+        @return: The difference of the sets
+        @rtype: L{hlr_utils.PixelSet}
+        """
+        return self.difference(other)
+
+    def banks(self):
+        """
+        This method returns the names of the banks that have pixels in the
+        set.
+
+        @return: The bank names in numeric order
+        @rtype: C{list} of C{string}s
+        """
+        return sorted(self.__banks, key=lambda bank: (len(bank), bank))
+
+    def add(self, pixel):
+        """
+        This method adds a single pixel to the set.
+
+        @param pixel: The pixel ID as a I{bankN_x_y} string or a C{SO} id
+        @type pixel: C{string} or C{tuple}
+        """
+        (bank, x, y) = self.__split_id(pixel)
+        self.__add_bits(bank, x, 1L << y)
+
+    def add_ids(self, pixels):
+        """
+        This method adds a collection of pixels to the set. The ids of the
+        spectra in a C{SOM} can be added with C{[so.id for so in som]}.
+
+        @param pixels: The pixel IDs as I{bankN_x_y} strings or C{SO} ids
+        @type pixels: C{list}
+        """
+        for pixel in pixels:
+            self.add(pixel)
+
+    def add_rectangle(self, bank, h_range, v_range):
+        """
+        This method adds a rectangle of pixels to the set. The ranges are
+        inclusive and follow the I{--h-ranges} and I{--v-ranges} options of
+        the B{mask_generator} driver.
+
+        @param bank: The bank name (I{bank1}) or bank ID (I{1})
+        @type bank: C{string}
+
+        @param h_range: The first and last horizontal pixel
+        @type h_range: C{tuple} of two C{int}s
+
+        @param v_range: The first and last vertical pixel
+        @type v_range: C{tuple} of two C{int}s
+        """
+        bank = self.__bank_name(bank)
+        bits = self.__run_bits(v_range[0], v_range[1] + 1)
+        for x in xrange(h_range[0], h_range[1] + 1):
+            self.__add_bits(bank, x, bits)
+
+    def add_tube(self, bank, tube, v_range):
+        """
+        This method adds the pixels of a single tube to the set.
+
+        @param bank: The bank name (I{bank1}) or bank ID (I{1})
+        @type bank: C{string}
+
+        @param tube: The horizontal pixel of the tube
+        @type tube: C{int}
+
+        @param v_range: The first and last vertical pixel of the tube
+        @type v_range: C{tuple} of two C{int}s
+        """
+        self.add_rectangle(bank, (tube, tube), v_range)
+
+    def add_range(self, bank, start_id, end_id):
+        """
+        This method adds a pixel range given the way the NeXus C{DST} takes
+        them: the starting pixel is inclusive and the ending pixel exclusive
+        in both directions.
+
+        @param bank: The bank name (I{bank1}) or bank ID (I{1})
+        @type bank: C{string}
+
+        @param start_id: The inclusive starting pixel ID
+        @type start_id: C{tuple}
+
+        @param end_id: The exclusive ending pixel ID
+        @type end_id: C{tuple}
+        """
+        self.add_rectangle(bank, (start_id[0], end_id[0] - 1),
+                           (start_id[1], end_id[1] - 1))
+
+    def copy(self):
+        """
+        This method returns a copy of the set.
+
+        @return: The copied set
+        @rtype: L{hlr_utils.PixelSet}
+        """
+        result = PixelSet()
+        for (bank, tubes) in self.__banks.iteritems():
+            result.__banks[bank] = tubes.copy()
+        result.__sources = list(self.__sources)
+        return result
+
+    def union(self, other):
+        """
+        This method returns the pixels that are in either set.
+
+        @param other: The set to combine with
+        @type other: L{hlr_utils.PixelSet}
+
+
+        @return: The combined set
+        @rtype: L{hlr_utils.PixelSet}
+        """
+        result = self.copy()
+        for (bank, tubes) in other.__banks.iteritems():
+            for (x, bits) in tubes.iteritems():
+                result.__add_bits(bank, x, bits)
+        result.__sources.extend(other.__sources)
+        return result
+
+    def intersection(self, other):
+        """
+        This method returns the pixels that are in both sets.
+
+        @param other: The set to intersect with
+        @type other: L{hlr_utils.PixelSet}
+
+
+        @return: The common set
+        @rtype: L{hlr_utils.PixelSet}
+        """
+        result = PixelSet()
+        for (bank, tubes) in self.__banks.iteritems():
+            try:
+                other_tubes = other.__banks[bank]
+            except KeyError:
+                continue
+            for (x, bits) in tubes.iteritems():
+                try:
+                    result.__add_bits(bank, x, bits & other_tubes[x])
+                except KeyError:
+                    pass
+        return result
+
+    def difference(self, other):
+        """
+        This method returns the pixels that are in this set but not in the
+        other.
+
+        @param other: The set to remove
+        @type other: L{hlr_utils.PixelSet}
+
+
+        @return: The remaining set
+        @rtype: L{hlr_utils.PixelSet}
+        """
+        result = PixelSet()
+        for (bank, tubes) in self.__banks.iteritems():
+            other_tubes = other.__banks.get(bank, {})
+            for (x, bits) in tubes.iteritems():
+                result.__add_bits(bank, x, bits & ~other_tubes.get(x, 0L))
+        return result
+
+    def get_ranges(self):
+        """
+        This method turns the set into rectangular pixel ranges. Runs of
+        consecutive vertical pixels are found for each tube and neighbouring
+        tubes with identical runs are merged into a single range.
+
+        @return: The pixel ranges as (I{start_id}, I{end_id}) pairs, with an
+                 inclusive start and exclusive end, keyed by bank name
+        @rtype: C{dict}
+        """
+        ranges = {}
+        for (bank, tubes) in self.__banks.iteritems():
+            bank_ranges = []
+            x_start = None
+            x_last = None
+            runs = None
+            for x in sorted(tubes):
+                bits = tubes[x]
+                if x_start is None:
+                    (x_start, runs) = (x, bits)
+                elif x != x_last + 1 or bits != runs:
+                    for run in self.__get_runs(runs):
+                        bank_ranges.append(((x_start, run[0]),
+                                            (x_last + 1, run[1])))
+                    (x_start, runs) = (x, bits)
+                x_last = x
+
+            for run in self.__get_runs(runs):
+                bank_ranges.append(((x_start, run[0]), (x_last + 1, run[1])))
+
+            ranges[bank] = bank_ranges
+
+        return ranges
+
+    def select(self, som):
+        """
+        This method keeps the spectra of a C{SOM} whose ids are in the set.
+
+        @param som: The object to select the spectra from
+        @type som: C{SOM.SOM}
+
+
+        @return: A new object with the selected spectra
+        @rtype: C{SOM.SOM}
+        """
+        return self.__filter(som, True)
+
+    def exclude(self, som):
+        """
+        This method removes the spectra of a C{SOM} whose ids are in the set.
+
+        @param som: The object to remove the spectra from
+        @type som: C{SOM.SOM}
+
+
+        @return: A new object with the remaining spectra
+        @rtype: C{SOM.SOM}
+        """
+        return self.__filter(som, False)
+
+    def read(self, filename):
+        """
+        This method adds the pixels of a pixel ID file to the set.
+
+        @param filename: The name of the pixel ID file
+        @type filename: C{string}
+        """
+        rfile = open(filename, "r")
+        for rid in rfile:
+            rid = rid.strip()
+            if rid == "":
+                continue
+            self.add(rid)
+        rfile.close()
+
+        self.__sources.append(filename)
+
+    def write(self, filename, append=False):
+        """
+        This method writes the set to a pixel ID file.
+
+        @param filename: The name of the pixel ID file
+        @type filename: C{string}
+
+        @param append: (OPTIONAL) Flag for adding the pixels to the end of an
+                                  existing file
+        @type append: C{boolean}
+        """
+        if append:
+            ofile = open(filename, "a")
+        else:
+            ofile = open(filename, "w")
+        for (bank, (x, y)) in self:
+            print >> ofile, "%s_%d_%d" % (bank, x, y)
+        ofile.close()
+
+    def __add_bits(self, bank, x, bits):
+        """
+        This method sets bits in the bitset of a tube. Empty tubes and banks
+        are not stored.
+        """
+        if not bits:
+            return
+        tubes = self.__banks.setdefault(bank, {})
+        tubes[x] = tubes.get(x, 0L) | bits
+
+    def __filter(self, som, keep):
+        """
+        This method creates a new C{SOM} holding the spectra whose membership
+        in the set matches the keep flag.
+        """
+        import SOM
+
+        result = SOM.SOM()
+        result.copyAttributes(som)
+        for so in som:
+            if (so.id in self) == keep:
+                result.append(so)
+        return result
+
+    def __bank_name(self, bank):
+        """
+        This method turns a bank ID into a bank name.
+        """
+        bank = str(bank)
+        if bank.startswith("bank"):
+            return bank
+        else:
+            return "bank" + bank
+
+    def __split_id(self, pixel):
+        """
+        This method splits a pixel ID into bank name and pixel numbers.
+        """
+        if isinstance(pixel, basestring):
+            (bank, x, y) = pixel.strip("'\"").split('_')
+            return (bank, int(x), int(y))
+        else:
+            return (pixel[0], int(pixel[1][0]), int(pixel[1][1]))
+
+    def __run_bits(self, start, end):
+        """
+        This method returns the bitset of the pixels from start up to, but
+        not including, end.
+        """
+        if end <= start:
+            return 0L
+        return ((1L << (end - start)) - 1) << start
+
+    def __get_runs(self, bits):
+        """
+        This method returns the runs of consecutive set bits as (start, end)
+        pairs with an exclusive end.
+        """
+        runs = []
+        y = 0
+        while bits:
+            # Skip the unset bits, then measure the run of set bits
+            while not bits & 1:
+                bits >>= 1
+                y += 1
+            start = y
+            while bits & 1:
+                bits >>= 1
+                y += 1
+            runs.append((start, y))
+        return runs
+
+if __name__ == "__main__":
+    pset1 = PixelSet()
+    pset1.add_rectangle("1", (2, 4), (3, 5))
+    pset1.add_ids(["bank1_2_9", "bank1_3_9", "bank1_4_9"])
+    pset1.add_tube("3", 0, (0, 0))
+
+    pset2 = PixelSet()
+    pset2.add_range("bank1", (3, 0), (4, 128))
+
+    print "********** PixelSet"
+    print "* pset1:", pset1
+    print "* pset2:", pset2
+    print "* ranges:", pset1.get_ranges()
+    print "* contains bank1_2_3:", "bank1_2_3" in pset1
+    print "* contains bank1_2_6:", ("bank1", (2, 6)) in pset1
+    print "* union:", pset1 | pset2
+    print "* intersection:", list(pset1 & pset2)
+    print "* difference:", (pset1 - pset2).get_ranges()
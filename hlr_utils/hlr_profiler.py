@@ -0,0 +1,555 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+import os
+import time
+
+class Profiler(object):
+    """
+    This class profiles the stages of a data reduction. Stages are opened
+    and closed with L{start_stage} and L{end_stage} (or used as context
+    managers via L{stage}) and can be nested. For every stage the wall
+    clock time, the CPU time, the peak resident memory, the bytes read and
+    written and any counters given when closing the stage (like the number
+    of spectra processed) are collected. Stages with the same name at the
+    same place in the tree are aggregated. Hot functions can add samples
+    (like the time spent on every pixel) that are reported as histograms.
+
+    The class also provides the C{getTime}, C{getOldTime} and C{setOldTime}
+    methods of C{sns_timing.DiffTime}, so it can be handed to all of the
+    functions taking a timer object. Every C{getTime} call that prints a
+    message becomes a stage covering the time since the previous call.
+    """
+
+    def __init__(self, echo=False):
+        """
+        Object constructor
+
+        @param echo: (OPTIONAL) Flag for printing the timing messages like
+                                C{sns_timing.DiffTime}
+        @type echo: C{boolean}
+        """
+        self.echo = echo
+        self.__root = _StageNode("total")
+        self.__events = []
+        self.__start = _Snapshot()
+        self.__stack = [(self.__root, self.__start)]
+        self.__old = self.__start
+
+    def getTime(self, output=True, msg=""):
+        """
+        This method records the time since the previous call as a stage
+        named after the message.
+
+        @param output: (OPTIONAL) Flag for recording the stage. If I{False},
+                                  only the starting point of the next stage is
+                                  set.
+        @type output: C{boolean}
+
+        @param msg: (OPTIONAL) The name of the stage
+        @type msg: C{string}
+
+
+        @return: The wall clock time since the previous call
+        @rtype: C{float}
+        """
+        now = _Snapshot()
+        elapsed = now.wall - self.__old.wall
+
+        if output:
+            name = msg.strip()
+            if name == "":
+                name = "(unnamed)"
+            if self.echo:
+                print "%s: %f sec" % (name, elapsed)
+            self.__record(name, self.__old, now, {})
+
+        self.__old = now
+
+        return elapsed
+
+    def getOldTime(self):
+        """
+        This method returns the starting point of the next C{getTime} stage.
+
+        @return: The starting point
+        @rtype: C{object}
+        """
+        return self.__old
+
+    def setOldTime(self, old_time):
+        """
+        This method sets the starting point of the next C{getTime} stage.
+
+        @param old_time: A starting point from L{getOldTime}
+        @type old_time: C{object}
+        """
+        self.__old = old_time
+
+    def start_stage(self, name):
+        """
+        This method opens a stage inside the currently open stage.
+
+        @param name: The name of the stage
+        @type name: C{string}
+        """
+        node = self.__stack[-1][0].get_child(name)
+        self.__stack.append((node, _Snapshot()))
+
+    def end_stage(self, **kwargs):
+        """
+        This method closes the currently open stage.
+
+        @param kwargs: Counters to add to the stage, like I{spectra}.
+
+
+        @raise RuntimeError: There is no open stage
+        """
+        if len(self.__stack) == 1:
+            raise RuntimeError("There is no open stage to end")
+
+        (node, start) = self.__stack.pop()
+        self.__record(node.name, start, _Snapshot(), kwargs, node)
+
+    def stage(self, name):
+        """
+        This method returns a context manager for a stage.
+
+        @param name: The name of the stage
+        @type name: C{string}
+
+
+        @return: The context manager
+        @rtype: C{object}
+        """
+        return _StageContext(self, name)
+
+    def add_sample(self, name, value):
+        """
+        This method adds a sample to a histogram of the currently open
+        stage.
+
+        @param name: The name of the histogram
+        @type name: C{string}
+
+        @param value: The sample, usually a time in seconds
+        @type value: C{float}
+        """
+        self.__stack[-1][0].add_sample(name, value)
+
+    def finish(self):
+        """
+        This method closes all open stages and the total stage.
+        """
+        while len(self.__stack) > 1:
+            self.end_stage()
+        self.__record("total", self.__start, _Snapshot(), {}, self.__root)
+
+    def report(self):
+        """
+        This method creates the text report of the stage tree.
+
+        @return: The report
+        @rtype: C{string}
+        """
+        result = []
+        result.append("%-48s %6s %10s %10s %9s %9s %9s %9s" % \
+                      ("Stage", "Calls", "Wall(s)", "CPU(s)", "RSS(MB)",
+                       "Read(MB)", "Write(MB)", "Spectra"))
+        self.__root.report(result, 0)
+        return "\n".join(result)
+
+    def to_dict(self):
+        """
+        This method returns the stage tree as nested dictionaries.
+
+        @return: The stage tree
+        @rtype: C{dict}
+        """
+        return self.__root.to_dict()
+
+    def write_json(self, filename):
+        """
+        This method writes the stage tree to a JSON file.
+
+        @param filename: The name of the JSON file
+        @type filename: C{string}
+        """
+        import json
+        ofile = open(filename, "w")
+        json.dump(self.to_dict(), ofile, indent=1)
+        ofile.close()
+
+    def write_chrome_trace(self, filename):
+        """
+        This method writes every recorded stage as an event to a file in the
+        Chrome trace event format (viewable in I{chrome://tracing}).
+
+        @param filename: The name of the trace file
+        @type filename: C{string}
+        """
+        import json
+        ofile = open(filename, "w")
+        json.dump({"traceEvents": self.__events,
+                   "displayTimeUnit": "ms"}, ofile)
+        ofile.close()
+
+    def __record(self, name, start, end, counts, node=None):
+        """
+        This method adds the measurements between two snapshots to a stage
+        and to the trace events.
+        """
+        if node is None:
+            node = self.__stack[-1][0].get_child(name)
+
+        node.add(end.wall - start.wall, end.cpu - start.cpu, end.rss,
+                 end.read - start.read, end.written - start.written, counts)
+
+        args = {"cpu": end.cpu - start.cpu}
+        args.update(counts)
+        self.__events.append({"name": name, "ph": "X", "pid": os.getpid(),
+                              "tid": 0,
+                              "ts": (start.wall - self.__root_wall()) * 1e6,
+                              "dur": (end.wall - start.wall) * 1e6,
+                              "args": args})
+
+    def __root_wall(self):
+        """
+        This method returns the wall clock time the profiler was created.
+        """
+        return self.__stack[0][1].wall
+
+class _StageNode(object):
+    """
+    This class holds the aggregated measurements of a stage.
+    """
+
+    # The upper edges (in the units of the samples) of the histogram bins
+    BIN_EDGES = (1.0e-6, 1.0e-5, 1.0e-4, 1.0e-3, 1.0e-2, 1.0e-1, 1.0)
+
+    def __init__(self, name):
+        """
+        Object constructor
+        """
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rss = 0
+        self.read = 0
+        self.written = 0
+        self.counts = {}
+        self.hists = {}
+        self.children = []
+        self.__child_map = {}
+
+    def get_child(self, name):
+        """
+        This method returns the child stage with the given name, creating it
+        if necessary.
+        """
+        try:
+            return self.__child_map[name]
+        except KeyError:
+            node = _StageNode(name)
+            self.__child_map[name] = node
+            self.children.append(node)
+            return node
+
+    def add(self, wall, cpu, rss, read, written, counts):
+        """
+        This method adds the measurements of one call of the stage.
+        """
+        self.calls += 1
+        self.wall += wall
+        self.cpu += cpu
+        self.rss = max(self.rss, rss)
+        self.read += read
+        self.written += written
+        for (key, value) in counts.iteritems():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def add_sample(self, name, value):
+        """
+        This method adds a sample to a histogram of the stage.
+        """
+        try:
+            hist = self.hists[name]
+        except KeyError:
+            hist = {"count": 0, "total": 0.0, "min": value, "max": value,
+                    "bins": [0] * (len(self.BIN_EDGES) + 1)}
+            self.hists[name] = hist
+
+        hist["count"] += 1
+        hist["total"] += value
+        hist["min"] = min(hist["min"], value)
+        hist["max"] = max(hist["max"], value)
+
+        import bisect
+        hist["bins"][bisect.bisect_left(self.BIN_EDGES, value)] += 1
+
+    def report(self, result, level):
+        """
+        This method adds the report lines of the stage and its children.
+        """
+        mega = 1024.0 * 1024.0
+        result.append("%-48s %6d %10.3f %10.3f %9.1f %9.1f %9.1f %9s" % \
+                      ("  " * level + self.name, self.calls, self.wall,
+                       self.cpu, self.rss / mega, self.read / mega,
+                       self.written / mega,
+                       str(self.counts.get("spectra", ""))))
+
+        names = self.hists.keys()
+        names.sort()
+        for name in names:
+            hist = self.hists[name]
+            result.append("%s%s: %d samples, mean %g, min %g, max %g" % \
+                          ("  " * (level + 2), name, hist["count"],
+                           hist["total"] / hist["count"], hist["min"],
+                           hist["max"]))
+            lower = 0.0
+            for (i, count) in enumerate(hist["bins"]):
+                if i < len(self.BIN_EDGES):
+                    label = "%g - %g" % (lower, self.BIN_EDGES[i])
+                    lower = self.BIN_EDGES[i]
+                else:
+                    label = "> %g" % lower
+                if count:
+                    result.append("%s%-20s %d" % ("  " * (level + 3), label,
+                                                  count))
+
+        for child in self.children:
+            child.report(result, level + 1)
+
+    def to_dict(self):
+        """
+        This method returns the stage and its children as dictionaries.
+        """
+        return {"name": self.name, "calls": self.calls, "wall": self.wall,
+                "cpu": self.cpu, "peak_rss": self.rss, "bytes_read": self.read,
+                "bytes_written": self.written, "counts": self.counts,
+                "histograms": self.hists,
+                "bin_edges": list(self.BIN_EDGES),
+                "children": [child.to_dict() for child in self.children]}
+
+class _StageContext(object):
+    """
+    This class is the context manager returned by L{Profiler.stage}.
+    """
+
+    def __init__(self, profiler, name):
+        """
+        Object constructor
+        """
+        self.__profiler = profiler
+        self.__name = name
+
+    def __enter__(self):
+        """
+        This method opens the stage.
+        """
+        self.__profiler.start_stage(self.__name)
+        return self.__profiler
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        This method closes the stage.
+        """
+        self.__profiler.end_stage()
+        return False
+
+class _Snapshot(object):
+    """
+    This class holds the wall clock time, CPU time, peak resident memory (in
+    bytes) and bytes read and written by the process at a given moment.
+    """
+
+    def __init__(self):
+        """
+        Object constructor
+        """
+        self.wall = time.time()
+        times = os.times()
+        self.cpu = times[0] + times[1]
+
+        try:
+            import resource
+            # Linux reports the peak resident memory in kilobytes
+            self.rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss \
+                       * 1024
+        except ImportError:
+            self.rss = 0
+
+        self.read = 0
+        self.written = 0
+        try:
+            iofile = open("/proc/self/io", "r")
+        except IOError:
+            return
+        for line in iofile:
+            (key, value) = line.split(":")
+            if key == "rchar":
+                self.read = int(value)
+            elif key == "wchar":
+                self.written = int(value)
+        iofile.close()
+
+def make_timer(timing=False, profile=None):
+    """
+    This function creates the timer object for a driver from its
+    I{--timing} and I{--profile} options. If a profile file is requested, a
+    L{Profiler} is returned and, when the driver exits, the stage tree is
+    printed and written to the profile file (JSON) and to a Chrome trace
+    file (the profile file name with a I{_trace} tag).
+
+    @param timing: (OPTIONAL) Flag for printing the timing messages
+    @type timing: C{boolean}
+
+    @param profile: (OPTIONAL) The name of the profile file
+    @type profile: C{string}
+
+
+    @return: The timer object or I{None} if neither option is used
+    @rtype: L{Profiler} or C{sns_timing.DiffTime}
+    """
+    if profile is not None:
+        profiler = Profiler(echo=timing)
+
+        def write_profile():
+            import hlr_utils
+            profiler.finish()
+            print profiler.report()
+            profiler.write_json(profile)
+            profiler.write_chrome_trace(hlr_utils.add_tag(profile, "trace"))
+
+        import atexit
+        atexit.register(write_profile)
+        return profiler
+    elif timing:
+        import sns_timing
+        return sns_timing.DiffTime()
+    else:
+        return None
+
+def profile_stage(timer_key="timer", label_key=None):
+    """
+    This function creates a decorator that runs the decorated function as a
+    profiler stage named after the function. The stage is only created when
+    the timer object found in the keyword arguments of the call is a
+    L{Profiler}. The number of spectra processed is taken from the first
+    argument, or from the result if the first argument is not a C{SOM}.
+
+    @param timer_key: (OPTIONAL) The keyword argument holding the timer
+                                 object. The default is I{timer}.
+    @type timer_key: C{string}
+
+    @param label_key: (OPTIONAL) A keyword argument whose value is added to
+                                 the stage name, like I{dataset_type}.
+    @type label_key: C{string}
+
+
+    @return: The decorator
+    @rtype: C{function}
+    """
+    import functools
+
+    def decorator(func):
+        """
+        This function wraps the decorated function.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """
+            This function runs the decorated function as a stage.
+            """
+            profiler = get_profiler(kwargs.get(timer_key))
+            if profiler is None:
+                return func(*args, **kwargs)
+
+            name = func.__name__
+            if label_key is not None and label_key in kwargs:
+                name += " (%s)" % kwargs[label_key]
+
+            profiler.start_stage(name)
+            try:
+                result = func(*args, **kwargs)
+            except:
+                profiler.end_stage()
+                raise
+
+            counts = {}
+            for obj in (args[:1] + (result,)):
+                if hasattr(obj, "attr_list"):
+                    counts["spectra"] = len(obj)
+                    break
+            profiler.end_stage(**counts)
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+def start_stage(timer, name):
+    """
+    This function opens a profiler stage if the timer object is a
+    L{Profiler}. It does nothing for other timer objects.
+
+    @param timer: The timer object
+    @type timer: L{Profiler}, C{sns_timing.DiffTime} or C{None}
+
+    @param name: The name of the stage
+    @type name: C{string}
+    """
+    if isinstance(timer, Profiler):
+        timer.start_stage(name)
+
+def end_stage(timer, **kwargs):
+    """
+    This function closes the open profiler stage if the timer object is a
+    L{Profiler}. It does nothing for other timer objects.
+
+    @param timer: The timer object
+    @type timer: L{Profiler}, C{sns_timing.DiffTime} or C{None}
+
+    @param kwargs: Counters to add to the stage, like I{spectra}.
+    """
+    if isinstance(timer, Profiler):
+        timer.end_stage(**kwargs)
+
+def get_profiler(timer):
+    """
+    This function returns the timer object if it is a L{Profiler}.
+
+    @param timer: The timer object
+    @type timer: L{Profiler}, C{sns_timing.DiffTime} or C{None}
+
+
+    @return: The profiler or I{None}
+    @rtype: L{Profiler}
+    """
+    if isinstance(timer, Profiler):
+        return timer
+    else:
+        return None
@@ -0,0 +1,338 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+import os
+
+# The default location and size (in MB) of the result cache
+DEFAULT_CACHE_DIR = os.path.join("~", ".hlr_cache")
+DEFAULT_CACHE_SIZE = 1024.0
+
+# Configuration parameters that do not change the outputs of a run
+IGNORE_PARAMS = ["verbose", "socket", "no_cache", "cache_dir", "cache_size"]
+
+# Configuration parameters that name files written by a run. These are never
+# fingerprinted since they change with every run.
+OUTPUT_PARAMS = ["output", "path_replacement"]
+
+# The lists of output files for the runs being recorded
+__recordings = []
+
+class ResultCache(object):
+    """
+    This class keeps the output files of data reduction runs in a cache
+    directory. A run is identified by the MD5 sum of its configuration (see
+    L{hlr_utils.create_config_hash}), the name of the driver and the path,
+    size and modification time of every input file named by the
+    configuration. A repeated run with an identical key can then restore the
+    output files instead of reducing the data again. The output files are
+    restored to the paths they were written to, so the output location is
+    part of the key. When the cache grows beyond its size limit, the least
+    recently used runs are removed.
+    """
+
+    def __init__(self, cache_dir=None, cache_size=None):
+        """
+        Object constructor
+
+        @param cache_dir: (OPTIONAL) The directory holding the cache. The
+                                     default is L{DEFAULT_CACHE_DIR}.
+        @type cache_dir: C{string}
+
+        @param cache_size: (OPTIONAL) The maximum size of the cache in MB.
+                                      The default is L{DEFAULT_CACHE_SIZE}.
+        @type cache_size: C{float}
+        """
+        if cache_dir is None:
+            cache_dir = DEFAULT_CACHE_DIR
+        if cache_size is None:
+            cache_size = DEFAULT_CACHE_SIZE
+
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = int(cache_size * 1024 * 1024)
+
+    def make_key(self, config, name):
+        """
+        This method creates the cache key for a run.
+
+        @param config: The data reduction configuration of the run
+        @type config: L{hlr_utils.Configure}
+
+        @param name: The name of the driver
+        @type name: C{string}
+
+
+        @return: The cache key
+        @rtype: C{string}
+        """
+        import hashlib
+        import hlr_utils
+
+        result = [name, hlr_utils.create_config_hash(config, IGNORE_PARAMS)]
+
+        ckeys = config.__dict__.keys()
+        ckeys.sort()
+        for ckey in ckeys:
+            if ckey in IGNORE_PARAMS or ckey in OUTPUT_PARAMS:
+                continue
+            for filename in self.__get_filenames(config.__dict__[ckey]):
+                stat = os.stat(filename)
+                result.append("%s:%d:%r" % (os.path.abspath(filename),
+                                            stat.st_size, stat.st_mtime))
+
+        return hashlib.new("md5", " ".join(result)).hexdigest()
+
+    def restore(self, key):
+        """
+        This method copies the cached output files of a run back to the paths
+        they were written to.
+
+        @param key: The cache key of the run
+        @type key: C{string}
+
+
+        @return: The restored output files or I{None} if the run is not in
+                 the cache
+        @rtype: C{list} of C{string}s
+        """
+        import shutil
+
+        entry = os.path.join(self.cache_dir, key)
+        try:
+            outputs = self.__read_manifest(entry)
+        except IOError:
+            return None
+
+        for (i, filename) in enumerate(outputs):
+            if not os.path.isfile(os.path.join(entry, str(i))):
+                return None
+
+        for (i, filename) in enumerate(outputs):
+            outdir = os.path.dirname(filename)
+            if outdir != "" and not os.path.isdir(outdir):
+                os.makedirs(outdir)
+            shutil.copyfile(os.path.join(entry, str(i)), filename)
+
+        # Mark the run as recently used
+        os.utime(os.path.join(entry, "manifest"), None)
+
+        return outputs
+
+    def store(self, key, outputs):
+        """
+        This method copies the output files of a run into the cache and
+        removes the least recently used runs if the cache is too large.
+
+        @param key: The cache key of the run
+        @type key: C{string}
+
+        @param outputs: The output files of the run
+        @type outputs: C{list} of C{string}s
+        """
+        import shutil
+
+        # Keep each file once, in the order it was first written
+        files = []
+        for filename in outputs:
+            filename = os.path.abspath(filename)
+            if filename not in files:
+                files.append(filename)
+
+        entry = os.path.join(self.cache_dir, key)
+        tmp_entry = "%s.tmp%d" % (entry, os.getpid())
+
+        try:
+            os.makedirs(tmp_entry)
+
+            for (i, filename) in enumerate(files):
+                shutil.copyfile(filename, os.path.join(tmp_entry, str(i)))
+
+            mfile = open(os.path.join(tmp_entry, "manifest"), "w")
+            for filename in files:
+                print >> mfile, filename
+            mfile.close()
+
+            # The entry only appears once it is complete
+            if os.path.isdir(entry):
+                shutil.rmtree(entry)
+            os.rename(tmp_entry, entry)
+        except (IOError, OSError):
+            shutil.rmtree(tmp_entry, True)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """
+        This method removes the least recently used runs until the cache is
+        no larger than its size limit.
+        """
+        import shutil
+
+        entries = []
+        total = 0
+        for key in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, key)
+            manifest = os.path.join(entry, "manifest")
+            if not os.path.isfile(manifest):
+                continue
+            size = 0
+            for filename in os.listdir(entry):
+                size += os.path.getsize(os.path.join(entry, filename))
+            entries.append((os.path.getmtime(manifest), size, entry))
+            total += size
+
+        entries.sort()
+        while total > self.max_size and entries:
+            (mtime, size, entry) = entries.pop(0)
+            shutil.rmtree(entry, True)
+            total -= size
+
+    def __get_filenames(self, value):
+        """
+        This method returns the names of the existing files in a
+        configuration parameter value.
+        """
+        if isinstance(value, basestring):
+            values = [value]
+        elif isinstance(value, (list, tuple)):
+            values = value
+        else:
+            return []
+
+        return [filename for filename in values \
+                if isinstance(filename, basestring) and \
+                os.path.isfile(filename)]
+
+    def __read_manifest(self, entry):
+        """
+        This method reads the list of output files of a cache entry.
+        """
+        mfile = open(os.path.join(entry, "manifest"), "r")
+        outputs = [line.rstrip("\n") for line in mfile if line.strip()]
+        mfile.close()
+        return outputs
+
+def add_cache_options(parser):
+    """
+    This function adds the options controlling the result cache used by
+    L{run_cached} to a driver option parser.
+
+    @param parser: The option parser of the driver
+    @type parser: L{hlr_utils.BasicOptions}
+    """
+    parser.add_option("", "--no-cache", action="store_true", dest="no_cache",
+                      help="Flag to always run the reduction instead of "\
+                      +"restoring the outputs of an identical earlier run")
+    parser.set_defaults(no_cache=False)
+
+    parser.add_option("", "--cache-dir", dest="cache_dir",
+                      metavar="DIRECTORY",
+                      help="Specify the directory of the result cache. The "\
+                      +"default is %s" % DEFAULT_CACHE_DIR)
+
+    parser.add_option("", "--cache-size", dest="cache_size", type="float",
+                      metavar="MB",
+                      help="Specify the maximum size of the result cache in "\
+                      +"MB. The default is %d" % DEFAULT_CACHE_SIZE)
+
+def record_output(filename):
+    """
+    This function adds a file to the outputs of the runs being recorded by
+    L{run_cached}. It is called for every file written by
+    L{hlr_utils.write_file}. Functions that write files by other means need
+    to call it themselves.
+
+    @param filename: The name of the output file
+    @type filename: C{string}
+    """
+    for outputs in __recordings:
+        outputs.append(filename)
+
+def run_cached(run, config, *args, **kwargs):
+    """
+    This function calls a driver run function unless an identical run is in
+    the result cache. In that case, the output files of the earlier run are
+    restored. Otherwise, the files written by the run are stored in the cache
+    when the run finishes. The cache is checked before the run function is
+    called, so a cached run does not read any data files. If the cache
+    directory cannot be used, the run function is called without caching.
+
+    @param run: The driver run function. It is called with the configuration
+                and the other arguments.
+    @type run: C{function}
+
+    @param config: The data reduction configuration of the run
+    @type config: L{hlr_utils.Configure}
+
+    @param args: The other arguments for the run function
+
+    @param kwargs: A list of keyword arguments that the function accepts:
+
+    @keyword no_cache: Flag for always calling the run function and not
+                       storing its outputs. The default value is I{False}.
+    @type no_cache: C{boolean}
+
+    @keyword cache_dir: The directory holding the cache. The default is
+                        L{DEFAULT_CACHE_DIR}.
+    @type cache_dir: C{string}
+
+    @keyword cache_size: The maximum size of the cache in MB. The default is
+                         L{DEFAULT_CACHE_SIZE}.
+    @type cache_size: C{float}
+    """
+    no_cache = kwargs.get("no_cache", False)
+
+    if no_cache:
+        run(config, *args)
+        return
+
+    cache = ResultCache(kwargs.get("cache_dir"), kwargs.get("cache_size"))
+    name = os.path.basename(run.func_code.co_filename)
+    key = cache.make_key(config, name)
+
+    try:
+        outputs = cache.restore(key)
+    except (IOError, OSError):
+        outputs = None
+
+    if outputs is not None:
+        if config.verbose:
+            print "Restored the outputs of an identical run from %s" \
+                  % cache.cache_dir
+            for filename in outputs:
+                print "  %s" % filename
+        return
+
+    outputs = []
+    __recordings.append(outputs)
+    try:
+        run(config, *args)
+    finally:
+        __recordings.pop()
+
+    try:
+        cache.store(key, outputs)
+    except (IOError, OSError):
+        # The outputs are there, they just will not be reused
+        pass
@@ -0,0 +1,228 @@
+#                  High-Level Reduction Functions
+#           A part of the SNS Analysis Software Suite.
+#
+#                  Spallation Neutron Source
+#          Oak Ridge National Laboratory, Oak Ridge TN.
+#
+#
+#                             NOTICE
+#
+# For this software and its associated documentation, permission is granted
+# to reproduce, prepare derivative works, and distribute copies to the public
+# for any purpose and without fee.
+#
+# This material was prepared as an account of work sponsored by an agency of
+# the United States Government.  Neither the United States Government nor the
+# United States Department of Energy, nor any of their employees, makes any
+# warranty, express or implied, or assumes any legal liability or
+# responsibility for the accuracy, completeness, or usefulness of any
+# information, apparatus, product, or process disclosed, or represents that
+# its use would not infringe privately owned rights.
+#
+
+# $Id$
+
+class RunIndex(object):
+    """
+    This class holds an index of instrument, proposal and run number to
+    U{NeXus<www.nexusformat.org>} file path. The index is built by scanning an
+    archive tree laid out like I{/SNS/INST/PROPOSAL/.../INST_RUN.nxs} and is
+    kept on disk as a text file with one I{instrument proposal run path} entry
+    per line. It lets L{hlr_utils.determine_files} resolve any number of runs
+    in a single lookup instead of running B{findnexus} for each of them.
+    """
+
+    def __init__(self, filename=None):
+        """
+        Object constructor
+
+        @param filename: (OPTIONAL) The name of an index file to load
+        @type filename: C{string}
+        """
+        self.__runs = {}
+
+        if filename is not None:
+            self.read(filename)
+
+    def __len__(self):
+        """
+        This method returns the number of files in the index.
+
+        @return: The number of files in the index
+        @rtype: C{int}
+        """
+        return len(self.__runs)
+
+    def add(self, inst, proposal, run, path):
+        """
+        This method adds a file to the index.
+
+        @param inst: The name of the instrument
+        @type inst: C{string}
+
+        @param proposal: The name of the proposal or I{None} if not known
+        @type proposal: C{string}
+
+        @param run: The run number
+        @type run: C{int}
+
+        @param path: The fully qualified file name
+        @type path: C{string}
+        """
+        self.__runs[(inst, int(run))] = (proposal, path)
+
+    def build(self, archive_root):
+        """
+        This method scans an archive tree and adds every NeXus file found to
+        the index. The file names must look like I{INST_RUN.nxs} and the
+        proposal is taken from the directory right below the one named after
+        the instrument.
+
+        @param archive_root: The top directory of the archive
+        @type archive_root: C{string}
+        """
+        import os
+
+        archive_root = os.path.abspath(os.path.expanduser(archive_root))
+
+        for (dirpath, dirnames, filenames) in os.walk(archive_root):
+            for filename in filenames:
+                if not filename.endswith(".nxs"):
+                    continue
+                try:
+                    (inst, run) = filename[:-4].rsplit('_', 1)
+                    run = int(run)
+                except ValueError:
+                    continue
+
+                parts = dirpath[len(archive_root):].split(os.sep)
+                try:
+                    proposal = parts[parts.index(inst) + 1]
+                except (ValueError, IndexError):
+                    proposal = None
+
+                self.add(inst, proposal, run, os.path.join(dirpath, filename))
+
+    def lookup(self, inst, runs, proposal=None):
+        """
+        This method finds the files for a list of runs.
+
+        @param inst: The name of the instrument
+        @type inst: C{string}
+
+        @param runs: The run numbers
+        @type runs: C{list} of C{int}s
+
+        @param proposal: (OPTIONAL) The name of the proposal the runs must
+                                    belong to
+        @type proposal: C{string}
+
+
+        @return: The file names found (one per run and I{None} for a run not
+                 in the index)
+        @rtype: C{list}
+        """
+        files = []
+        for run in runs:
+            try:
+                (run_proposal, path) = self.__runs[(inst, run)]
+            except KeyError:
+                files.append(None)
+                continue
+
+            if proposal is not None and run_proposal != proposal:
+                files.append(None)
+            else:
+                files.append(path)
+
+        return files
+
+    def read(self, filename):
+        """
+        This method loads entries from an index file.
+
+        @param filename: The name of the index file
+        @type filename: C{string}
+        """
+        ifile = open(filename, "r")
+        for line in ifile:
+            if line.startswith("#"):
+                continue
+            parts = line.rstrip().split(None, 3)
+            if len(parts) != 4:
+                continue
+            if parts[1] == "-":
+                parts[1] = None
+            self.add(parts[0], parts[1], parts[2], parts[3])
+        ifile.close()
+
+    def write(self, filename):
+        """
+        This method writes the index to a file.
+
+        @param filename: The name of the index file
+        @type filename: C{string}
+        """
+        ofile = open(filename, "w")
+        print >> ofile, "# HLRedux run index"
+        keys = self.__runs.keys()
+        keys.sort()
+        for (inst, run) in keys:
+            (proposal, path) = self.__runs[(inst, run)]
+            if proposal is None:
+                proposal = "-"
+            print >> ofile, inst, proposal, run, path
+        ofile.close()
+
+def parse_run_list(runs):
+    """
+    This function takes a run specification in the syntax of B{findnexus}
+    (I{1000-1200,1205}) and returns the individual run numbers.
+
+    @param runs: The comma-separated run numbers and ranges
+    @type runs: C{string}
+
+
+    @return: The run numbers
+    @rtype: C{list} of C{int}s
+
+
+    @raise RuntimeError: A range is given from high to low
+    """
+    run_list = []
+    for part in runs.split(','):
+        part = part.strip()
+        if part == "":
+            continue
+        if "-" in part:
+            (first, last) = [int(x) for x in part.split('-')]
+            if last < first:
+                raise RuntimeError("Run range %s must go from low to high" \
+                                   % part)
+            run_list.extend(xrange(first, last + 1))
+        else:
+            run_list.append(int(part))
+
+    return run_list
+
+if __name__ == "__main__":
+    import os
+    import shutil
+    import tempfile
+
+    root = tempfile.mkdtemp()
+    for run in (1845, 1846, 1848):
+        rundir = os.path.join(root, "REF_L", "2006_2_4B_SCI", "1", str(run),
+                              "NeXus")
+        os.makedirs(rundir)
+        open(os.path.join(rundir, "REF_L_%d.nxs" % run), "w").close()
+
+    index = RunIndex()
+    index.build(root)
+    index.write(os.path.join(root, "runs.idx"))
+
+    print "* Runs      :", parse_run_list("1845-1847,1848")
+    print "* Index size:", len(RunIndex(os.path.join(root, "runs.idx")))
+    print "* Lookup    :", index.lookup("REF_L", parse_run_list("1845-1848"))
+
+    shutil.rmtree(root)
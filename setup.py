@@ -60,6 +60,9 @@ instrument_scripts = {
     ],
     "GEN" : [
     'agg_dr_files',
+    'build_run_index',
+    'dump_to_text',
+    'hlr_benchmark',
     'mask_generator',
     'plot_file',
     'plot_multi',